@@ -1,11 +1,19 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import time
-
-from core.database import *
-from core.sentiment import StressAnalyzer
-from core.chatbot import WellnessChatbot
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Only stdlib-backed modules load at startup. pandas, plotly, the NLP
+# engines and the LLM client are imported on first use so the login
+# screen and cold container starts don't pay for them.
+from core.database import (
+    init_db, login_user, register_user, record_checkin,
+    get_user_logs, get_weekly_stress, get_monthly_stress, get_chat_history,
+    get_available_employees, assign_employee,
+    get_manager_team_summary, get_manager_team_trend, get_manager_team_alerts,
+    TEAM_RISK_SCORE,
+    get_org_metrics, get_user_score_distribution, get_high_risk_logs, get_log_text
+)
 
 # =====================================================
 # PAGE CONFIG
@@ -29,18 +37,109 @@ st.markdown("""
 }
 </style>
 """, unsafe_allow_html=True)
+
+CHAT_WINDOW = 30          # messages rendered per rerun
+CHAT_BUFFER_SIZE = 100    # messages kept in session state
+RISK_PAGE_SIZE = 25       # rows per page in the admin high-risk table
+TEAM_ALERTS_SHOWN = 50    # newest active alerts listed on the manager page
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024   # exports larger than this spill to disk
+
+# Manager dashboard periods: label -> (days back or None, trend bucket)
+TEAM_PERIODS = {
+    "Last 24 hours": (1, "hour"),
+    "Last 7 days": (7, "hour"),
+    "Last 30 days": (30, "day"),
+    "All time": (None, "week"),
+}
+
 # =====================================================
 # LOAD MODELS
 # =====================================================
 
+def _build_models():
+    from core.sentiment import StressAnalyzer
+    from core.chatbot import WellnessChatbot
+
+    # STRESSGUARD_ENGINE: lexicon (default), textblob, or transformer
+    # (local model in STRESSGUARD_MODEL_DIR)
+    analyzer = StressAnalyzer(engine=os.environ.get("STRESSGUARD_ENGINE", "lexicon"))
+
+    # STRESSGUARD_RESPONSE_CACHE=1 reuses replies to short, repeated
+    # check-ins; STRESSGUARD_RESPONSE_CACHE_DB persists them
+    response_cache = None
+    if os.environ.get("STRESSGUARD_RESPONSE_CACHE") == "1":
+        from core.metrics import registry
+        from core.response_cache import ResponseCache
+        response_cache = ResponseCache(db_path=os.environ.get("STRESSGUARD_RESPONSE_CACHE_DB"))
+        registry.register_gauge(
+            "response_cache", "Chatbot response cache counters", response_cache.stats
+        )
+
+    return analyzer, WellnessChatbot(response_cache=response_cache)
+
 @st.cache_resource
+def start_model_loading():
+    # Once per process: models build in the background while the auth
+    # screen renders
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stressguard-models")
+    future = executor.submit(_build_models)
+    # The worker thread exits once the models are built
+    executor.shutdown(wait=False)
+    return future
+
 def load_models():
-    return StressAnalyzer(), WellnessChatbot()
+    # A failed load must not stay cached for the life of the process:
+    # drop it and start over, once now and again on a later call
+    for attempt in range(2):
+        try:
+            return start_model_loading().result()
+        except Exception:
+            start_model_loading.clear()
+            if attempt:
+                raise
+
+start_model_loading()
 
-analyzer, chatbot = load_models()
+@st.cache_resource
+def load_context_builder():
+    # STRESSGUARD_PROMPT_TOKENS: token budget for summary + recent turns
+    from core.context import ContextBuilder, TOKEN_BUDGET
+    return ContextBuilder(
+        token_budget=int(os.environ.get("STRESSGUARD_PROMPT_TOKENS", TOKEN_BUDGET))
+    )
+
+@st.cache_resource
+def load_checkin_writer():
+    # Optional write-behind queue for peak chat traffic
+    if os.environ.get("STRESSGUARD_WRITE_BEHIND") != "1":
+        return None
+
+    from core.writer import CheckinWriter
+    return CheckinWriter()
+
+@st.cache_resource
+def start_metrics_exporter():
+    # STRESSGUARD_METRICS_PORT serves /metrics; STRESSGUARD_METRICS_FILE is
+    # rewritten every 15 s for node_exporter's textfile collector
+    from core.metrics import start_exporter
+    return start_exporter(
+        port=os.environ.get("STRESSGUARD_METRICS_PORT"),
+        path=os.environ.get("STRESSGUARD_METRICS_FILE")
+    )
+
+start_metrics_exporter()
 
 init_db()
 
+@st.cache_resource
+def run_alert_sweeper():
+    # Resolves the alerts of users who stopped checking in; their own
+    # next check-in would otherwise be the only thing that closes them
+    from core.database import start_alert_sweeper
+    return start_alert_sweeper()
+
+run_alert_sweeper()
+
 if "user" not in st.session_state:
     st.session_state.user = None
 
@@ -80,6 +179,9 @@ def auth_screen():
 #=============EMPLOYEE DASHBOARD=====================
 
 def employee_dashboard():
+    import pandas as pd
+    import plotly.express as px
+
     user = st.session_state.user
 
     st.markdown(f"## Welcome, {user['username']} 🌿")
@@ -88,9 +190,6 @@ def employee_dashboard():
          StressGuard AI analyzes emotional reflections using AI
          and tracks stress trends to prevent burnout.
         """)
-    
-    logs = get_user_logs(user["id"])
-    df = pd.DataFrame(logs, columns=["timestamp","score"]) if logs else pd.DataFrame()
 
     menu = st.radio(
         "Navigation",
@@ -101,6 +200,11 @@ def employee_dashboard():
     # ===================== DASHBOARD =====================
     if menu == "Dashboard":
 
+        # Check-ins are read only by the tabs that show them; the chat tab
+        # reruns on every message and never needs them
+        logs = get_user_logs(user["id"])
+        df = pd.DataFrame(logs, columns=["timestamp","score"]) if logs else pd.DataFrame()
+
         if df.empty:
             st.info("No check-ins yet.")
         else:
@@ -114,21 +218,65 @@ def employee_dashboard():
             col2.metric("Weekly Avg", weekly if weekly else "N/A")
             col3.metric("Monthly Avg", monthly if monthly else "N/A")
 
-            fig = px.line(df, x="timestamp", y="score")
+            from core.dashboard import employee_chart_frame
+            chart_df = employee_chart_frame(logs)
+
+            fig = px.line(chart_df, x="timestamp", y="score")
             st.plotly_chart(fig, use_container_width=True)
+            if len(chart_df) < len(logs):
+                st.caption(f"Showing {len(chart_df)} of {len(logs)} check-ins (all spikes kept)")
 
     # ===================== WELLNESS CHAT =====================
     elif menu == "Wellness Chat":
 
         st.subheader("💬 Talk to StressGuard AI")
 
-        # Load chat history ONCE
-        if "chat_loaded" not in st.session_state:
-            st.session_state.chat_messages = get_chat_history(user["id"]) or []
-            st.session_state.chat_loaded = True
+        # Load the most recent window ONCE per user; the session keeps a
+        # bounded buffer instead of the whole history
+        if st.session_state.get("chat_user") != user["id"]:
+            st.session_state.chat_messages = deque(
+                get_chat_history(user["id"], limit=CHAT_WINDOW),
+                maxlen=CHAT_BUFFER_SIZE
+            )
+            st.session_state.chat_earlier = deque(maxlen=CHAT_BUFFER_SIZE)
+            st.session_state.chat_detached = False
+            st.session_state.chat_user = user["id"]
+
+        window = list(st.session_state.chat_messages)[-CHAT_WINDOW:]
+        earlier = st.session_state.chat_earlier
+
+        # Older messages are paged in on demand and prepended to one
+        # contiguous, bounded buffer. Past the cap its newest end falls
+        # off; the latest window is then hidden rather than shown after
+        # a silent gap.
+        col1, col2 = st.columns(2)
+        if col1.button("⬆ Load earlier messages"):
+            known_ids = [m["id"] for m in (earlier or window) if m.get("id")]
+            before_id = min(known_ids) if known_ids else None
+            page = get_chat_history(user["id"], before_id=before_id, limit=CHAT_WINDOW)
+            if page:
+                if len(earlier) + len(page) > CHAT_BUFFER_SIZE:
+                    st.session_state.chat_detached = True
+                earlier.extendleft(reversed(page))
+            else:
+                st.caption("This is the beginning of your conversation.")
+
+        if earlier and col2.button("⬇ Back to latest"):
+            earlier.clear()
+            st.session_state.chat_detached = False
 
         # Display chat
-        for msg in st.session_state.chat_messages:
+        for msg in earlier:
+            with st.chat_message(msg["role"]):
+                st.write(msg["message"])
+
+        if st.session_state.chat_detached:
+            st.caption("Newer messages are hidden. Use ⬇ Back to latest to return.")
+            window = []
+        elif earlier:
+            st.divider()
+
+        for msg in window:
             with st.chat_message(msg["role"]):
                 st.write(msg["message"])
 
@@ -143,54 +291,76 @@ def employee_dashboard():
             st.session_state.last_message = user_input
 
             # Show user message immediately
-            st.session_state.chat_messages.append(
-                {"role": "user", "message": user_input}
-            )
+            user_msg = {"role": "user", "message": user_input}
+            st.session_state.chat_messages.append(user_msg)
+            with st.chat_message("user"):
+                st.write(user_input)
+
+            analyzer, chatbot = load_models()
 
             # Analyze stress
             score = analyzer.analyze_text(user_input)
 
-            # Generate AI response
-            # Generate AI response (WITH LIMITED MEMORY)
-            reply = chatbot.get_response(
-            user_message=user_input,
-            stress_score=score,
-            history=st.session_state.chat_messages
-             )
-
-            # Show assistant message
-            st.session_state.chat_messages.append(
-                {"role": "assistant", "message": reply}
+            # Recent turns that fit the token budget, older ones summarized
+            context = load_context_builder().build(
+                user["id"],
+                list(st.session_state.chat_messages)[:-1],
+                user_input
             )
 
-            # Save to database
-            save_chat_message(user["id"], "user", user_input)
-            save_chat_message(user["id"], "assistant", reply)
-            save_stress_log(user["id"], user_input, score)
-
-            if score >= 75:
-                create_alert(user["id"], score)
+            # Stream AI response token by token; write_stream returns the
+            # full text once the stream ends
+            with st.chat_message("assistant"):
+                reply = st.write_stream(chatbot.stream_response(
+                    user_message=user_input,
+                    stress_score=score,
+                    context=context
+                ))
+
+            # Keep assistant message
+            reply_msg = {"role": "assistant", "message": reply}
+            st.session_state.chat_messages.append(reply_msg)
+
+            # Save to database (one transaction per turn)
+            writer = load_checkin_writer()
+            if writer:
+                writer.submit(user["id"], user_input, reply, score)
+            else:
+                user_msg["id"], reply_msg["id"] = record_checkin(
+                    user["id"], user_input, reply, score
+                )
 
             st.rerun()
 
     # ===================== HISTORY =====================
     elif menu == "History":
 
+        import tempfile
+        from core.export import export_user_history
+
+        # Check-ins past the retention window live in the archive file
+        include_archived = st.toggle("Include archived check-ins")
+        logs = get_user_logs(user["id"], include_archived=include_archived)
+        df = pd.DataFrame(logs, columns=["timestamp","score"]) if logs else pd.DataFrame()
+
         if df.empty:
             st.info("No history available.")
         else:
             st.dataframe(df, use_container_width=True)
-            st.download_button(
-                "Download CSV",
-                df.to_csv(index=False),
-                "stress_history.csv"
-            )
+
+            # Streamed straight from SQLite rather than df.to_csv()
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as f:
+                export_user_history(user["id"], f, include_archived=include_archived)
+                f.seek(0)
+                st.download_button("Download CSV", f.read(), "stress_history.csv", mime="text/csv")
 
 # =====================================================
 # MANAGER DASHBOARD
 # =====================================================
 
 def manager_dashboard():
+    import pandas as pd
+    import plotly.express as px
 
     user = st.session_state.user
 
@@ -247,17 +417,38 @@ def manager_dashboard():
   
     else:
           st.info("No available employees to assign.")
+    # =====================================================
+    # PERIOD
+    # =====================================================
+
+    from datetime import datetime, timedelta
+
+    period = st.radio(
+        "Period",
+        list(TEAM_PERIODS),
+        index=list(TEAM_PERIODS).index("All time"),
+        horizontal=True
+    )
+    days, bucket = TEAM_PERIODS[period]
+    # Whole hours, so reruns within the hour share the query cache entry
+    since = (
+        (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:00:00")
+        if days else None
+    )
+
+    # One grouped query: members, headline metrics and alert counts
+    summary = get_manager_team_summary(user["id"], since=since)
+    members = summary["members"]
+
     # =====================================================
     # MY TEAM MEMBERS
     # =====================================================
 
     st.subheader("👥 My Team Members")
 
-    team_members = get_manager_team_members(user["id"])
-
-    if team_members:
-         team_df = pd.DataFrame(team_members, columns=["id", "username"])
-         st.dataframe(team_df[["username"]], use_container_width=True)
+    if members:
+         team_df = pd.DataFrame(members, columns=["username"])
+         st.dataframe(team_df, use_container_width=True)
     else:
          st.info("No employees in your team yet.")    
 
@@ -265,15 +456,10 @@ def manager_dashboard():
     # TEAM LOGS
     # =====================================================
 
-    logs = get_manager_team_logs(user["id"])
-
-    if not logs:
+    if not summary["total"]:
         st.info("No team reflections yet.")
         return
 
-    df = pd.DataFrame(logs, columns=["username","timestamp","score"])
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-
     # =====================================================
     # TEAM METRICS
     # =====================================================
@@ -282,10 +468,9 @@ def manager_dashboard():
 
     col1, col2, col3 = st.columns(3)
 
-    col1.metric("Total Reflections", len(df))
-    col2.metric("Avg Team Stress", round(df["score"].mean(), 1))
-    col3.metric("High Risk Employees",
-                len(df[df["score"] >= 70]["username"].unique()))
+    col1.metric("Total Reflections", summary["total"])
+    col2.metric("Avg Team Stress", summary["avg_stress"])
+    col3.metric("High Risk Employees", summary["high_risk"])
 
     # =====================================================
     # STRESS TREND
@@ -293,7 +478,15 @@ def manager_dashboard():
 
     st.subheader("📈 Stress Trend")
 
-    fig = px.line(df, x="timestamp", y="score", color="username")
+    trend = get_manager_team_trend(user["id"], bucket=bucket, since=since)
+
+    from core.dashboard import team_risk_frame, team_trend_frame
+    trend_df = team_trend_frame(trend)
+
+    fig = px.line(
+        trend_df, x="bucket", y="avg_score", color="username",
+        labels={"bucket": "timestamp", "avg_score": f"avg score per {bucket}"}
+    )
     st.plotly_chart(fig, use_container_width=True)
 
     # =====================================================
@@ -302,13 +495,10 @@ def manager_dashboard():
 
     st.subheader("🔥 Burnout Risk Employees")
 
-    risk_df = df[df["score"] >= 70]
+    risk_df = team_risk_frame(members)
 
     if not risk_df.empty:
-        st.dataframe(
-            risk_df.sort_values("score", ascending=False),
-            use_container_width=True
-        )
+        st.dataframe(risk_df, use_container_width=True)
     else:
         st.success("No high burnout risk employees 🎉")
 
@@ -318,12 +508,17 @@ def manager_dashboard():
 
     st.subheader("🚨 Active Alerts")
 
-    alerts = get_manager_team_alerts(user["id"])
+    alerts = (
+        get_manager_team_alerts(user["id"], limit=TEAM_ALERTS_SHOWN)
+        if summary["active_alerts"] else []
+    )
 
     if alerts:
+        if summary["active_alerts"] > len(alerts):
+            st.caption(f"Newest {len(alerts)} of {summary['active_alerts']} active alerts")
         alert_df = pd.DataFrame(
             alerts,
-            columns=["username","timestamp","score","severity","escalation_level"]
+            columns=["username","timestamp","score","severity","escalation_level","hits","last_triggered"]
         )
         st.dataframe(alert_df, use_container_width=True)
     else:
@@ -335,9 +530,9 @@ def manager_dashboard():
 
     st.subheader("🧠 Executive Wellness Summary")
 
-    avg_stress = round(df["score"].mean(), 1)
-    highest_stress = df["score"].max()
-    high_risk_count = len(risk_df["username"].unique())
+    avg_stress = summary["avg_stress"]
+    highest_stress = summary["max_stress"]
+    high_risk_count = summary["high_risk"]
 
     if avg_stress < 40:
         summary = "Team is emotionally stable with low overall stress levels."
@@ -348,46 +543,165 @@ def manager_dashboard():
 
     summary += f"\n\n• Average Stress: {avg_stress}"
     summary += f"\n• Highest Stress: {highest_stress}"
-    summary += f"\n• Employees Above 70: {high_risk_count}"
+    summary += f"\n• Employees Above {TEAM_RISK_SCORE}: {high_risk_count}"
 
     st.info(summary)
 # =====================================================
 # ADMIN DASHBOARD
 # =====================================================
 
+def system_health():
+    # Not linked anywhere: admins open the app with ?health=1
+    import pandas as pd
+    from core.audit import get_audit_logger
+    from core.database import connection_stats
+    from core.metrics import metrics_snapshot, render_prometheus, slow_queries
+    from core.query_cache import query_cache_stats
+
+    st.subheader("🩺 System Health")
+
+    calls = metrics_snapshot()
+    if calls:
+        st.dataframe(pd.DataFrame(calls).round(3), use_container_width=True, hide_index=True)
+    else:
+        st.info("No calls recorded yet.")
+
+    st.caption("Slow queries, newest first")
+    slow = slow_queries()
+    if slow:
+        st.dataframe(pd.DataFrame(slow), use_container_width=True, hide_index=True)
+    else:
+        st.success("No slow queries.")
+
+    _, chatbot = load_models()
+    stream = chatbot.stream_stats()
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.caption("Query cache")
+    col1.json(query_cache_stats())
+    col2.caption("Connections")
+    col2.json(connection_stats())
+    col3.caption("Audit logger")
+    col3.json(dict(get_audit_logger().stats))
+    col4.caption("LLM")
+    col4.json(dict(
+        chatbot.prompt_stats(),
+        streams=stream["streams"],
+        avg_ttft=stream["avg_ttft"],
+        avg_generation_time=stream["avg_generation_time"]
+    ))
+    if chatbot.response_cache is not None:
+        col4.caption("Response cache")
+        col4.json(chatbot.response_cache.stats())
+
+    st.download_button(
+        "Download Prometheus metrics", render_prometheus(), "stressguard.prom",
+        mime="text/plain"
+    )
+    st.divider()
+
 def admin_dashboard():
+    import plotly.graph_objects as go
+
     st.title("🌎 Organization Intelligence Panel")
     st.info("""
             Organization-wide emotional intelligence monitoring system.
             """)
-    logs = fetch_all_logs()
 
-    if not logs:
+    if st.query_params.get("health") == "1":
+        system_health()
+
+    metrics = get_org_metrics()
+
+    if not metrics["total"]:
         st.info("No data available.")
         return
 
-    df = pd.DataFrame(logs, columns=["timestamp","username","text","score"])
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-
     st.subheader("📊 Organization Metrics")
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Reflections", len(df))
-    col2.metric("Organization Avg Stress", round(df["score"].mean(),1))
-    col3.metric("Burnout Risk Users",
-                len(df[df["score"] >= 70]["username"].unique()))
-
-    fig = px.box(df, x="username", y="score")
+    col1.metric("Total Reflections", metrics["total"])
+    col2.metric("Organization Avg Stress", metrics["avg_stress"])
+    col3.metric("Burnout Risk Users", metrics["burnout_users"])
+
+    # Box plot from per-user quantiles of the score histograms
+    dist = get_user_score_distribution()
+    fig = go.Figure(go.Box(
+        x=[row["username"] for row in dist],
+        lowerfence=[row["min_score"] for row in dist],
+        q1=[row["q1"] for row in dist],
+        median=[row["median"] for row in dist],
+        q3=[row["q3"] for row in dist],
+        upperfence=[row["max_score"] for row in dist],
+    ))
+    fig.update_layout(xaxis_title="username", yaxis_title="score")
     st.plotly_chart(fig, use_container_width=True)
 
+    st.subheader("📤 Export")
+
+    col1, col2, col3 = st.columns(3)
+    dataset = col1.selectbox("Data", ["stress_logs", "alerts"])
+    dates = col2.date_input("Date range", value=())
+    fmt = col3.radio("Format", ["csv", "parquet"], horizontal=True)
+
+    # Built only on request: large exports stream to a spooled temp file
+    if st.button("Prepare export"):
+        import tempfile
+        from core.export import EXPORTS
+
+        start = dates[0] if len(dates) > 0 else None
+        end = dates[1] if len(dates) > 1 else start
+
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as f:
+            try:
+                rows = EXPORTS[dataset](f, fmt=fmt, start=start, end=end)
+            except RuntimeError as exc:
+                st.error(str(exc))
+            else:
+                f.seek(0)
+                st.download_button(
+                    f"Download {rows} rows",
+                    f.read(),
+                    f"{dataset}.{fmt}",
+                    mime="text/csv" if fmt == "csv" else "application/octet-stream"
+                )
+
     st.subheader("🔥 High Risk Employees")
 
-    risk_df = df[df["score"] >= 75]
-    if not risk_df.empty:
-        st.dataframe(risk_df.sort_values("score", ascending=False),
-                     use_container_width=True)
-    else:
+    # Keyset paging: each entry is the (score, id) cursor of a page start
+    if "risk_cursors" not in st.session_state:
+        st.session_state.risk_cursors = [None]
+
+    cursors = st.session_state.risk_cursors
+    page = get_high_risk_logs(after=cursors[-1], limit=RISK_PAGE_SIZE)
+
+    if not page and len(cursors) == 1:
         st.success("No critical alerts.")
+        return
+
+    from core.dashboard import high_risk_frame
+    st.dataframe(high_risk_frame(page), use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    if len(cursors) > 1 and col1.button("⬅ Previous"):
+        cursors.pop()
+        st.rerun()
+    if len(page) == RISK_PAGE_SIZE and col2.button("Next ➡"):
+        cursors.append((page[-1]["stress_score"], page[-1]["id"]))
+        st.rerun()
+    col3.caption(f"Page {len(cursors)}")
+
+    # Reflection text is only loaded for the row being opened
+    if page:
+        log_id = st.selectbox(
+            "Open reflection",
+            [row["id"] for row in page],
+            format_func=lambda i: next(
+                f"{row['timestamp']} · {row['username']} · {row['stress_score']}"
+                for row in page if row["id"] == i
+            )
+        )
+        st.write(get_log_text(log_id))
 
 # =====================================================
 # ROUTER
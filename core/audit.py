@@ -0,0 +1,197 @@
+import atexit
+import logging
+import threading
+from collections import deque
+
+from core.database import db_cursor, _now
+
+
+logger = logging.getLogger(__name__)
+
+AUDIT_VIEW = "audit_log_all"
+LEGACY_TABLE = "audit_logs"
+
+_partitions = set()
+_partitions_lock = threading.Lock()
+
+
+# =====================================================
+# MONTHLY PARTITIONS
+# =====================================================
+
+def partition_name(timestamp):
+    # "2026-10-16 09:30:00" -> audit_logs_202610
+    return f"{LEGACY_TABLE}_{timestamp[:4]}{timestamp[5:7]}"
+
+def list_partitions(cursor):
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name GLOB 'audit_logs_[0-9][0-9][0-9][0-9][0-9][0-9]'
+        ORDER BY name
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+def refresh_audit_view(cursor):
+    # The view unions the pre-partitioning table with every month. Each
+    # table numbers its own ids, so rows are keyed by (source_table, id).
+    selects = [
+        f"SELECT '{table}' AS source_table, id, timestamp, username, action FROM {table}"
+        for table in [LEGACY_TABLE] + list_partitions(cursor)
+    ]
+    cursor.execute(f"DROP VIEW IF EXISTS {AUDIT_VIEW}")
+    cursor.execute(f"CREATE VIEW {AUDIT_VIEW} AS " + "\nUNION ALL ".join(selects))
+
+def ensure_partition(cursor, table):
+    if table in _partitions:
+        return
+
+    with _partitions_lock:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                username TEXT NOT NULL,
+                action TEXT NOT NULL
+            )
+        """)
+        refresh_audit_view(cursor)
+
+def write_events(events):
+    # events: [(timestamp, username, action)], one transaction and one
+    # executemany per month touched
+    by_table = {}
+    for event in events:
+        by_table.setdefault(partition_name(event[0]), []).append(event)
+
+    with db_cursor() as cursor:
+        for table, rows in by_table.items():
+            ensure_partition(cursor, table)
+            cursor.executemany(f"""
+                INSERT INTO {table} (timestamp, username, action)
+                VALUES (?, ?, ?)
+            """, rows)
+
+    # Only remembered once committed, so a rollback can't hide a table
+    _partitions.update(by_table)
+
+def get_audit_logs(username=None, limit=100):
+    with db_cursor() as cursor:
+        if username:
+            cursor.execute(f"""
+                SELECT timestamp, username, action FROM {AUDIT_VIEW}
+                WHERE username=?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (username, limit))
+        else:
+            cursor.execute(f"""
+                SELECT timestamp, username, action FROM {AUDIT_VIEW}
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (limit,))
+
+        return cursor.fetchall()
+
+
+# =====================================================
+# BUFFERED LOGGER
+# =====================================================
+
+class AuditLogger:
+    # Collects audit events in memory and writes them in batches from a
+    # background thread, when `batch_size` events are waiting or every
+    # `flush_interval` seconds. Whatever is left is flushed at exit. At
+    # most `max_buffer` events are held, e.g. while the database is
+    # unavailable; past that the oldest are dropped and counted.
+
+    def __init__(self, batch_size=200, flush_interval=1.0, max_buffer=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.stats = {"logged": 0, "written": 0, "flushes": 0, "dropped": 0}
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stressguard-audit",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, username, action):
+        with self._lock:
+            if len(self._buffer) == self.max_buffer:
+                # The writer is stuck; never block the caller on it. The
+                # append below pushes out the oldest event
+                self.stats["dropped"] += 1
+            self._buffer.append((_now(), username, action))
+            self.stats["logged"] += 1
+            full = len(self._buffer) >= self.batch_size
+
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, deque(maxlen=self.max_buffer)
+            if not events:
+                return 0
+
+            try:
+                write_events(events)
+            except Exception:
+                logger.exception("Audit flush failed; keeping %d events", len(events))
+                with self._lock:
+                    # Back in front of what was logged meanwhile; the
+                    # oldest go if both no longer fit
+                    overflow = len(events) + len(self._buffer) - self.max_buffer
+                    events.extend(self._buffer)
+                    self._buffer = events
+                    if overflow > 0:
+                        self.stats["dropped"] += overflow
+                return 0
+
+            with self._lock:
+                self.stats["written"] += len(events)
+                self.stats["flushes"] += 1
+            return len(events)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    # -------------------------------------------------
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+_audit_logger = None
+_audit_logger_lock = threading.Lock()
+
+def get_audit_logger():
+    # Started on the first audited action, not at import
+    global _audit_logger
+    if _audit_logger is None:
+        with _audit_logger_lock:
+            if _audit_logger is None:
+                _audit_logger = AuditLogger()
+    return _audit_logger
@@ -0,0 +1,335 @@
+import json
+import platform
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from core import database as db
+
+
+# --scale -> (stress logs, employees)
+SCALES = {
+    "10k": (10_000, 100),
+    "1m": (1_000_000, 2_000),
+    "10m": (10_000_000, 10_000),
+}
+
+MIN_RUNS = 5
+MIN_SECONDS = 0.5         # keep repeating a case until both are reached
+FULL_SCAN_LIMIT = 2_000_000   # fetch_all_logs() is skipped above this
+SPARE_EMPLOYEES = 500     # fresh employees created at a time for assign_employee
+
+
+# =====================================================
+# CASES
+# =====================================================
+
+def _pick_subjects():
+    # Worst cases: the busiest employee and the biggest team
+    with db.db_cursor() as cursor:
+        cursor.execute("""
+            SELECT user_id FROM stress_daily_rollup
+            GROUP BY user_id ORDER BY SUM(score_count) DESC LIMIT 1
+        """)
+        employee = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT manager_id FROM manager_team
+            GROUP BY manager_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+        manager = cursor.fetchone()[0]
+        cursor.execute("SELECT username FROM users WHERE id=?", (employee,))
+        username = cursor.fetchone()[0]
+        cursor.execute("SELECT MAX(timestamp), MAX(id) FROM stress_logs")
+        last_timestamp, last_log = cursor.fetchone()
+    return employee, manager, username, last_timestamp, last_log
+
+def build_cases(logs):
+    # name -> zero-argument callable. Cached reads are timed through
+    # .uncached so the numbers are the SQL, not the query cache.
+    from core.dashboard import (
+        employee_chart_frame, high_risk_frame, team_risk_frame, team_trend_frame
+    )
+    from core.sentiment import StressAnalyzer
+    from core.synthetic import SYNTHETIC_PASSWORD, TEXTS
+
+    employee, manager, username, last_timestamp, last_log = _pick_subjects()
+    month_ago = (
+        datetime.fromisoformat(last_timestamp) - timedelta(days=30)
+    ).strftime("%Y-%m-%d %H:%M:%S")
+
+    # Writes land after the newest log so the alert engine sees them in order
+    clock = [datetime.fromisoformat(last_timestamp)]
+    def next_timestamp():
+        clock[0] += timedelta(minutes=1)
+        return clock[0].strftime("%Y-%m-%d %H:%M:%S")
+
+    counter = [0]
+    def next_number():
+        counter[0] += 1
+        return counter[0]
+
+    # assign_employee needs an employee nobody manages yet each call. They
+    # are inserted in blocks, so the setup lands in few of the timings.
+    spare = []
+    def unassigned_employee():
+        if not spare:
+            with db.db_cursor() as cursor:
+                for _ in range(SPARE_EMPLOYEES):
+                    cursor.execute("""
+                        INSERT INTO users (username, password, salt, role)
+                        VALUES (?, '', '', 'employee')
+                    """, (f"bench-spare{next_number()}",))
+                    spare.append(cursor.lastrowid)
+        return spare.pop()
+
+    texts = [text for band in TEXTS for text in band]
+    analyzer = StressAnalyzer(engine="lexicon", cache_size=0)
+    analyzer.analyze_text("warm up")
+    turn = [0]
+    def analyze():
+        turn[0] += 1
+        return analyzer.analyze_text(f"{texts[turn[0] % len(texts)]} {turn[0]}")
+
+    chat = db.get_chat_history(employee, limit=1)
+    last_message = chat[-1]["id"] if chat else 0
+    user_logs = db.get_user_logs.uncached(employee)
+    summary = db.get_manager_team_summary.uncached(manager)
+    trend = db.get_manager_team_trend.uncached(manager, "week")
+    risk_page = db.get_high_risk_logs.uncached(limit=25)
+
+    cases = {
+        # auth
+        "db.login_user": lambda: db.login_user(username, SYNTHETIC_PASSWORD),
+        # employee
+        "db.get_user_logs": lambda: db.get_user_logs.uncached(employee),
+        "db.get_weekly_stress": lambda: db.get_weekly_stress.uncached(employee),
+        "db.get_monthly_stress": lambda: db.get_monthly_stress.uncached(employee),
+        "db.get_chat_history": lambda: db.get_chat_history(employee),
+        "db.get_chat_summary": lambda: db.get_chat_summary(employee),
+        # manager
+        "db.get_manager_team_members": lambda: db.get_manager_team_members.uncached(manager),
+        "db.get_available_employees": lambda: db.get_available_employees.uncached(manager),
+        "db.get_manager_team_logs": lambda: db.get_manager_team_logs.uncached(manager),
+        "db.get_manager_team_summary": lambda: db.get_manager_team_summary.uncached(manager),
+        "db.get_manager_team_summary[30d]": lambda: db.get_manager_team_summary.uncached(
+            manager, since=month_ago
+        ),
+        "db.get_manager_team_trend[week]": lambda: db.get_manager_team_trend.uncached(
+            manager, "week"
+        ),
+        "db.get_manager_team_trend[hour,30d]": lambda: db.get_manager_team_trend.uncached(
+            manager, "hour", since=month_ago
+        ),
+        "db.get_manager_team_alerts[50]": lambda: db.get_manager_team_alerts.uncached(
+            manager, 50
+        ),
+        # admin
+        "db.get_org_metrics": lambda: db.get_org_metrics.uncached(),
+        "db.get_burnout_risk_users": lambda: db.get_burnout_risk_users.uncached(),
+        "db.get_user_score_distribution": lambda: db.get_user_score_distribution.uncached(),
+        "db.get_high_risk_logs": lambda: db.get_high_risk_logs.uncached(limit=25),
+        "db.get_all_alerts": lambda: db.get_all_alerts.uncached(),
+        "db.get_log_text": lambda: db.get_log_text(last_log),
+        # scoring
+        "sentiment.analyze_text": analyze,
+        # dashboard data prep
+        "dashboard.employee_chart_frame": lambda: employee_chart_frame(user_logs),
+        "dashboard.team_trend_frame": lambda: team_trend_frame(trend),
+        "dashboard.team_risk_frame": lambda: team_risk_frame(summary["members"]),
+        "dashboard.high_risk_frame": lambda: high_risk_frame(risk_page),
+    }
+
+    if logs <= FULL_SCAN_LIMIT:
+        cases["db.fetch_all_logs"] = db.fetch_all_logs
+
+    # Writes last, so every read above sees exactly the seeded data
+    cases.update({
+        "db.register_user": lambda: db.register_user(
+            f"bench-user{next_number()}", SYNTHETIC_PASSWORD, "employee"
+        ),
+        "db.assign_employee": lambda: db.assign_employee(unassigned_employee(), manager),
+        "db.save_chat_message": lambda: db.save_chat_message(employee, "user", "too much work"),
+        "db.save_chat_summary": lambda: db.save_chat_summary(
+            employee, f"Summary {next_number()}", last_message
+        ),
+        "db.log_action": lambda: db.log_action(username, "Benchmark"),
+        "db.record_checkin": lambda: db.record_checkin(
+            employee, "I feel overwhelmed", "Take a breath.", 80, next_timestamp()
+        ),
+        "db.save_stress_log": lambda: db.save_stress_log(employee, "too much work", 55),
+        "db.create_alert": lambda: db.create_alert(employee, 85),
+        # The first call closes every seeded alert; after that it is the
+        # steady-state sweep the app runs on a timer
+        "db.resolve_cooled_alerts": db.resolve_cooled_alerts,
+    })
+
+    # Full rebuilds, e.g. after an import
+    cases.update({
+        "db.backfill_stress_rollup": db.backfill_stress_rollup,
+        "db.rebuild_stress_state": db.rebuild_stress_state,
+    })
+    return cases
+
+
+# =====================================================
+# RUNNING
+# =====================================================
+
+def copy_database(source, target):
+    # The write cases change the data; runs work on a fresh copy so a
+    # seeded file gives the same starting point every time
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+def time_case(func, min_runs=MIN_RUNS, min_seconds=MIN_SECONDS):
+    # One untimed call first: lazy imports, first-use caches
+    func()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_runs or time.perf_counter() - started < min_seconds:
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "min_ms": timings[0] * 1000,
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+    }
+
+def run_benchmarks(scale, logs, cases, only=None, progress=None):
+    results = {}
+    for name, func in cases.items():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = time_case(func)
+        if progress:
+            progress(name, results[name])
+
+    return {
+        "meta": {
+            "scale": scale,
+            "logs": logs,
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+# =====================================================
+# CONNECTION POOL
+# =====================================================
+
+def build_pages():
+    # The uncached reads behind one render of each dashboard page
+    employee, manager, *_ = _pick_subjects()
+
+    def employee_page():
+        db.get_user_logs.uncached(employee)
+        db.get_weekly_stress.uncached(employee)
+        db.get_monthly_stress.uncached(employee)
+        db.get_chat_history(employee)
+        db.get_chat_summary(employee)
+
+    def manager_page():
+        db.get_manager_team_summary.uncached(manager)
+        db.get_manager_team_trend.uncached(manager, "week")
+        db.get_manager_team_alerts.uncached(manager, 50)
+        db.get_available_employees.uncached(manager)
+
+    def admin_page():
+        db.get_org_metrics.uncached()
+        db.get_user_score_distribution.uncached()
+        db.get_high_risk_logs.uncached(limit=25)
+
+    return {"employee": employee_page, "manager": manager_page, "admin": admin_page}
+
+@contextmanager
+def connection_mode(pooled):
+    # Counts connections opened. pooled=False closes every connection
+    # after its unit of work, i.e. a fresh connection (and PRAGMA setup)
+    # per db_cursor() as before the pool.
+    opened = [0]
+    lock = threading.Lock()
+    connect, release = db.get_connection, db._release
+
+    def counting_connect():
+        with lock:
+            opened[0] += 1
+        return connect()
+
+    db.close_all_connections()
+    db.get_connection = counting_connect
+    if not pooled:
+        db._release = lambda conn: conn.close()
+    try:
+        yield opened
+    finally:
+        db.get_connection, db._release = connect, release
+        db.close_all_connections()
+
+def time_pages(pages, renders, threads, pooled):
+    # Each page rendered `renders` times by `threads` concurrent callers
+    results = {}
+    with connection_mode(pooled) as opened:
+        for name, page in pages.items():
+            page()
+            opened_before = opened[0]
+            checkouts_before = db.connection_stats()["checkouts"]
+
+            def render(_):
+                start = time.perf_counter()
+                page()
+                return time.perf_counter() - start
+
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                timings = sorted(pool.map(render, range(renders)))
+
+            results[name] = {
+                "connections_per_render": (opened[0] - opened_before) / renders,
+                "checkouts_per_render": (
+                    db.connection_stats()["checkouts"] - checkouts_before
+                ) / renders,
+                "p50_ms": timings[len(timings) // 2] * 1000,
+                "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+            }
+    return results
+
+
+# =====================================================
+# RESULTS
+# =====================================================
+
+def save_results(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare_results(baseline, current, tolerance=0.2):
+    # [(name, old_ms, new_ms, change)] on median time, plus the names
+    # slower than baseline by more than `tolerance`
+    rows, regressions = [], []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        change = result["median_ms"] / old["median_ms"] - 1 if old["median_ms"] else 0.0
+        rows.append((name, old["median_ms"], result["median_ms"], change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
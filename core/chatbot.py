@@ -1,26 +1,62 @@
 import streamlit as st
-from groq import Groq
 import os
+import threading
+import time
+from contextlib import closing
+
+from core.context import count_messages
+from core.llm_client import AsyncLLMClient, CircuitBreaker, LLMClient
+from core.metrics import timed
+
+
+MODEL = "llama-3.1-8b-instant"
+
+CONFIG_ERROR_MESSAGE = "AI configuration error. Please check GROQ_API_KEY."
+FALLBACK_MESSAGE = "I'm having a small technical issue right now. Please try again in a moment."
 
 
 class WellnessChatbot:
 
-    def __init__(self):
-        try:
-            self.client = Groq(api_key=st.secrets["GROQ_API_KEY"])
-        except Exception:
-            self.client = None
+    def __init__(self, client=None, async_client=None, response_cache=None):
+        self.client = client
+        self.async_client = async_client
+        self.response_cache = response_cache
 
-    def get_response(self, user_message, stress_score, history=None):
+        if client is None:
+            try:
+                api_key = st.secrets["GROQ_API_KEY"]
+            except Exception:
+                api_key = None
 
-        if not self.client:
-            return "AI configuration error. Please check GROQ_API_KEY."
+            if api_key:
+                # Sync and async callers share one view of provider health
+                breaker = CircuitBreaker()
+                base_url = os.environ.get("GROQ_BASE_URL")
+                self.client = LLMClient(api_key, base_url=base_url, breaker=breaker)
+                self.async_client = async_client or AsyncLLMClient(
+                    api_key, base_url=base_url, breaker=breaker
+                )
 
+        # Shared by every session through load_models(), so guard updates
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            "streams": 0,
+            "first_tokens": 0,
+            "last_ttft": None,
+            "last_generation_time": None,
+            "total_ttft": 0.0,
+            "total_generation_time": 0.0,
+            "prompts": 0,
+            "last_prompt_tokens": None,
+            "total_prompt_tokens": 0,
+            "max_prompt_tokens": 0
+        }
+
+    def _recent_history(self, history):
         # 🔒 Limit memory to last 6 messages only
-        if history:
-            history = history[-6:]
-        else:
-            history = []
+        return history[-6:] if history else []
+
+    def _build_messages(self, user_message, stress_score, history, summary=None):
 
         # 🧠 Emotion-aware system prompt
         system_prompt = f"""
@@ -40,6 +76,13 @@ Keep response under 200 words.
 
         messages = [{"role": "system", "content": system_prompt}]
 
+        # Turns that no longer fit the token budget, condensed
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of earlier conversation:\n{summary}"
+            })
+
         # Add memory safely
         for msg in history:
             messages.append({
@@ -53,17 +96,189 @@ Keep response under 200 words.
             "content": user_message
         })
 
+        return messages
+
+    def _completion_args(self, messages):
+        return dict(
+            model=MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=250,   # 🔥 critical for stability
+            top_p=0.9
+        )
+
+    def _prompt(self, user_message, stress_score, history, context):
+        # A core.context.Context replaces the fixed last-6 window with
+        # token-budgeted turns plus the rolling summary
+        if context is not None:
+            messages = self._build_messages(
+                user_message, stress_score, context.turns, context.summary
+            )
+        else:
+            messages = self._build_messages(
+                user_message, stress_score, self._recent_history(history)
+            )
+
+        self._record_prompt(count_messages(messages))
+        return messages
+
+    def _cache_key(self, user_message, stress_score, history, context=None):
+        if self.response_cache is None:
+            return None
+        if context is not None:
+            # Replies that depend on a summary are too specific to reuse
+            if context.summary:
+                return None
+            history = context.turns
+        else:
+            history = self._recent_history(history)
+        return self.response_cache.key(user_message, stress_score, history)
+
+    @timed("chatbot.get_response")
+    def get_response(self, user_message, stress_score, history=None, context=None):
+
+        if not self.client:
+            return CONFIG_ERROR_MESSAGE
+
+        cache_key = self._cache_key(user_message, stress_score, history, context)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        messages = self._prompt(user_message, stress_score, history, context)
+
         try:
+            start = time.perf_counter()
             completion = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=250,   # 🔥 critical for stability
-                top_p=0.9
+                **self._completion_args(messages)
+            )
+            reply = completion.choices[0].message.content
+
+            if cache_key and reply:
+                self.response_cache.put(cache_key, reply, time.perf_counter() - start)
+
+            return reply
+
+        except Exception:
+            # 🛡 Safe fallback (includes an open circuit)
+            return FALLBACK_MESSAGE
+
+    @timed("chatbot.aget_response")
+    async def aget_response(self, user_message, stress_score, history=None, context=None):
+        # Same contract as get_response, for asyncio callers
+
+        if not self.async_client:
+            return CONFIG_ERROR_MESSAGE
+
+        cache_key = self._cache_key(user_message, stress_score, history, context)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        messages = self._prompt(user_message, stress_score, history, context)
+
+        try:
+            start = time.perf_counter()
+            completion = await self.async_client.chat.completions.create(
+                **self._completion_args(messages)
             )
+            reply = completion.choices[0].message.content
+
+            if cache_key and reply:
+                self.response_cache.put(cache_key, reply, time.perf_counter() - start)
+
+            return reply
+
+        except Exception:
+            # 🛡 Safe fallback (includes an open circuit)
+            return FALLBACK_MESSAGE
 
-            return completion.choices[0].message.content
+    @timed("chatbot.stream_response")
+    def stream_response(self, user_message, stress_score, history=None, context=None):
+        # Yields the reply as text deltas (for st.write_stream) and records
+        # time-to-first-token and total generation time when done
+
+        if not self.client:
+            yield CONFIG_ERROR_MESSAGE
+            return
+
+        cache_key = self._cache_key(user_message, stress_score, history, context)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        messages = self._prompt(user_message, stress_score, history, context)
+
+        start = time.perf_counter()
+        ttft = None
+        parts = []
+
+        try:
+            # Closed even when the reader stops early
+            with closing(self.client.chat.completions.create(
+                stream=True,
+                **self._completion_args(messages)
+            )) as stream:
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(delta)
+                    yield delta
+
+            if cache_key and parts:
+                self.response_cache.put(cache_key, "".join(parts), time.perf_counter() - start)
 
         except Exception:
-            # 🛡 Safe fallback
-            return "I'm having a small technical issue right now. Please try again in a moment."
\ No newline at end of file
+            # 🛡 Safe fallback, also if the stream breaks half-way
+            yield FALLBACK_MESSAGE if ttft is None else "\n\n" + FALLBACK_MESSAGE
+
+        finally:
+            self._record_stream(ttft, time.perf_counter() - start)
+
+    def _record_stream(self, ttft, generation_time):
+        with self._metrics_lock:
+            m = self.metrics
+            m["streams"] += 1
+            m["last_ttft"] = ttft
+            m["last_generation_time"] = generation_time
+            if ttft is not None:
+                m["first_tokens"] += 1
+                m["total_ttft"] += ttft
+            m["total_generation_time"] += generation_time
+
+    def _record_prompt(self, tokens):
+        with self._metrics_lock:
+            m = self.metrics
+            m["prompts"] += 1
+            m["last_prompt_tokens"] = tokens
+            m["total_prompt_tokens"] += tokens
+            m["max_prompt_tokens"] = max(m["max_prompt_tokens"], tokens)
+
+    def prompt_stats(self):
+        with self._metrics_lock:
+            m = self.metrics
+            return {
+                "prompts": m["prompts"],
+                "last_prompt_tokens": m["last_prompt_tokens"],
+                "max_prompt_tokens": m["max_prompt_tokens"],
+                "avg_prompt_tokens": (
+                    m["total_prompt_tokens"] / m["prompts"] if m["prompts"] else None
+                )
+            }
+
+    def stream_stats(self):
+        with self._metrics_lock:
+            m = dict(self.metrics)
+
+        m["avg_ttft"] = m["total_ttft"] / m["first_tokens"] if m["first_tokens"] else None
+        m["avg_generation_time"] = (
+            m["total_generation_time"] / m["streams"] if m["streams"] else None
+        )
+        return m
@@ -0,0 +1,158 @@
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from core.database import get_chat_history, get_chat_summary, save_chat_summary
+
+
+TOKEN_BUDGET = 800        # summary + recent turns + new message
+SUMMARY_BUDGET = 200      # cap on the rolling summary itself
+FOLD_BATCH = 8            # fold dropped turns in groups, not every turn
+FOLD_MAX = 64             # most messages folded in a single turn
+MESSAGE_OVERHEAD = 4      # role/separator tokens per chat message
+SUMMARY_LINE_CHARS = 160
+
+Context = namedtuple("Context", ["turns", "summary", "tokens"])
+
+# Roughly BPE-sized pieces: short word chunks and single punctuation
+_APPROX_TOKEN = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+# =====================================================
+# TOKEN COUNTING
+# =====================================================
+
+class Tokenizer:
+    # Uses a local Hugging Face tokenizer when STRESSGUARD_TOKENIZER_DIR
+    # points at one (no downloads); otherwise a regex approximation that
+    # stays within a few percent of llama-style tokenizers on chat text.
+
+    def __init__(self, model_dir=None):
+        self.model_dir = model_dir or os.environ.get("STRESSGUARD_TOKENIZER_DIR")
+        self._hf = None
+        if self.model_dir:
+            from transformers import AutoTokenizer
+            self._hf = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True)
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self._hf is not None:
+            return len(self._hf.encode(text, add_special_tokens=False))
+        return len(_APPROX_TOKEN.findall(text))
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    return Tokenizer()
+
+
+def count_messages(messages, tokenizer=None):
+    # Prompt size of an OpenAI-style messages list
+    tokenizer = tokenizer or get_tokenizer()
+    return sum(tokenizer.count(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+# =====================================================
+# CONTEXT BUILDER
+# =====================================================
+
+def summary_line(msg):
+    # Extractive: first sentence of what the user said, trimmed
+    text = " ".join(msg["message"].split())
+    text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "…"
+    return "- " + text
+
+
+class ContextBuilder:
+    # Packs the newest turns that fit the token budget and keeps a
+    # rolling per-user summary (chat_summaries) of the turns before them.
+    # The summary is only touched once at least `fold_batch` dropped
+    # messages have piled up, and whether they have is answered from the
+    # session history where possible, so most turns do a single keyed
+    # read (the summary row).
+
+    def __init__(self, token_budget=TOKEN_BUDGET, summary_budget=SUMMARY_BUDGET,
+                 fold_batch=FOLD_BATCH, tokenizer=None):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.fold_batch = fold_batch
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def build(self, user_id, history, user_message):
+        count = self.tokenizer.count
+
+        row = get_chat_summary(user_id)
+        summary = row["summary"] if row else ""
+        covered = row["last_message_id"] if row else 0
+
+        # Room for the summary is reserved even before it exists, so a
+        # fold below can never push the prompt over budget
+        budget = (self.token_budget - count(user_message) - MESSAGE_OVERHEAD
+                  - self.summary_budget - MESSAGE_OVERHEAD)
+
+        turns, used = [], 0
+        for msg in reversed(history or []):
+            cost = count(msg["message"]) + MESSAGE_OVERHEAD
+            if used + cost > budget:
+                break
+            turns.append(msg)
+            used += cost
+        turns.reverse()
+
+        # Everything older than the first kept turn is out of the prompt
+        boundary = self._boundary(history, turns)
+        if boundary is not None:
+            dropped = (history or [])[:len(history or []) - len(turns)]
+            pending = self._pending(user_id, covered, boundary, dropped)
+            if len(pending) >= self.fold_batch:
+                summary = self._fold(user_id, summary, pending)
+
+        tokens = used + count(user_message) + MESSAGE_OVERHEAD
+        if summary:
+            tokens += count(summary) + MESSAGE_OVERHEAD
+
+        return Context(turns, summary or None, tokens)
+
+    def _boundary(self, history, turns):
+        # id of the oldest message still in the prompt; None when turns
+        # haven't been saved yet (write-behind) so nothing can be folded
+        if turns:
+            return turns[0].get("id")
+        for msg in reversed(history or []):
+            if msg.get("id") is not None:
+                return msg["id"] + 1
+        return None
+
+    def _pending(self, user_id, covered, boundary, dropped):
+        # Saved messages after the summary and before the prompt. Chat ids
+        # are shared by all users, so boundary - covered only bounds their
+        # number; the session history is exact once it reaches back to the
+        # summary with every message saved. Otherwise ask the database.
+        if boundary - covered - 1 < self.fold_batch:
+            return []
+
+        ids = [msg.get("id") for msg in dropped]
+        if ids and None not in ids and ids[0] <= covered:
+            return [msg for msg in dropped if msg["id"] > covered][-FOLD_MAX:]
+
+        return [
+            msg for msg in get_chat_history(user_id, before_id=boundary, limit=FOLD_MAX)
+            if msg["id"] > covered
+        ]
+
+    def _fold(self, user_id, summary, pending):
+        lines = summary.splitlines() if summary else []
+        lines.extend(summary_line(msg) for msg in pending if msg["role"] == "user")
+
+        # Oldest lines fall off first
+        while lines and self.tokenizer.count("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+
+        summary = "\n".join(lines)
+        save_chat_summary(user_id, summary, pending[-1]["id"])
+        return summary
@@ -0,0 +1,54 @@
+from core.database import TEAM_RISK_SCORE
+from core.downsample import downsample_rows, point_budget
+
+
+# Data prep behind each dashboard chart/table, kept out of app.py so
+# `manage.py bench` times exactly what the pages run. pandas is
+# imported on first use, like everywhere else.
+
+def employee_chart_frame(logs):
+    # At most ~one point per 2px of chart width; spikes always kept
+    import pandas as pd
+
+    points = downsample_rows(logs)
+    chart_df = pd.DataFrame(points, columns=["timestamp", "score"])
+    chart_df["timestamp"] = pd.to_datetime(chart_df["timestamp"])
+    return chart_df
+
+def team_trend_frame(trend):
+    # Split the chart's point budget across employees' lines
+    import pandas as pd
+
+    series = {}
+    for row in trend:
+        series.setdefault(row["username"], []).append((row["bucket"], row["avg_score"], row["n"]))
+    per_series = max(20, point_budget() // max(len(series), 1))
+
+    trend_df = pd.DataFrame(
+        [
+            (username, *point)
+            for username, points in series.items()
+            for point in downsample_rows(points, per_series, spike_score=TEAM_RISK_SCORE)
+        ],
+        columns=["username", "bucket", "avg_score", "n"]
+    )
+    trend_df["bucket"] = pd.to_datetime(trend_df["bucket"])
+    return trend_df
+
+def team_risk_frame(members):
+    import pandas as pd
+
+    risk_df = pd.DataFrame(
+        [m for m in members if (m["max_score"] or 0) >= TEAM_RISK_SCORE],
+        columns=["username", "max_score", "avg_stress", "n", "last_seen", "active_alerts"]
+    ).rename(columns={"max_score": "peak score", "n": "reflections"})
+    return risk_df.sort_values("peak score", ascending=False)
+
+def high_risk_frame(page):
+    import pandas as pd
+
+    risk_df = pd.DataFrame(
+        [dict(row) for row in page],
+        columns=["id", "timestamp", "username", "stress_score"]
+    ).rename(columns={"stress_score": "score"})
+    return risk_df.drop(columns=["id"])
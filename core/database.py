@@ -1,38 +1,189 @@
 import sqlite3
 import hashlib
+import logging
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import groupby
 
+from core.metrics import ENABLED as METRICS_ENABLED, TimedCursor, instrument_module, registry
+from core.query_cache import bump, cached, invalidate_all, query_cache_stats
+
+
+logger = logging.getLogger(__name__)
 
 DB_NAME = os.path.join(os.getcwd(), "stressguard.db")
 
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+
+# Applied once per connection, not once per query
+PRAGMAS = (
+    # Only takes effect on a new, empty file; older databases switch with
+    # core.retention.enable_incremental_vacuum()
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+)
+
 
 # =====================================================
 # CONNECTION
 # =====================================================
 
-def get_connection():
+def get_db_path():
+    if os.environ.get("STRESSGUARD_DB_PATH"):
+        return os.environ["STRESSGUARD_DB_PATH"]
+
     # Persistent path for Streamlit Cloud
     if os.path.exists("/mount/data"):
-        db_path = "/mount/data/stressguard.db"
-    else:
-        db_path = "stressguard.db"
+        return "/mount/data/stressguard.db"
+
+    return "stressguard.db"
 
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row  
-    conn.execute("PRAGMA foreign_keys = ON")
+def get_connection():
+    conn = sqlite3.connect(
+        get_db_path(),
+        check_same_thread=False,
+        timeout=BUSY_TIMEOUT_MS / 1000
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_local = threading.local()
+_stats = {"opened": 0, "checkouts": 0}
+_stats_lock = threading.Lock()
+
+def _acquire():
+    with _stats_lock:
+        _stats["checkouts"] += 1
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        with _stats_lock:
+            _stats["opened"] += 1
+        return get_connection()
+
+def _release(conn):
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+def _cursor(conn):
+    # Timed cursors feed the db.query histogram and the slow-query log
+    return TimedCursor(conn.cursor()) if METRICS_ENABLED else conn.cursor()
+
+@contextmanager
+def db_cursor():
+    # Nested calls on the same thread join the outer unit of work
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield _cursor(conn)
+        return
+
+    conn = _acquire()
+    _local.conn = conn
+    _local.after_commit = []
+    try:
+        yield _cursor(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        callbacks = _local.after_commit
+        _local.conn = None
+        _local.after_commit = None
+        _release(conn)
+
+    for callback in callbacks:
+        callback()
+
+def after_commit(callback):
+    # Runs once the current (outermost) transaction commits, never on
+    # rollback; immediately when no transaction is open on this thread
+    pending = getattr(_local, "after_commit", None)
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+def _touch_user(cursor, user_id):
+    # A user's data changed: invalidate cached reads for them, every team
+    # they belong to and org-wide views, once the write is committed
+    cursor.execute("SELECT manager_id FROM manager_team WHERE employee_id=?", (user_id,))
+    scopes = [("user", user_id), ("org",)]
+    scopes += [("team", row[0]) for row in cursor.fetchall()]
+    after_commit(lambda: bump(*scopes))
+
+def close_all_connections():
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+def connection_stats():
+    with _stats_lock:
+        return dict(_stats, pooled=_pool.qsize())
+
 # =====================================================
-# INITIALIZE DATABASE
+# SCHEMA MIGRATIONS
 # =====================================================
 
-def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # USERS
-    cursor.execute("""
+ROLLUP_BACKFILL_SQL = """
+    INSERT INTO stress_daily_rollup
+        (user_id, day, score_count, score_sum, score_min, score_max)
+    SELECT user_id, substr(timestamp, 1, 10),
+           COUNT(*), SUM(stress_score), MIN(stress_score), MAX(stress_score)
+    FROM stress_logs
+    GROUP BY user_id, substr(timestamp, 1, 10)
+"""
+
+# Adds pre-aggregated (user_id, day, count, sum, min, max) rows
+ROLLUP_MERGE_SQL = """
+    INSERT INTO stress_daily_rollup
+        (user_id, day, score_count, score_sum, score_min, score_max)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, day) DO UPDATE SET
+        score_count = score_count + excluded.score_count,
+        score_sum = score_sum + excluded.score_sum,
+        score_min = MIN(score_min, excluded.score_min),
+        score_max = MAX(score_max, excluded.score_max)
+"""
+
+HISTOGRAM_BACKFILL_SQL = """
+    INSERT INTO stress_score_histogram (user_id, score, score_count)
+    SELECT user_id, stress_score, COUNT(*)
+    FROM stress_logs
+    GROUP BY user_id, stress_score
+"""
+
+# Adds (user_id, score, count) rows
+HISTOGRAM_MERGE_SQL = """
+    INSERT INTO stress_score_histogram (user_id, score, score_count)
+    VALUES (?, ?, ?)
+    ON CONFLICT(user_id, score) DO UPDATE SET
+        score_count = score_count + excluded.score_count
+"""
+
+# Each entry bumps PRAGMA user_version by one. Never edit a shipped
+# migration - append a new one instead.
+MIGRATIONS = [
+    # 1: base schema
+    [
+        """
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE NOT NULL,
@@ -40,10 +191,8 @@ def init_db():
             salt TEXT NOT NULL,
             role TEXT NOT NULL CHECK(role IN ('employee','manager','admin'))
         )
-    """)
-
-    # STRESS LOGS
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS stress_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -52,10 +201,8 @@ def init_db():
             stress_score INTEGER NOT NULL,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
         )
-    """)
-
-    # CHAT HISTORY
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS chat_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -64,22 +211,18 @@ def init_db():
             message TEXT NOT NULL,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
         )
-    """)
-
-    # MANAGER TEAM
-    cursor.execute("""
-         CREATE TABLE IF NOT EXISTS manager_team (
-             id INTEGER PRIMARY KEY AUTOINCREMENT,
-             manager_id INTEGER NOT NULL,
-              employee_id INTEGER NOT NULL,
-              UNIQUE(manager_id, employee_id),
-             FOREIGN KEY(manager_id) REFERENCES users(id) ON DELETE CASCADE,
-             FOREIGN KEY(employee_id) REFERENCES users(id) ON DELETE CASCADE
-         )
-     """)
-
-    # ALERTS
-    cursor.execute("""
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS manager_team (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            manager_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            UNIQUE(manager_id, employee_id),
+            FOREIGN KEY(manager_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(employee_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        """
         CREATE TABLE IF NOT EXISTS alerts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -90,20 +233,214 @@ def init_db():
             resolved INTEGER DEFAULT 0,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
         )
-    """)
-
-    # AUDIT LOGS
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS audit_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
             username TEXT NOT NULL,
             action TEXT NOT NULL
         )
-    """)
+        """,
+    ],
+    # 2: indexes for the per-user / per-team hot paths
+    [
+        "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+        "CREATE INDEX IF NOT EXISTS idx_stress_logs_user_ts ON stress_logs(user_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_stress_logs_ts ON stress_logs(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history(user_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_user_resolved ON alerts(user_id, resolved)",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_resolved ON alerts(resolved)",
+        "CREATE INDEX IF NOT EXISTS idx_manager_team_employee ON manager_team(employee_id)",
+    ],
+    # 3: per-user daily stress rollup, backfilled from existing logs
+    [
+        """
+        CREATE TABLE IF NOT EXISTS stress_daily_rollup (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            score_count INTEGER NOT NULL,
+            score_sum INTEGER NOT NULL,
+            score_min INTEGER NOT NULL,
+            score_max INTEGER NOT NULL,
+            PRIMARY KEY(user_id, day),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+        ROLLUP_BACKFILL_SQL,
+    ],
+    # 4: keyset index for the admin high-risk table
+    [
+        "CREATE INDEX IF NOT EXISTS idx_stress_logs_score_id ON stress_logs(stress_score, id)",
+    ],
+    # 5: rolling per-user summary of chat turns that fell out of the prompt
+    [
+        """
+        CREATE TABLE IF NOT EXISTS chat_summaries (
+            user_id INTEGER PRIMARY KEY,
+            summary TEXT NOT NULL,
+            last_message_id INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+    ],
+    # 6: audit events moved to monthly audit_logs_YYYYMM tables (see
+    # core/audit.py); the view is rebuilt as partitions appear
+    [
+        """
+        CREATE VIEW IF NOT EXISTS audit_log_all AS
+        SELECT id, timestamp, username, action FROM audit_logs
+        """,
+    ],
+    # 7: resumable bulk imports (core/importer.py)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            rows_done INTEGER NOT NULL,
+            imported INTEGER NOT NULL,
+            skipped INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+    ],
+    # 8: alert engine - one open alert per user, repeats merged into it
+    [
+        "ALTER TABLE alerts ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE alerts ADD COLUMN last_triggered TEXT",
+        "ALTER TABLE alerts ADD COLUMN resolved_at TEXT",
+        "UPDATE alerts SET last_triggered = timestamp",
+        """
+        CREATE TABLE IF NOT EXISTS alert_state (
+            user_id INTEGER PRIMARY KEY,
+            alert_id INTEGER NOT NULL,
+            last_triggered TEXT NOT NULL,
+            high_streak INTEGER NOT NULL,
+            peak_score INTEGER NOT NULL,
+            escalation_level INTEGER NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_alert_state_last ON alert_state(last_triggered)",
+        # Newest unresolved alert per user becomes the open one (SQLite
+        # takes the bare columns from the MAX(id) row)
+        """
+        INSERT OR IGNORE INTO alert_state
+            (user_id, alert_id, last_triggered, high_streak, peak_score, escalation_level)
+        SELECT user_id, MAX(id), timestamp, 1, stress_score, escalation_level
+        FROM alerts
+        WHERE resolved = 0
+        GROUP BY user_id
+        """,
+    ],
+    # 9: per-user time-decayed stress average, kept up to date on write;
+    # existing logs are folded in by `manage.py rebuild-stress-state`
+    [
+        """
+        CREATE TABLE IF NOT EXISTS user_stress_state (
+            user_id INTEGER PRIMARY KEY,
+            ewma REAL NOT NULL,
+            ewvar REAL NOT NULL,
+            weight REAL NOT NULL,
+            last_seen TEXT NOT NULL,
+            streak INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_user_stress_state_ewma ON user_stress_state(ewma)",
+    ],
+    # 10: fold the existing logs into user_stress_state; 9 left it empty,
+    # so burnout flags stayed blank after an upgrade. Steps may be
+    # callables taking the cursor when plain SQL cannot do the work.
+    [
+        lambda cursor: _rebuild_stress_state(cursor),
+    ],
+    # 11: 8 only tracked the newest unresolved alert per user; the older
+    # duplicates are folded into its hit_count and closed
+    [
+        """
+        UPDATE alerts
+        SET hit_count = hit_count + (
+            SELECT COALESCE(SUM(d.hit_count), 0)
+            FROM alerts d
+            WHERE d.user_id = alerts.user_id AND d.resolved = 0 AND d.id < alerts.id
+        )
+        WHERE id IN (SELECT alert_id FROM alert_state)
+        """,
+        """
+        UPDATE alerts
+        SET resolved = 1, resolved_at = COALESCE(last_triggered, timestamp)
+        WHERE resolved = 0 AND id NOT IN (SELECT alert_id FROM alert_state)
+        """,
+    ],
+    # 12: per-user count of each stress score, kept up to date on write
+    # and never archived, like the daily rollup; the box plots read
+    # their quantiles from it instead of ranking every log
+    [
+        """
+        CREATE TABLE IF NOT EXISTS stress_score_histogram (
+            user_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            score_count INTEGER NOT NULL,
+            PRIMARY KEY(user_id, score),
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+        HISTOGRAM_BACKFILL_SQL,
+        lambda cursor: cursor.executemany(HISTOGRAM_MERGE_SQL, _archived_histogram()),
+    ],
+    # 13: every audit partition numbers its ids from 1, so ids repeat in
+    # audit_log_all; the view gains source_table to key rows with
+    [
+        lambda cursor: _refresh_audit_view(cursor),
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_migrated = False
+_migrate_lock = threading.Lock()
+
+def get_schema_version():
+    with db_cursor() as cursor:
+        return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate():
+    with db_cursor() as cursor:
+        # Take the write lock before reading the version so two processes
+        # starting together cannot apply the same migration twice
+        cursor.execute("BEGIN IMMEDIATE")
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+        for number, statements in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(cursor)
+                else:
+                    cursor.execute(statement)
+            cursor.execute(f"PRAGMA user_version = {number}")
+
+    return SCHEMA_VERSION
+
+# =====================================================
+# INITIALIZE DATABASE
+# =====================================================
 
-    conn.commit()
-    conn.close()
+def init_db():
+    # Streamlit re-executes app.py on every rerun; only the first call in
+    # the process touches the schema
+    global _migrated
+    if _migrated:
+        return
+
+    with _migrate_lock:
+        if not _migrated:
+            migrate()
+            _migrated = True
 
 # =====================================================
 # PASSWORD SECURITY
@@ -120,32 +457,27 @@ def hash_password(password, salt):
 # =====================================================
 
 def register_user(username, password, role):
-    conn = get_connection()
-    cursor = conn.cursor()
     role = role.strip().lower() 
     salt = generate_salt()
     hashed = hash_password(password, salt)
 
     try:
-        cursor.execute("""
-            INSERT INTO users (username, password, salt, role)
-            VALUES (?, ?, ?, ?)
-        """, (username, hashed, salt, role))
-        conn.commit()
-        log_action(username, "User Registered")
-        return True
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO users (username, password, salt, role)
+                VALUES (?, ?, ?, ?)
+            """, (username, hashed, salt, role))
+            after_commit(lambda: bump(("org",)))
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
-def login_user(username, password):
-    conn = get_connection()
-    cursor = conn.cursor()
+    log_action(username, "User Registered")
+    return True
 
-    cursor.execute("SELECT * FROM users WHERE username=?", (username,))
-    user = cursor.fetchone()
-    conn.close()
+def login_user(username, password):
+    with db_cursor() as cursor:
+        cursor.execute("SELECT * FROM users WHERE username=?", (username,))
+        user = cursor.fetchone()
 
     if user and hash_password(password, user["salt"]) == user["password"]:
         log_action(username, "User Logged In")
@@ -162,311 +494,788 @@ def login_user(username, password):
 # =====================================================
 
 def log_action(username, action):
-    conn = get_connection()
-    cursor = conn.cursor()
+    # Buffered and written in batches to monthly partitions
+    from core.audit import get_audit_logger
+    get_audit_logger().log(username, action)
 
-    cursor.execute("""
-        INSERT INTO audit_logs (timestamp, username, action)
-        VALUES (?, ?, ?)
-    """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), username, action))
-
-    conn.commit()
-    conn.close()
+def _refresh_audit_view(cursor):
+    from core.audit import refresh_audit_view
+    refresh_audit_view(cursor)
 
 # =====================================================
 # CHAT SYSTEM
 # =====================================================
 
-def save_chat_message(user_id, role, message):
-    conn = get_connection()
-    cursor = conn.cursor()
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+def _insert_chat_message(cursor, user_id, role, message, timestamp):
     cursor.execute("""
         INSERT INTO chat_history (timestamp, user_id, role, message)
         VALUES (?, ?, ?, ?)
-    """, (
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        user_id,
-        role,
-        message
-    ))
+    """, (timestamp, user_id, role, message))
+    return cursor.lastrowid
 
-    conn.commit()
-    conn.close()
+def save_chat_message(user_id, role, message):
+    with db_cursor() as cursor:
+        return _insert_chat_message(cursor, user_id, role, message, _now())
 
-def get_chat_history(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+CHAT_PAGE_SIZE = 50
 
-    cursor.execute("""
-        SELECT role, message
-        FROM chat_history
-        WHERE user_id=?
-        ORDER BY timestamp ASC
-    """, (user_id,))
+def get_chat_history(user_id, before_id=None, limit=CHAT_PAGE_SIZE):
+    # Keyset pagination: newest `limit` messages older than `before_id`,
+    # returned oldest-first. Cost depends on the page size only.
+    if before_id is None:
+        condition, params = "", (user_id, limit)
+    else:
+        condition, params = "AND id < ?", (user_id, before_id, limit)
 
-    rows = cursor.fetchall()
-    conn.close()
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT id, role, message
+            FROM chat_history
+            WHERE user_id=? {condition}
+            ORDER BY id DESC
+            LIMIT ?
+        """, params)
+
+        rows = cursor.fetchall()
 
     return [
-    {"role": row["role"], "message": row["message"]}
-    for row in rows
+    {"id": row["id"], "role": row["role"], "message": row["message"]}
+    for row in reversed(rows)
     ]
 
+def get_chat_summary(user_id):
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT summary, last_message_id
+            FROM chat_summaries
+            WHERE user_id=?
+        """, (user_id,))
+
+        return cursor.fetchone()
+
+def save_chat_summary(user_id, summary, last_message_id):
+    with db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO chat_summaries (user_id, summary, last_message_id, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                summary = excluded.summary,
+                last_message_id = excluded.last_message_id,
+                updated_at = excluded.updated_at
+        """, (user_id, summary, last_message_id, _now()))
+
 # =====================================================
 # STRESS & ALERTS
 # =====================================================
 
-def save_stress_log(user_id, user_text, stress_score):
-    conn = get_connection()
-    cursor = conn.cursor()
+ALERT_THRESHOLD = 75
+BURNOUT_SCORE = 70
+# A check-in counts half as much as one STRESS_HALF_LIFE_HOURS newer
+STRESS_HALF_LIFE_HOURS = 72
+
+def _bump_rollup(cursor, user_id, stress_score, timestamp):
+    cursor.execute("""
+        INSERT INTO stress_daily_rollup
+            (user_id, day, score_count, score_sum, score_min, score_max)
+        VALUES (?, substr(?, 1, 10), 1, ?, ?, ?)
+        ON CONFLICT(user_id, day) DO UPDATE SET
+            score_count = score_count + 1,
+            score_sum = score_sum + excluded.score_sum,
+            score_min = MIN(score_min, excluded.score_min),
+            score_max = MAX(score_max, excluded.score_max)
+    """, (user_id, timestamp, stress_score, stress_score, stress_score))
+
+def _bump_histogram(cursor, user_id, stress_score):
+    cursor.execute(HISTOGRAM_MERGE_SQL, (user_id, stress_score, 1))
+
+def _minutes_between(earlier, later):
+    # fromisoformat is ~20x faster than strptime; it matters in rebuilds
+    return (datetime.fromisoformat(later) - datetime.fromisoformat(earlier)).total_seconds() / 60
+
+def _fold_score(state, stress_score, timestamp):
+    # One step of a time-decayed EWMA. `weight` is the decayed number of
+    # check-ins behind the average: it halves every half-life, so after a
+    # long gap the next score dominates, while a burst of check-ins at
+    # the same moment averages out instead of the last one winning.
+    # state: (ewma, ewvar, weight, last_seen, streak, count) or None.
+    streak = 1 if stress_score >= BURNOUT_SCORE else 0
+    if state is None:
+        return (float(stress_score), 0.0, 1.0, timestamp, streak, 1)
+
+    ewma, ewvar, weight, last_seen, old_streak, count = state
+    # Out-of-order rows (imports) count as simultaneous
+    hours = max(0.0, _minutes_between(last_seen, timestamp) / 60)
+    weight = weight * 0.5 ** (hours / STRESS_HALF_LIFE_HOURS) + 1
+    alpha = 1 / weight
+
+    delta = stress_score - ewma
+    ewma += alpha * delta
+    ewvar = (1 - alpha) * (ewvar + alpha * delta * delta)
+
+    return (
+        ewma, ewvar, weight, max(last_seen, timestamp),
+        old_streak + 1 if streak else 0, count + 1
+    )
+
+def _save_stress_state(cursor, rows):
+    # rows: (user_id, ewma, ewvar, weight, last_seen, streak, count)
+    cursor.executemany("""
+        INSERT OR REPLACE INTO user_stress_state
+            (user_id, ewma, ewvar, weight, last_seen, streak, count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+def _update_stress_state(cursor, user_id, stress_score, timestamp):
+    # Primary-key read and write; no history is scanned
+    cursor.execute("""
+        SELECT ewma, ewvar, weight, last_seen, streak, count
+        FROM user_stress_state
+        WHERE user_id=?
+    """, (user_id,))
+    row = cursor.fetchone()
+    state = _fold_score(tuple(row) if row else None, stress_score, timestamp)
+    _save_stress_state(cursor, [(user_id,) + state])
 
+def _insert_stress_log(cursor, user_id, user_text, stress_score, timestamp):
     cursor.execute("""
         INSERT INTO stress_logs (timestamp, user_id, user_text, stress_score)
         VALUES (?, ?, ?, ?)
-    """, (
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        user_id,
-        user_text,
-        stress_score
-    ))
+    """, (timestamp, user_id, user_text, stress_score))
+    log_id = cursor.lastrowid
 
-    conn.commit()
-    conn.close()
+    _bump_rollup(cursor, user_id, stress_score, timestamp)
+    _bump_histogram(cursor, user_id, stress_score)
+    _update_stress_state(cursor, user_id, stress_score, timestamp)
+    _touch_user(cursor, user_id)
+    return log_id
 
-def create_alert(user_id, stress_score):
-    conn = get_connection()
-    cursor = conn.cursor()
+def save_stress_log(user_id, user_text, stress_score):
+    with db_cursor() as cursor:
+        return _insert_stress_log(cursor, user_id, user_text, stress_score, _now())
 
-    # Determine severity
+def alert_severity(stress_score):
+    # Returns (severity, escalation_level)
     if stress_score >= 90:
-        severity = "CRITICAL"
-        escalation = 3
+        return "CRITICAL", 3
     elif stress_score >= 80:
-        severity = "HIGH"
-        escalation = 2
+        return "HIGH", 2
     elif stress_score >= 70:
-        severity = "MEDIUM"
-        escalation = 1
+        return "MEDIUM", 1
     else:
-        severity = "LOW"
-        escalation = 1
+        return "LOW", 1
+
+# Repeat triggers within the merge window fold into the user's open
+# alert; it auto-resolves once no trigger arrived for the cool-down.
+# Escalation follows consecutive high check-ins, not a single score.
+ALERT_MERGE_MINUTES = int(os.environ.get("STRESSGUARD_ALERT_MERGE_MINUTES", 360))
+ALERT_COOLDOWN_MINUTES = int(os.environ.get("STRESSGUARD_ALERT_COOLDOWN_MINUTES", 240))
+ESCALATION_STREAK = 3     # consecutive high check-ins per escalation level
+MAX_ESCALATION = 3
+# How often the app sweeps alerts of users who stopped checking in
+ALERT_SWEEP_SECONDS = float(os.environ.get("STRESSGUARD_ALERT_SWEEP_SECONDS", 300))
+
+def _streak_escalation(high_streak):
+    return min(MAX_ESCALATION, 1 + (high_streak - 1) // ESCALATION_STREAK)
+
+def _insert_alert(cursor, user_id, stress_score, timestamp):
+    severity, _ = alert_severity(stress_score)
 
     cursor.execute("""
-        INSERT INTO alerts (timestamp, user_id, stress_score, severity, escalation_level)
-        VALUES (?, ?, ?, ?, ?)
-    """, (
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        user_id,
-        stress_score,
-        severity,
-        escalation
-    ))
-
-    conn.commit()
-    conn.close()
-# =====================================================
-# ANALYTICS
-# =====================================================
+        INSERT INTO alerts
+            (timestamp, user_id, stress_score, severity, escalation_level, last_triggered)
+        VALUES (?, ?, ?, ?, 1, ?)
+    """, (timestamp, user_id, stress_score, severity, timestamp))
+    alert_id = cursor.lastrowid
 
-def get_user_logs(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO alert_state
+            (user_id, alert_id, last_triggered, high_streak, peak_score, escalation_level)
+        VALUES (?, ?, ?, 1, ?, 1)
+    """, (user_id, alert_id, timestamp, stress_score))
+    _touch_user(cursor, user_id)
+    return alert_id
+
+def _merge_alert(cursor, user_id, state, stress_score, timestamp):
+    high_streak = state["high_streak"] + 1
+    peak = max(state["peak_score"], stress_score)
+    escalation = max(state["escalation_level"], _streak_escalation(high_streak))
+    severity, _ = alert_severity(peak)
 
     cursor.execute("""
-        SELECT timestamp, stress_score
-        FROM stress_logs
+        UPDATE alerts
+        SET hit_count = hit_count + 1, last_triggered = ?,
+            stress_score = ?, severity = ?, escalation_level = ?
+        WHERE id = ?
+    """, (timestamp, peak, severity, escalation, state["alert_id"]))
+    cursor.execute("""
+        UPDATE alert_state
+        SET last_triggered = ?, high_streak = ?, peak_score = ?, escalation_level = ?
+        WHERE user_id = ?
+    """, (timestamp, high_streak, peak, escalation, user_id))
+    _touch_user(cursor, user_id)
+    return state["alert_id"]
+
+def _resolve_alert(cursor, user_id, alert_id, timestamp):
+    cursor.execute(
+        "UPDATE alerts SET resolved = 1, resolved_at = ? WHERE id = ?",
+        (timestamp, alert_id)
+    )
+    cursor.execute("DELETE FROM alert_state WHERE user_id = ?", (user_id,))
+    _touch_user(cursor, user_id)
+
+def _observe_score(cursor, user_id, stress_score, timestamp):
+    # Every check-in goes through here: one primary-key read of the
+    # user's alert state, then at most a couple of single-row writes.
+    # Returns the id of the alert the score landed in, or None.
+    cursor.execute("""
+        SELECT alert_id, last_triggered, high_streak, peak_score, escalation_level
+        FROM alert_state
         WHERE user_id=?
-        ORDER BY timestamp DESC
     """, (user_id,))
+    state = cursor.fetchone()
+    quiet = _minutes_between(state["last_triggered"], timestamp) if state else None
+
+    if stress_score < ALERT_THRESHOLD:
+        if state is None:
+            return None
+        if quiet >= ALERT_COOLDOWN_MINUTES:
+            _resolve_alert(cursor, user_id, state["alert_id"], timestamp)
+        elif state["high_streak"]:
+            # Still open, but the run of high scores is broken
+            cursor.execute("UPDATE alert_state SET high_streak = 0 WHERE user_id=?", (user_id,))
+        return None
+
+    if state is not None and quiet <= ALERT_MERGE_MINUTES:
+        return _merge_alert(cursor, user_id, state, stress_score, timestamp)
+
+    if state is not None:
+        # Gap longer than the merge window: the old episode is over
+        _resolve_alert(cursor, user_id, state["alert_id"], timestamp)
+    return _insert_alert(cursor, user_id, stress_score, timestamp)
+
+def create_alert(user_id, stress_score):
+    with db_cursor() as cursor:
+        return _observe_score(cursor, user_id, stress_score, _now())
 
-    logs = cursor.fetchall()
-    conn.close()
-    return logs
+def resolve_cooled_alerts(now=None):
+    # Sweep for users who went quiet: their next check-in would resolve
+    # the alert, this does it for everyone past the cool-down at once
+    now = now or _now()
 
-def fetch_all_logs():
-    conn = get_connection()
-    cursor = conn.cursor()
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT user_id, alert_id
+            FROM alert_state
+            WHERE last_triggered <= datetime(?, ?)
+        """, (now, f"-{ALERT_COOLDOWN_MINUTES} minutes"))
+        cooled = cursor.fetchall()
+
+        for row in cooled:
+            _resolve_alert(cursor, row["user_id"], row["alert_id"], now)
+
+    return len(cooled)
+
+def start_alert_sweeper(interval=ALERT_SWEEP_SECONDS):
+    # Runs resolve_cooled_alerts() now and every `interval` seconds on a
+    # daemon thread; set the returned event to stop it. Several app
+    # processes sweeping the same file is harmless.
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            try:
+                resolve_cooled_alerts()
+            except Exception:
+                logger.exception("Alert sweep failed")
+            stop.wait(interval)
+
+    threading.Thread(target=run, name="stressguard-alert-sweep", daemon=True).start()
+    return stop
 
-    cursor.execute("""
-        SELECT s.timestamp,
-               u.username,
-               s.user_text,
-               s.stress_score
-        FROM stress_logs s
-        JOIN users u ON s.user_id = u.id
-        ORDER BY s.timestamp DESC
-    """)
+# =====================================================
+# CHECK-INS
+# =====================================================
 
-    rows = cursor.fetchall()
-    conn.close()
+def record_checkin(user_id, user_text, reply, stress_score, timestamp=None):
+    # One chat turn = one transaction: both messages, the stress log and
+    # the alert decision commit together or not at all
+    timestamp = timestamp or _now()
 
-    return rows
+    with db_cursor() as cursor:
+        user_message_id = _insert_chat_message(cursor, user_id, "user", user_text, timestamp)
+        reply_id = _insert_chat_message(cursor, user_id, "assistant", reply, timestamp)
+        _insert_stress_log(cursor, user_id, user_text, stress_score, timestamp)
+        _observe_score(cursor, user_id, stress_score, timestamp)
 
-def get_weekly_stress(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+    return user_message_id, reply_id
 
-    cursor.execute("""
-        SELECT AVG(stress_score)
-        FROM stress_logs
-        WHERE user_id=?
-        AND timestamp >= datetime('now','-7 days')
-    """, (user_id,))
+# =====================================================
+# ANALYTICS
+# =====================================================
+
+@cached("user")
+def get_user_logs(user_id, include_archived=False):
+    if include_archived:
+        from core.retention import archive_cursor
+        with archive_cursor() as cursor:
+            if cursor is not None:
+                cursor.execute("""
+                    SELECT timestamp, stress_score FROM main.stress_logs WHERE user_id=?
+                    UNION ALL
+                    SELECT timestamp, stress_score FROM archive.stress_logs WHERE user_id=?
+                    ORDER BY timestamp DESC
+                """, (user_id, user_id))
+
+                return cursor.fetchall()
+
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT timestamp, stress_score
+            FROM stress_logs
+            WHERE user_id=?
+            ORDER BY timestamp DESC
+        """, (user_id,))
+
+        return cursor.fetchall()
+
+def fetch_all_logs():
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT s.timestamp,
+                   u.username,
+                   s.user_text,
+                   s.stress_score
+            FROM stress_logs s
+            JOIN users u ON s.user_id = u.id
+            ORDER BY s.timestamp DESC
+        """)
+
+        return cursor.fetchall()
+
+def _rollup_average(user_id, modifier):
+    # Whole days come from the rollup; only the partial day at the start
+    # of the window is read from raw logs, so the result matches
+    # AVG(stress_score) over the rolling window exactly.
+    with db_cursor() as cursor:
+        cursor.execute("""
+            WITH bounds AS (SELECT datetime('now', ?) AS cutoff)
+            SELECT SUM(total) * 1.0 / SUM(n)
+            FROM (
+                SELECT r.score_sum AS total, r.score_count AS n
+                FROM stress_daily_rollup r, bounds
+                WHERE r.user_id=? AND r.day > date(bounds.cutoff)
+                UNION ALL
+                SELECT s.stress_score, 1
+                FROM stress_logs s, bounds
+                WHERE s.user_id=?
+                AND s.timestamp >= bounds.cutoff
+                AND s.timestamp < date(bounds.cutoff, '+1 day')
+            )
+        """, (modifier, user_id, user_id))
+
+        result = cursor.fetchone()[0]
 
-    result = cursor.fetchone()[0]
-    conn.close()
     return round(result, 1) if result else None
 
+@cached("user")
+def get_weekly_stress(user_id):
+    return _rollup_average(user_id, "-7 days")
+
+@cached("user")
 def get_monthly_stress(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+    return _rollup_average(user_id, "-30 days")
 
-    cursor.execute("""
-        SELECT AVG(stress_score)
+@cached("org")
+def get_burnout_risk_users(min_score=BURNOUT_SCORE):
+    # Range scan on the EWMA index; recent check-ins weigh most
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT u.username, s.ewma AS avg_stress, s.ewvar, s.streak, s.last_seen
+            FROM user_stress_state s
+            JOIN users u ON s.user_id = u.id
+            WHERE s.ewma >= ?
+            ORDER BY s.ewma DESC
+        """, (min_score,))
+
+        return cursor.fetchall()
+
+def _archived_aggregate(columns, group_by):
+    # Aggregates of archived logs; rows already copied to the archive but
+    # not yet deleted from the hot file are counted on the hot side
+    from core.retention import archive_cursor
+    with archive_cursor() as cursor:
+        if cursor is None:
+            return []
+        cursor.execute(f"""
+            SELECT {columns}
+            FROM archive.stress_logs a
+            WHERE NOT EXISTS (SELECT 1 FROM main.stress_logs h WHERE h.id = a.id)
+            GROUP BY {group_by}
+        """)
+        return [tuple(row) for row in cursor.fetchall()]
+
+def _archived_rollup():
+    return _archived_aggregate(
+        "a.user_id, substr(a.timestamp, 1, 10), COUNT(*), SUM(a.stress_score), "
+        "MIN(a.stress_score), MAX(a.stress_score)",
+        "a.user_id, substr(a.timestamp, 1, 10)"
+    )
+
+def _archived_histogram():
+    return _archived_aggregate(
+        "a.user_id, a.stress_score, COUNT(*)", "a.user_id, a.stress_score"
+    )
+
+def backfill_stress_rollup():
+    # Rebuilds the daily rollup and the score histograms from stress_logs
+    # and the archive, e.g. after a manual import. Archived days have no
+    # hot rows left, so without the archive they would drop out of the
+    # analytics. A day split by the retention cutoff is merged.
+    archived_days, archived_scores = _archived_rollup(), _archived_histogram()
+    with db_cursor() as cursor:
+        cursor.execute("DELETE FROM stress_daily_rollup")
+        cursor.execute(ROLLUP_BACKFILL_SQL)
+        cursor.executemany(ROLLUP_MERGE_SQL, archived_days)
+
+        cursor.execute("DELETE FROM stress_score_histogram")
+        cursor.execute(HISTOGRAM_BACKFILL_SQL)
+        cursor.executemany(HISTOGRAM_MERGE_SQL, archived_scores)
+
+        cursor.execute("SELECT COUNT(*) FROM stress_daily_rollup")
+        after_commit(invalidate_all)
+        return cursor.fetchone()[0]
+
+def _rebuild_stress_state(cursor):
+    # Replays stress_logs per user in time order; archived logs are left
+    # out, they have decayed to nothing anyway
+    cursor.execute("DELETE FROM user_stress_state")
+
+    states = {}
+    for user_id, timestamp, score in cursor.execute("""
+        SELECT user_id, timestamp, stress_score
         FROM stress_logs
-        WHERE user_id=?
-        AND timestamp >= datetime('now','-30 days')
-    """, (user_id,))
+        ORDER BY user_id, timestamp, id
+    """):
+        states[user_id] = _fold_score(states.get(user_id), score, timestamp)
 
-    result = cursor.fetchone()[0]
-    conn.close()
-    return round(result, 1) if result else None
+    _save_stress_state(cursor, [(user_id,) + state for user_id, state in states.items()])
+    after_commit(invalidate_all)
+    return len(states)
 
-def get_burnout_risk_users():
-    conn = get_connection()
-    cursor = conn.cursor()
+def rebuild_stress_state():
+    # e.g. after a manual import
+    with db_cursor() as cursor:
+        return _rebuild_stress_state(cursor)
 
-    cursor.execute("""
-        SELECT u.username, AVG(s.stress_score) as avg_stress
-        FROM stress_logs s
-        JOIN users u ON s.user_id = u.id
-        GROUP BY s.user_id
-        HAVING avg_stress >= 70
-    """)
+# =====================================================
+# ORGANIZATION
+# =====================================================
+
+@cached("org")
+def get_org_metrics():
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT COALESCE(SUM(score_count), 0) AS total,
+                   SUM(score_sum) * 1.0 / SUM(score_count) AS avg_stress,
+                   (SELECT COUNT(*) FROM user_stress_state WHERE ewma >= ?) AS burnout_users
+            FROM stress_daily_rollup
+        """, (BURNOUT_SCORE,))
+
+        row = cursor.fetchone()
+
+    return {
+        "total": row["total"],
+        "avg_stress": round(row["avg_stress"], 1) if row["avg_stress"] is not None else None,
+        "burnout_users": row["burnout_users"]
+    }
+
+@cached("org")
+def get_user_score_distribution():
+    # Per-user five-number summary (nearest-rank quantiles) for box plots,
+    # read off the score histograms: at most ~100 rows per user, scanned in
+    # primary-key order, instead of ranking every log
+    with db_cursor() as cursor:
+        cursor.execute("SELECT id, username FROM users")
+        usernames = dict(cursor.fetchall())
+        cursor.execute("""
+            SELECT user_id, score, score_count
+            FROM stress_score_histogram
+            ORDER BY user_id, score
+        """)
+
+        dist = []
+        for user_id, rows in groupby(cursor.fetchall(), key=lambda row: row[0]):
+            bins = [(score, count) for _, score, count in rows]
+            n = sum(count for _, count in bins)
+            ranks = [int((n - 1) * q) + 1 for q in (0.25, 0.5, 0.75)]
+            quartiles, below = [], 0
+            for score, count in bins:
+                below += count
+                while len(quartiles) < 3 and below >= ranks[len(quartiles)]:
+                    quartiles.append(score)
+
+            dist.append({
+                "username": usernames[user_id],
+                "n": n,
+                "min_score": bins[0][0],
+                "q1": quartiles[0],
+                "median": quartiles[1],
+                "q3": quartiles[2],
+                "max_score": bins[-1][0],
+            })
+
+        return sorted(dist, key=lambda row: row["username"])
+
+@cached("org")
+def get_high_risk_logs(min_score=ALERT_THRESHOLD, after=None, limit=25):
+    # Keyset pagination over (stress_score DESC, id DESC). Pass the
+    # (stress_score, id) of the last row of a page as `after` to get the
+    # next one. user_text is fetched separately with get_log_text().
+    if after is None:
+        condition, params = "", (min_score, limit)
+    else:
+        condition, params = "AND (s.stress_score, s.id) < (?, ?)", (min_score, *after, limit)
 
-    data = cursor.fetchall()
-    conn.close()
-    return data
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT s.id, s.timestamp, u.username, s.stress_score
+            FROM stress_logs s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.stress_score >= ? {condition}
+            ORDER BY s.stress_score DESC, s.id DESC
+            LIMIT ?
+        """, params)
+
+        return cursor.fetchall()
+
+def get_log_text(log_id):
+    with db_cursor() as cursor:
+        cursor.execute("SELECT user_text FROM stress_logs WHERE id=?", (log_id,))
+        row = cursor.fetchone()
+
+    return row["user_text"] if row else None
 
 # =====================================================
 # MANAGER
 # =====================================================
+@cached("team")
 def get_manager_team_members(manager_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT u.id, u.username
-        FROM users u
-        JOIN manager_team m
-        ON u.id = m.employee_id
-        WHERE m.manager_id = ?
-    """, (manager_id,))
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT u.id, u.username
+            FROM users u
+            JOIN manager_team m
+            ON u.id = m.employee_id
+            WHERE m.manager_id = ?
+        """, (manager_id,))
 
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+        return cursor.fetchall()
 
+@cached("team", "org")
 def get_available_employees(manager_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-         SELECT id, username
-         FROM users
-         WHERE role = 'employee'
-         AND id NOT IN (
-            SELECT employee_id
-            FROM manager_team
-            WHERE manager_id = ?
-        )
-    """, (manager_id,))
-
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with db_cursor() as cursor:
+        cursor.execute("""
+             SELECT id, username
+             FROM users
+             WHERE role = 'employee'
+             AND id NOT IN (
+                SELECT employee_id
+                FROM manager_team
+                WHERE manager_id = ?
+            )
+        """, (manager_id,))
+
+        return cursor.fetchall()
 
 def assign_employee(employee_id, manager_id):
     employee_id = int(employee_id)
     manager_id = int(manager_id)
-    conn = get_connection()
-    cursor = conn.cursor()
 
     try:
-        # Check manager exists
-        cursor.execute("SELECT id FROM users WHERE id=? AND LOWER(role)='manager'", (manager_id,))
-        manager = cursor.fetchone()
+        with db_cursor() as cursor:
+            # Check manager exists
+            cursor.execute("SELECT id FROM users WHERE id=? AND LOWER(role)='manager'", (manager_id,))
+            manager = cursor.fetchone()
 
-        # Check employee exists
-        cursor.execute("SELECT id FROM users WHERE id=? AND LOWER(role)='employee'", (employee_id,))
-        employee = cursor.fetchone()
+            # Check employee exists
+            cursor.execute("SELECT id FROM users WHERE id=? AND LOWER(role)='employee'", (employee_id,))
+            employee = cursor.fetchone()
 
-        if not manager:
-            raise Exception("Invalid manager ID")
+            if not manager:
+                raise Exception("Invalid manager ID")
 
-        if not employee:
-            raise Exception("Invalid employee ID")
+            if not employee:
+                raise Exception("Invalid employee ID")
 
-        cursor.execute("""
-            INSERT INTO manager_team (manager_id, employee_id)
-            VALUES (?, ?)
-        """, (manager_id, employee_id))
+            cursor.execute("""
+                INSERT INTO manager_team (manager_id, employee_id)
+                VALUES (?, ?)
+            """, (manager_id, employee_id))
+            after_commit(lambda: bump(("team", manager_id)))
 
-        conn.commit()
         return True
 
     except sqlite3.IntegrityError:
         return False
 
-    finally:
-        conn.close()
-
+@cached("team")
 def get_manager_team_logs(manager_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT u.username, s.timestamp, s.stress_score
-        FROM stress_logs s
-        JOIN manager_team m ON s.user_id = m.employee_id
-        JOIN users u ON u.id = s.user_id
-        WHERE m.manager_id=?
-        ORDER BY s.timestamp DESC
-    """, (manager_id,))
-
-    logs = cursor.fetchall()
-    conn.close()
-    return logs
-
-def get_manager_team_alerts(manager_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT u.username, a.timestamp, a.stress_score, a.severity, a.escalation_level
-        FROM alerts a
-        JOIN manager_team m ON a.user_id = m.employee_id
-        JOIN users u ON u.id = a.user_id
-        WHERE m.manager_id=? AND a.resolved=0
-    """, (manager_id,))
-
-    data = cursor.fetchall()
-    conn.close()
-    return data
-
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT u.username, s.timestamp, s.stress_score
+            FROM stress_logs s
+            JOIN manager_team m ON s.user_id = m.employee_id
+            JOIN users u ON u.id = s.user_id
+            WHERE m.manager_id=?
+            ORDER BY s.timestamp DESC
+        """, (manager_id,))
+
+        return cursor.fetchall()
+
+TEAM_RISK_SCORE = 70      # manager view: an employee is high risk at this peak
+
+@cached("team")
+def get_manager_team_summary(manager_id, since=None):
+    # One grouped row per team member (members without check-ins too)
+    # plus the team headline numbers derived from them. All-time figures
+    # come from the daily rollup; a `since` window reads raw logs
+    # through idx_stress_logs_user_ts.
+    with db_cursor() as cursor:
+        if since is None:
+            cursor.execute("""
+                SELECT u.id, u.username,
+                       COALESCE(SUM(r.score_count), 0) AS n,
+                       COALESCE(SUM(r.score_sum), 0) AS score_sum,
+                       MAX(r.score_max) AS max_score,
+                       MAX(r.day) AS last_seen,
+                       (SELECT COUNT(*) FROM alerts a
+                        WHERE a.user_id = u.id AND a.resolved = 0) AS active_alerts
+                FROM manager_team m
+                JOIN users u ON u.id = m.employee_id
+                LEFT JOIN stress_daily_rollup r ON r.user_id = u.id
+                WHERE m.manager_id = ?
+                GROUP BY u.id
+                ORDER BY u.username
+            """, (manager_id,))
+        else:
+            cursor.execute("""
+                SELECT u.id, u.username,
+                       COUNT(s.id) AS n,
+                       COALESCE(SUM(s.stress_score), 0) AS score_sum,
+                       MAX(s.stress_score) AS max_score,
+                       MAX(s.timestamp) AS last_seen,
+                       (SELECT COUNT(*) FROM alerts a
+                        WHERE a.user_id = u.id AND a.resolved = 0) AS active_alerts
+                FROM manager_team m
+                JOIN users u ON u.id = m.employee_id
+                LEFT JOIN stress_logs s ON s.user_id = u.id AND s.timestamp >= ?
+                WHERE m.manager_id = ?
+                GROUP BY u.id
+                ORDER BY u.username
+            """, (since, manager_id))
+
+        rows = cursor.fetchall()
+
+    members = []
+    for row in rows:
+        member = dict(row)
+        member["avg_stress"] = round(row["score_sum"] / row["n"], 1) if row["n"] else None
+        members.append(member)
+
+    total = sum(m["n"] for m in members)
+    peaks = [m["max_score"] for m in members if m["max_score"] is not None]
+
+    return {
+        "members": members,
+        "total": total,
+        "avg_stress": round(sum(m["score_sum"] for m in members) / total, 1) if total else None,
+        "max_stress": max(peaks) if peaks else None,
+        "high_risk": sum(1 for p in peaks if p >= TEAM_RISK_SCORE),
+        "active_alerts": sum(m["active_alerts"] for m in members)
+    }
+
+# Daily and weekly buckets come from the rollup, hourly ones from raw logs
+TREND_BUCKETS = {
+    "hour": "substr(s.timestamp, 1, 13) || ':00'",
+    "day": "r.day",
+    # Monday of the week; weeks run Monday to Sunday
+    "week": "date(r.day, '-6 days', 'weekday 1')",
+}
+
+@cached("team")
+def get_manager_team_trend(manager_id, bucket="day", since=None):
+    # Average score per employee per bucket, for the trend chart
+    with db_cursor() as cursor:
+        if bucket != "hour":
+            cursor.execute(f"""
+                SELECT u.username, {TREND_BUCKETS[bucket]} AS bucket,
+                       SUM(r.score_sum) * 1.0 / SUM(r.score_count) AS avg_score,
+                       SUM(r.score_count) AS n
+                FROM manager_team m
+                JOIN users u ON u.id = m.employee_id
+                JOIN stress_daily_rollup r ON r.user_id = u.id
+                WHERE m.manager_id = ? AND r.day >= ?
+                GROUP BY u.id, bucket
+                ORDER BY bucket
+            """, (manager_id, since[:10] if since else ""))
+        else:
+            cursor.execute(f"""
+                SELECT u.username, {TREND_BUCKETS[bucket]} AS bucket,
+                       AVG(s.stress_score) AS avg_score,
+                       COUNT(*) AS n
+                FROM manager_team m
+                JOIN users u ON u.id = m.employee_id
+                JOIN stress_logs s ON s.user_id = u.id
+                WHERE m.manager_id = ? AND s.timestamp >= ?
+                GROUP BY u.id, bucket
+                ORDER BY bucket
+            """, (manager_id, since or ""))
+
+        return cursor.fetchall()
+
+@cached("team")
+def get_manager_team_alerts(manager_id, limit=-1):
+    # Newest first; limit=-1 means all
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT u.username, a.timestamp, a.stress_score, a.severity,
+                   a.escalation_level, a.hit_count, a.last_triggered
+            FROM alerts a
+            JOIN manager_team m ON a.user_id = m.employee_id
+            JOIN users u ON u.id = a.user_id
+            WHERE m.manager_id=? AND a.resolved=0
+            ORDER BY a.id DESC
+            LIMIT ?
+        """, (manager_id, limit))
+
+        return cursor.fetchall()
+
+@cached("org")
 def get_all_alerts():
-    conn = get_connection()
-    cursor = conn.cursor()
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT u.username, a.timestamp, a.stress_score
+            FROM alerts a
+            JOIN users u ON u.id = a.user_id
+            WHERE a.resolved=0
+        """)
 
-    cursor.execute("""
-        SELECT u.username, a.timestamp, a.stress_score
-        FROM alerts a
-        JOIN users u ON u.id = a.user_id
-        WHERE a.resolved=0
-    """)
+        return cursor.fetchall()
+
+# =====================================================
+# INSTRUMENTATION
+# =====================================================
 
-    data = cursor.fetchall()
-    conn.close()
-    return data
+# Call counts and latency for every public function above; plumbing and
+# pure helpers are left alone
+instrument_module(globals(), "db", skip=(
+    "get_db_path", "get_connection", "db_cursor", "after_commit",
+    "close_all_connections", "connection_stats", "generate_salt",
+    "hash_password", "alert_severity", "start_alert_sweeper",
+))
 
+registry.register_gauge("db_connections", "SQLite connection pool counters", connection_stats)
+registry.register_gauge("query_cache", "Query cache counters", query_cache_stats)
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from core.database import ALERT_THRESHOLD
+
+
+CHART_WIDTH_PX = 1200     # wide-layout chart with use_container_width
+PX_PER_POINT = 2          # denser than this is invisible anyway
+
+
+def point_budget(width_px=CHART_WIDTH_PX, px_per_point=PX_PER_POINT):
+    return max(10, int(width_px / px_per_point))
+
+def to_epoch(timestamp):
+    # "YYYY-MM-DD", "YYYY-MM-DD HH:MM" or "YYYY-MM-DD HH:MM:SS"
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+# =====================================================
+# LTTB
+# =====================================================
+
+def lttb_indices(xs, ys, threshold):
+    # Largest-triangle-three-buckets: keeps the first and last point and,
+    # per bucket, the point forming the largest triangle with the point
+    # kept before it and the average of the next bucket. xs ascending.
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:max(threshold, 1)]
+
+    every = (n - 2) / (threshold - 2)
+    picked = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        picked.append(best)
+        a = best
+
+    picked.append(n - 1)
+    return picked
+
+def peak_indices(indices, ys, count):
+    # Highest point of each of `count` equal slices of `indices`
+    if len(indices) <= count:
+        return list(indices)
+    size = len(indices) / count
+    return [
+        max(indices[int(k * size):int((k + 1) * size)], key=ys.__getitem__)
+        for k in range(count)
+    ]
+
+def downsample(xs, ys, max_points, spike_score=ALERT_THRESHOLD):
+    # Indices of at most `max_points` points: LTTB for the shape, plus
+    # every point at or above `spike_score` (or, if there are too many,
+    # the highest one per time slice) and the overall maximum, so a
+    # stress spike never disappears from the chart
+    n = len(xs)
+    if n <= max_points:
+        return list(range(n))
+
+    spikes = [i for i in range(n) if ys[i] >= spike_score]
+    spikes = peak_indices(spikes, ys, max(1, max_points // 4))
+    top = max(range(n), key=ys.__getitem__)
+    if top not in spikes:
+        spikes.append(top)
+    # Only a budget of a point or two can't hold them all; highest first
+    spikes = sorted(spikes, key=ys.__getitem__, reverse=True)[:max_points]
+
+    # Spikes take at most a quarter of the budget (+1), LTTB the rest
+    room = max_points - len(spikes)
+    shape = lttb_indices(xs, ys, room) if room else []
+    return sorted(set(shape).union(spikes))
+
+
+# =====================================================
+# CHART ROWS
+# =====================================================
+
+def downsample_rows(rows, max_points=None, spike_score=ALERT_THRESHOLD):
+    # rows: (timestamp, value, ...) in any order, e.g. get_user_logs();
+    # returns the kept rows oldest first
+    max_points = max_points or point_budget()
+    rows = sorted(rows, key=lambda row: row[0])
+    if len(rows) <= max_points:
+        return rows
+
+    xs = [to_epoch(row[0]) for row in rows]
+    ys = [row[1] for row in rows]
+    return [rows[i] for i in downsample(xs, ys, max_points, spike_score)]
@@ -0,0 +1,170 @@
+import csv
+import io
+
+from core.database import get_connection
+
+
+FETCH_SIZE = 10000        # rows per fetchmany, and per Parquet row group
+
+STRESS_LOG_COLUMNS = ["timestamp", "username", "stress_score", "user_text"]
+ALERT_COLUMNS = ["timestamp", "username", "stress_score", "severity",
+                 "escalation_level", "hit_count", "last_triggered", "resolved"]
+HISTORY_COLUMNS = ["timestamp", "score"]
+
+# Parquet type of every exported column, fixed up front: a column that
+# is all NULL in the first chunk must not decide the file's schema
+PARQUET_TYPES = {
+    "timestamp": "string",
+    "username": "string",
+    "stress_score": "int64",
+    "score": "int64",
+    "user_text": "string",
+    "severity": "string",
+    "escalation_level": "int64",
+    "hit_count": "int64",
+    "last_triggered": "string",
+    "resolved": "int64",
+}
+
+
+# =====================================================
+# STREAMING
+# =====================================================
+
+def iter_chunks(sql, params=(), fetch_size=FETCH_SIZE):
+    # A connection of its own rather than the pool's: an export can take
+    # a while and must not pin a pooled connection. Under WAL the read
+    # transaction doesn't block writers.
+    conn = get_connection()
+    conn.row_factory = None
+    # Pages are read once; mapping the file would only inflate RSS
+    conn.execute("PRAGMA mmap_size = 0")
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+def write_csv(chunks, columns, fileobj):
+    # fileobj is binary (st.download_button, SpooledTemporaryFile, open(..., "wb"))
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    rows = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        rows += len(chunk)
+    text.flush()
+    text.detach()
+    return rows
+
+def write_parquet(chunks, columns, fileobj):
+    # One row group per fetched chunk; needs the optional pyarrow package.
+    # Errors surface as RuntimeError, like a missing pyarrow.
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(name, pa.type_for_alias(PARQUET_TYPES[name])) for name in columns])
+    rows = 0
+    try:
+        with pq.ParquetWriter(fileobj, schema, compression="zstd") as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pydict(
+                    {name: list(values) for name, values in zip(columns, zip(*chunk))},
+                    schema=schema
+                ))
+                rows += len(chunk)
+    except pa.ArrowException as exc:
+        raise RuntimeError(f"Parquet export failed after {rows} rows: {exc}") from exc
+    return rows
+
+def write_export(chunks, columns, fileobj, fmt="csv"):
+    if fmt == "parquet":
+        return write_parquet(chunks, columns, fileobj)
+    return write_csv(chunks, columns, fileobj)
+
+
+# =====================================================
+# EXPORTS
+# =====================================================
+
+def _date_filter(column, start, end):
+    # start/end are "YYYY-MM-DD"; end is inclusive
+    clauses, params = [], []
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(str(start))
+    if end:
+        clauses.append(f"{column} < date(?, '+1 day')")
+        params.append(str(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def export_stress_logs(fileobj, fmt="csv", start=None, end=None, fetch_size=FETCH_SIZE):
+    where, params = _date_filter("s.timestamp", start, end)
+    chunks = iter_chunks(f"""
+        SELECT s.timestamp, u.username, s.stress_score, s.user_text
+        FROM stress_logs s
+        JOIN users u ON u.id = s.user_id
+        {where}
+        ORDER BY s.timestamp
+    """, params, fetch_size)
+    return write_export(chunks, STRESS_LOG_COLUMNS, fileobj, fmt)
+
+def export_alerts(fileobj, fmt="csv", start=None, end=None, fetch_size=FETCH_SIZE):
+    where, params = _date_filter("a.timestamp", start, end)
+    chunks = iter_chunks(f"""
+        SELECT a.timestamp, u.username, a.stress_score, a.severity,
+               a.escalation_level, a.hit_count, a.last_triggered, a.resolved
+        FROM alerts a
+        JOIN users u ON u.id = a.user_id
+        {where}
+        ORDER BY a.timestamp
+    """, params, fetch_size)
+    return write_export(chunks, ALERT_COLUMNS, fileobj, fmt)
+
+HISTORY_SQL = """
+    SELECT timestamp, stress_score
+    FROM stress_logs
+    WHERE user_id=?
+    ORDER BY timestamp DESC
+"""
+
+def _archived_history_chunks(user_id, fetch_size):
+    from core.retention import archive_cursor
+
+    with archive_cursor() as cursor:
+        if cursor is None:
+            yield from iter_chunks(HISTORY_SQL, (user_id,), fetch_size)
+            return
+
+        cursor.execute("""
+            SELECT timestamp, stress_score FROM main.stress_logs WHERE user_id=?
+            UNION ALL
+            SELECT timestamp, stress_score FROM archive.stress_logs WHERE user_id=?
+            ORDER BY timestamp DESC
+        """, (user_id, user_id))
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+
+def export_user_history(user_id, fileobj, fmt="csv", include_archived=False,
+                        fetch_size=FETCH_SIZE):
+    if include_archived:
+        chunks = _archived_history_chunks(user_id, fetch_size)
+    else:
+        chunks = iter_chunks(HISTORY_SQL, (user_id,), fetch_size)
+    return write_export(chunks, HISTORY_COLUMNS, fileobj, fmt)
+
+EXPORTS = {
+    "stress_logs": export_stress_logs,
+    "alerts": export_alerts,
+}
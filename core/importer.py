@@ -0,0 +1,244 @@
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from core.database import (
+    HISTOGRAM_MERGE_SQL, ROLLUP_MERGE_SQL, after_commit, db_cursor, generate_salt, _now,
+    _observe_score, _update_stress_state
+)
+from core.query_cache import invalidate_all
+
+
+CHUNK_SIZE = 5000
+
+_worker_analyzer = None
+
+
+# =====================================================
+# SCORING WORKERS
+# =====================================================
+
+def _init_worker(engine):
+    global _worker_analyzer
+    from core.sentiment import StressAnalyzer
+    _worker_analyzer = StressAnalyzer(engine=engine)
+
+def _score_chunk(texts):
+    return _worker_analyzer.analyze_batch(texts)
+
+
+# =====================================================
+# READING
+# =====================================================
+
+def parse_timestamp(value):
+    # Accepts ISO-ish timestamps; stored in the app's own format
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip()).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+def read_chunks(path, user_column, text_column, timestamp_column, skip=0,
+                chunk_size=CHUNK_SIZE):
+    # Streams (username, text, timestamp) rows in chunks, after skipping
+    # the `skip` data rows an earlier run already committed
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = {user_column, text_column} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+
+        chunk = []
+        for number, row in enumerate(reader):
+            if number < skip:
+                continue
+            chunk.append((
+                (row.get(user_column) or "").strip(),
+                (row.get(text_column) or "").strip(),
+                row.get(timestamp_column) if timestamp_column else None
+            ))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+# =====================================================
+# CHECKPOINTS
+# =====================================================
+
+def get_checkpoint(source):
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT rows_done, imported, skipped
+            FROM import_checkpoints
+            WHERE source=?
+        """, (source,))
+
+        return cursor.fetchone()
+
+def reset_checkpoint(source):
+    with db_cursor() as cursor:
+        cursor.execute("DELETE FROM import_checkpoints WHERE source=?", (source,))
+
+
+# =====================================================
+# WRITING
+# =====================================================
+
+def load_user_ids():
+    with db_cursor() as cursor:
+        cursor.execute("SELECT username, id FROM users")
+        return {row["username"]: row["id"] for row in cursor.fetchall()}
+
+def create_users(usernames, user_ids):
+    # Placeholder accounts: the random hash matches no password, so an
+    # admin has to reset it before anyone can log in
+    with db_cursor() as cursor:
+        cursor.executemany("""
+            INSERT OR IGNORE INTO users (username, password, salt, role)
+            VALUES (?, ?, ?, 'employee')
+        """, [(name, generate_salt(), generate_salt()) for name in usernames])
+        cursor.execute(
+            f"SELECT username, id FROM users WHERE username IN ({', '.join('?' * len(usernames))})",
+            list(usernames)
+        )
+        user_ids.update((row["username"], row["id"]) for row in cursor.fetchall())
+
+def write_chunk(source, rows, scores, user_ids, rows_done, imported, skipped):
+    # One transaction per chunk: logs, rollup, alerts and the checkpoint
+    # commit together, so a resumed import never duplicates rows
+    logs, rollup, histogram = [], {}, {}
+    now = _now()
+
+    for (username, text, raw_ts), score in zip(rows, scores):
+        user_id = user_ids.get(username)
+        timestamp = parse_timestamp(raw_ts) if raw_ts else now
+        if user_id is None or not text or timestamp is None:
+            skipped += 1
+            continue
+
+        logs.append((timestamp, user_id, text, score))
+
+        day = rollup.get((user_id, timestamp[:10]))
+        if day is None:
+            rollup[(user_id, timestamp[:10])] = [1, score, score, score]
+        else:
+            day[0] += 1
+            day[1] += score
+            day[2] = min(day[2], score)
+            day[3] = max(day[3], score)
+
+        histogram[(user_id, score)] = histogram.get((user_id, score), 0) + 1
+
+    with db_cursor() as cursor:
+        cursor.executemany("""
+            INSERT INTO stress_logs (timestamp, user_id, user_text, stress_score)
+            VALUES (?, ?, ?, ?)
+        """, logs)
+
+        cursor.executemany(
+            ROLLUP_MERGE_SQL,
+            [(user_id, day, *agg) for (user_id, day), agg in rollup.items()]
+        )
+        cursor.executemany(
+            HISTOGRAM_MERGE_SQL,
+            [(user_id, score, n) for (user_id, score), n in histogram.items()]
+        )
+
+        # Same EWMA and alert engine as record_checkin, fed in time order;
+        # both assume each user's rows arrive roughly chronologically
+        for timestamp, user_id, _, score in sorted(logs):
+            _update_stress_state(cursor, user_id, score, timestamp)
+            _observe_score(cursor, user_id, score, timestamp)
+
+        cursor.execute("""
+            INSERT INTO import_checkpoints (source, rows_done, imported, skipped, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                rows_done = excluded.rows_done,
+                imported = excluded.imported,
+                skipped = excluded.skipped,
+                updated_at = excluded.updated_at
+        """, (source, rows_done + len(rows), imported + len(logs), skipped, now))
+
+        # Bulk writes skip the per-user bookkeeping; drop every cached read
+        after_commit(invalidate_all)
+
+    return len(logs), skipped
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+
+def import_csv(path, user_column="username", text_column="text",
+               timestamp_column="timestamp", engine="lexicon", workers=None,
+               chunk_size=CHUNK_SIZE, create_missing_users=False, restart=False,
+               progress=None):
+    # Reading and writing happen here; scoring runs in a process pool
+    # with a bounded number of chunks in flight. Returns totals.
+    source = os.path.abspath(path)
+    if restart:
+        reset_checkpoint(source)
+
+    checkpoint = get_checkpoint(source)
+    rows_done, imported, skipped = tuple(checkpoint) if checkpoint else (0, 0, 0)
+    resumed_from = rows_done
+
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    if timestamp_column not in header:
+        timestamp_column = None
+
+    user_ids = load_user_ids()
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(engine,)
+    ) as pool:
+        in_flight = deque()
+        chunks = read_chunks(
+            path, user_column, text_column, timestamp_column,
+            skip=rows_done, chunk_size=chunk_size
+        )
+
+        def drain(limit):
+            nonlocal rows_done, imported, skipped
+            while len(in_flight) > limit:
+                rows, future = in_flight.popleft()
+
+                if create_missing_users:
+                    missing = {r[0] for r in rows if r[0] and r[1] and r[0] not in user_ids}
+                    if missing:
+                        create_users(missing, user_ids)
+
+                written, skipped = write_chunk(
+                    source, rows, future.result(), user_ids, rows_done, imported, skipped
+                )
+                rows_done += len(rows)
+                imported += written
+
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    progress(rows_done, imported, skipped, (rows_done - resumed_from) / elapsed)
+
+        for rows in chunks:
+            in_flight.append((rows, pool.submit(_score_chunk, [r[1] for r in rows])))
+            drain(workers * 2)
+        drain(0)
+
+    return {
+        "rows": rows_done,
+        "imported": imported,
+        "skipped": skipped,
+        "resumed_from": resumed_from,
+        "seconds": time.perf_counter() - start
+    }
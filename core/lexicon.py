@@ -0,0 +1,113 @@
+import os
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from core.sentiment import polarity_to_score
+
+
+LEXICON_PATH = os.path.join(os.path.dirname(__file__), "lexicon.tsv")
+
+NEGATIONS = frozenset(("no", "not", "never"))
+
+Lexicon = namedtuple("Lexicon", ["words", "emoticons", "tokens"])
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path=LEXICON_PATH):
+    # Read once per process into frozen dicts with interned keys:
+    # words: form -> (polarity, intensity, is_modifier)
+    # emoticons: form -> polarity
+    words, emoticons = {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            form, polarity, intensity, kind = line.rstrip("\n").split("\t")
+            if kind == "e":
+                emoticons[form] = float(polarity)
+            else:
+                words[sys.intern(form)] = (float(polarity), float(intensity), kind == "m")
+
+    # Emoticons only count as whole whitespace-separated tokens
+    emoticon_pattern = "|".join(
+        re.escape(e) for e in sorted(emoticons, key=len, reverse=True)
+    )
+    tokens = re.compile(
+        rf"(?<!\S)(?:{emoticon_pattern})(?!\S)|[a-z0-9]+(?:-[a-z0-9]+)*|!"
+    )
+
+    return Lexicon(MappingProxyType(words), MappingProxyType(emoticons), tokens)
+
+
+def polarity(text, lexicon=None):
+    # Single pass over the tokens, following TextBlob/Pattern's rules:
+    # a modifier ("very", "really") scales the next known word, a
+    # negation flips and halves it, "!" boosts the previous one and
+    # unknown words do not count towards the average. Unlike TextBlob,
+    # contracted negations ("don't", "isn't") are recognised.
+    lexicon = lexicon or load_lexicon()
+    words, emoticons = lexicon.words, lexicon.emoticons
+
+    scores = []          # [polarity, intensity, negated] per assessment
+    modifier = None      # preceding modifier word
+    negated = False
+
+    for word in lexicon.tokens.findall(text.lower().replace("n't", " not")):
+        entry = words.get(word)
+
+        if entry is not None:
+            p, i, is_modifier = entry
+            if modifier is None:
+                scores.append([p, i, False])
+            else:
+                last = scores[-1]
+                last[0] = max(-1.0, min(p * last[1], 1.0))
+                last[1] = i
+            if negated:
+                last = scores[-1]
+                last[1] = 1.0 / last[1]
+                last[2] = True
+
+            modifier = word if is_modifier else None
+            negated = word in NEGATIONS
+            continue
+
+        if word in NEGATIONS:
+            negated = True
+        elif negated and len(word) > 1:
+            negated = False
+
+        # "really not good": the negation attaches to the modifier's word
+        if negated and modifier is not None and modifier.endswith("ly"):
+            scores[-1][2] = True
+            negated = False
+        elif modifier is not None and len(word) > 2:
+            modifier = None
+
+        if word == "!":
+            if scores:
+                scores[-1][0] = max(-1.0, min(scores[-1][0] * 1.25, 1.0))
+        elif word in emoticons:
+            scores.append([emoticons[word], 1.0, False])
+
+    if not scores:
+        return 0.0
+
+    return sum(p * -0.5 if neg else p for p, _, neg in scores) / len(scores)
+
+
+class LexiconEngine:
+    name = "lexicon"
+
+    def __init__(self, path=LEXICON_PATH):
+        self.lexicon = load_lexicon(path)
+
+    def score(self, text):
+        return polarity_to_score(polarity(text, self.lexicon))
+
+    def score_batch(self, texts):
+        lexicon = self.lexicon
+        return [polarity_to_score(polarity(text, lexicon)) for text in texts]
@@ -0,0 +1,325 @@
+import asyncio
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+from groq import (
+    APIConnectionError,
+    APIError,
+    APIStatusError,
+    AsyncGroq,
+    Groq,
+    RateLimitError,
+)
+
+
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 20.0
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+MAX_CONNECTIONS = 20
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# =====================================================
+# CIRCUIT BREAKER
+# =====================================================
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures;
+    # open -> half-open after `reset_timeout` seconds, letting a single
+    # probe through; the probe's outcome closes or re-opens the circuit.
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        # No verdict either way (a bug on our side, a cancelled call):
+        # only frees the half-open probe slot for the next caller
+        with self._lock:
+            self._probing = False
+
+
+# =====================================================
+# RETRY POLICY
+# =====================================================
+
+def is_retryable(exc):
+    # Connection errors include timeouts
+    if isinstance(exc, (APIConnectionError, RateLimitError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS
+    return False
+
+def record_outcome(breaker, exc):
+    # One verdict per logical call. A 4xx means the provider answered and
+    # the request was bad; transport errors, 5xx, rate limits and broken
+    # streams count against it; anything else is ours and says nothing.
+    if isinstance(exc, APIStatusError) and exc.status_code < 500 and not is_retryable(exc):
+        breaker.record_success()
+    elif is_retryable(exc) or isinstance(exc, (APIError, httpx.TransportError)):
+        breaker.record_failure()
+    else:
+        breaker.release()
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# =====================================================
+# STREAMS
+# =====================================================
+
+class BreakerStream:
+    # Wraps a streamed completion: the call only counts as a success once
+    # the last chunk is read, and an error half-way counts as a failure.
+    # Closing it early gives no verdict.
+
+    def __init__(self, stream, breaker):
+        self._stream = stream
+        self._breaker = breaker
+        self._done = False
+
+    def _finish(self, exc=None):
+        if self._done:
+            return
+        self._done = True
+        if exc is None:
+            self._breaker.record_success()
+        else:
+            record_outcome(self._breaker, exc)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception as exc:
+            self._finish(exc)
+            raise
+
+    def close(self):
+        if not self._done:
+            self._done = True
+            self._breaker.release()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+
+class AsyncBreakerStream(BreakerStream):
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except Exception as exc:
+            self._finish(exc)
+            raise
+
+    async def close(self):
+        if not self._done:
+            self._done = True
+            self._breaker.release()
+        await self._stream.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+# =====================================================
+# CLIENTS
+# =====================================================
+
+class LLMClient:
+    # Groq client on a pooled keep-alive httpx.Client with explicit
+    # connect/read timeouts, jittered retries and a circuit breaker.
+    # Exposes the same chat.completions.create(...) shape as the SDK.
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        breaker=None,
+        max_connections=MAX_CONNECTIONS
+    ):
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        # SDK retries are off: retries happen here, under the breaker
+        self.sdk = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=self.http
+        )
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _create_with_retries(self, kwargs):
+        attempt = 0
+        while True:
+            try:
+                return self.sdk.chat.completions.create(**kwargs)
+            except Exception as exc:
+                if not is_retryable(exc) or attempt >= self.max_retries:
+                    raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    def create(self, **kwargs):
+        # The retries run under one breaker permit and report one outcome
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM provider circuit is open")
+        try:
+            result = self._create_with_retries(kwargs)
+        except Exception as exc:
+            record_outcome(self.breaker, exc)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        if kwargs.get("stream"):
+            return BreakerStream(result, self.breaker)
+        self.breaker.record_success()
+        return result
+
+    def close(self):
+        self.http.close()
+
+
+class AsyncLLMClient:
+    # asyncio variant for concurrent callers; same policy as LLMClient
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        breaker=None,
+        max_connections=MAX_CONNECTIONS
+    ):
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        self.sdk = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=self.http
+        )
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def _create_with_retries(self, kwargs):
+        attempt = 0
+        while True:
+            try:
+                return await self.sdk.chat.completions.create(**kwargs)
+            except Exception as exc:
+                if not is_retryable(exc) or attempt >= self.max_retries:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def create(self, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM provider circuit is open")
+        try:
+            result = await self._create_with_retries(kwargs)
+        except Exception as exc:
+            record_outcome(self.breaker, exc)
+            raise
+        except BaseException:
+            # e.g. cancelled by a timeout around the call
+            self.breaker.release()
+            raise
+
+        if kwargs.get("stream"):
+            return AsyncBreakerStream(result, self.breaker)
+        self.breaker.record_success()
+        return result
+
+    async def close(self):
+        await self.http.aclose()
@@ -0,0 +1,401 @@
+import functools
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+# STRESSGUARD_METRICS=0 leaves every function unwrapped
+ENABLED = os.environ.get("STRESSGUARD_METRICS", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("STRESSGUARD_SLOW_QUERY_MS", 100))
+SLOW_QUERIES_KEPT = 100
+
+# Histogram upper bounds in seconds (Prometheus `le`); +Inf is implied
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_PREFIX = "stressguard"
+
+_local = threading.local()
+
+# STRESSGUARD_SLOW_QUERY_LOG: also append slow queries to this file
+if os.environ.get("STRESSGUARD_SLOW_QUERY_LOG"):
+    _handler = logging.FileHandler(os.environ["STRESSGUARD_SLOW_QUERY_LOG"], encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(_handler)
+
+
+# =====================================================
+# HISTOGRAMS
+# =====================================================
+
+class Histogram:
+    # Not locked itself; Registry.observe holds the lock
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket holding the q-th call
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Registry:
+    # One lock for everything: an observation is a few integer updates,
+    # far cheaper than anything being measured
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._gauges = {}
+        self._slow = deque(maxlen=SLOW_QUERIES_KEPT)
+        self.slow_total = 0
+        self._queries = self.histogram("db.query")
+
+    def histogram(self, name):
+        # Wrappers look theirs up once, at decoration time
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            return histogram
+
+    def observe(self, histogram, seconds):
+        with self._lock:
+            histogram.observe(seconds)
+
+    def record_query(self, sql, params, seconds, many=False):
+        self.observe(self._queries, seconds)
+        if seconds * 1000 < self.slow_query_ms:
+            return
+
+        entry = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "ms": round(seconds * 1000, 1),
+            "caller": getattr(_local, "caller", None),
+            "sql": normalize_sql(sql),
+            "params": params_shape(params, many),
+        }
+        with self._lock:
+            self._slow.append(entry)
+            self.slow_total += 1
+        logger.warning(
+            "slow query %.1f ms in %s: %s params=%s",
+            entry["ms"], entry["caller"], entry["sql"], entry["params"]
+        )
+
+    def register_gauge(self, name, help_text, func):
+        # func() -> {label: number}, read at export time
+        self._gauges[name] = (help_text, func)
+
+    def snapshot(self):
+        # Slowest total time first
+        with self._lock:
+            rows = [
+                {
+                    "name": name,
+                    "calls": h.count,
+                    "total_ms": h.sum * 1000,
+                    "mean_ms": h.sum / h.count * 1000,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "p99_ms": h.quantile(0.99) * 1000,
+                    "max_ms": h.max * 1000,
+                }
+                for name, h in self._histograms.items() if h.count
+            ]
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def slow_queries(self):
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
+            self._slow.clear()
+            self.slow_total = 0
+
+    def render_prometheus(self):
+        # Prometheus text exposition format 0.0.4
+        name = f"{PROMETHEUS_PREFIX}_call_duration_seconds"
+        lines = [
+            f"# HELP {name} Latency of instrumented database, scoring and LLM calls",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            histograms = [
+                (label, list(h.counts), h.sum, h.count)
+                for label, h in sorted(self._histograms.items())
+            ]
+            slow_total = self.slow_total
+
+        for label, counts, total, count in histograms:
+            label = _escape(label)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{name="{label}"}} {total}')
+            lines.append(f'{name}_count{{name="{label}"}} {count}')
+
+        lines += [
+            f"# HELP {PROMETHEUS_PREFIX}_slow_queries_total "
+            f"Queries slower than {self.slow_query_ms:g} ms",
+            f"# TYPE {PROMETHEUS_PREFIX}_slow_queries_total counter",
+            f"{PROMETHEUS_PREFIX}_slow_queries_total {slow_total}",
+        ]
+
+        for gauge, (help_text, func) in sorted(self._gauges.items()):
+            try:
+                values = func()
+            except Exception:
+                logger.exception("Gauge %s failed", gauge)
+                continue
+            gauge = f"{PROMETHEUS_PREFIX}_{gauge}"
+            lines += [f"# HELP {gauge} {help_text}", f"# TYPE {gauge} gauge"]
+            lines += [
+                f'{gauge}{{key="{_escape(key)}"}} {value}'
+                for key, value in sorted(values.items())
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            ]
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# =====================================================
+# SLOW-QUERY DETAILS
+# =====================================================
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql):
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def _value_shape(params):
+    # Types only - parameters carry check-in text and password hashes
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+
+    parts = []
+    for value in params:
+        kind = type(value).__name__
+        if parts and parts[-1][0] == kind:
+            parts[-1][1] += 1
+        else:
+            parts.append([kind, 1])
+    return "(" + ", ".join(k if n == 1 else f"{k}x{n}" for k, n in parts) + ")"
+
+def params_shape(params, many=False):
+    if not many:
+        return _value_shape(params or ())
+    if isinstance(params, (list, tuple)):
+        return f"{len(params)} x {_value_shape(params[0])}" if params else "0 rows"
+    return "many"
+
+
+# =====================================================
+# INSTRUMENTATION
+# =====================================================
+
+def timed(name):
+    # Records call count and latency under `name`. Generators are timed
+    # until exhausted or closed, coroutines until they return.
+    def decorator(func):
+        if not ENABLED:
+            return func
+        histogram = registry.histogram(name)
+        observe = registry.observe
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from func(*args, **kwargs)
+                finally:
+                    observe(histogram, time.perf_counter() - start)
+
+        elif inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(histogram, time.perf_counter() - start)
+
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # The innermost timed call is named in slow-query entries
+                caller = getattr(_local, "caller", None)
+                _local.caller = name
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    observe(histogram, time.perf_counter() - start)
+                    _local.caller = caller
+
+        return wrapper
+    return decorator
+
+def instrument_module(namespace, prefix, skip=()):
+    # Wraps the public functions defined in a module, in place; call at
+    # the bottom of the module with globals()
+    module = namespace["__name__"]
+    for attr, value in list(namespace.items()):
+        if (attr.startswith("_") or attr in skip or not inspect.isfunction(value)
+                or value.__module__ != module):
+            continue
+        namespace[attr] = timed(f"{prefix}.{attr}")(value)
+
+
+class TimedCursor:
+    # sqlite3 cursor proxy feeding the db.query histogram and the
+    # slow-query log; everything else passes straight through
+
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(sql, params)
+        finally:
+            registry.record_query(sql, params, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        finally:
+            registry.record_query(sql, seq_of_params, time.perf_counter() - start, many=True)
+        return self
+
+    def executescript(self, script):
+        start = time.perf_counter()
+        try:
+            self._cursor.executescript(script)
+        finally:
+            registry.record_query(script, (), time.perf_counter() - start)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+
+# =====================================================
+# EXPORT
+# =====================================================
+
+def metrics_snapshot():
+    return registry.snapshot()
+
+def slow_queries():
+    return registry.slow_queries()
+
+def render_prometheus():
+    return registry.render_prometheus()
+
+def write_prometheus(path):
+    # Atomic replace, for node_exporter's textfile collector
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+def _serve(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(
+        target=server.serve_forever, name="stressguard-metrics-http", daemon=True
+    ).start()
+    return server
+
+def _write_periodically(path, interval):
+    def run():
+        while True:
+            try:
+                write_prometheus(path)
+            except OSError:
+                logger.exception("Writing metrics to %s failed", path)
+            time.sleep(interval)
+
+    threading.Thread(target=run, name="stressguard-metrics-file", daemon=True).start()
+
+def start_exporter(port=None, path=None, interval=15.0):
+    # /metrics endpoint on `port` and/or a text file rewritten every
+    # `interval` seconds. Returns what was started.
+    started = []
+    if port:
+        try:
+            _serve(int(port))
+            started.append(f"http://0.0.0.0:{port}/metrics")
+        except OSError as exc:
+            # e.g. a second app process on the same host
+            logger.warning("Metrics endpoint on port %s not started: %s", port, exc)
+    if path:
+        _write_periodically(path, interval)
+        started.append(path)
+    return started
@@ -0,0 +1,181 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+
+MAX_ENTRIES = 2048
+# Entries hold whole result lists, so memory is capped too (estimated)
+MAX_BYTES = 64 * 1024 * 1024
+# Larger results would push out most of the cache; they aren't cached
+MAX_ENTRY_FRACTION = 8
+SIZE_SAMPLE = 16          # rows measured per list when estimating
+# Safety net for writes this process never sees (manage.py, other
+# workers) and for "last 7 days" windows that move with the clock
+TTL = 60.0
+
+
+class QueryCache:
+    # LRU of read-function results keyed on (function, arguments, data
+    # versions). Writes bump the version of the user / team / org they
+    # touch after commit, so stale entries are never looked up again and
+    # simply age out of the LRU. Cached results are shared between
+    # callers and must be treated as read-only.
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = max_entries > 0 and max_bytes > 0
+
+        self._data = OrderedDict()     # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._versions = {}            # scope -> counter
+        self._epoch = 0                # bumped by invalidate_all()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version_key(self, scopes):
+        with self._lock:
+            return (self._epoch,) + tuple(self._versions.get(s, 0) for s in scopes)
+
+    def bump(self, *scopes):
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def invalidate_all(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                del self._data[key]
+                self._bytes -= entry[2]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes // MAX_ENTRY_FRACTION:
+            return
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._data.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def estimate_size(value, depth=0):
+    # Rough deep size in bytes. Long lists are extrapolated from their
+    # first rows, so sizing a 100k-row result costs as much as 16 rows.
+    size = sys.getsizeof(value)
+    if depth > 3 or value is None or isinstance(value, (str, bytes, int, float)):
+        return size
+
+    if isinstance(value, dict):
+        value = list(value.items())
+    try:
+        count = len(value)
+        sample = list(islice(value, SIZE_SAMPLE))
+    except TypeError:
+        return size
+
+    if sample:
+        size += sum(estimate_size(item, depth + 1) for item in sample) * count // len(sample)
+    return size
+
+
+# STRESSGUARD_QUERY_CACHE=0 turns caching off
+query_cache = QueryCache(
+    max_entries=int(os.environ.get("STRESSGUARD_QUERY_CACHE_SIZE", MAX_ENTRIES))
+    if os.environ.get("STRESSGUARD_QUERY_CACHE", "1") != "0" else 0,
+    max_bytes=int(os.environ.get("STRESSGUARD_QUERY_CACHE_BYTES", MAX_BYTES))
+)
+
+
+# Parameter holding the id of each scope; "org" covers everything
+SCOPE_PARAMS = {"user": "user_id", "team": "manager_id"}
+
+
+def cached(*scopes):
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+        for scope in scopes:
+            if scope != "org" and SCOPE_PARAMS[scope] not in signature.parameters:
+                raise TypeError(f"{name} has no {SCOPE_PARAMS[scope]} for its {scope} scope")
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not query_cache.enabled:
+                return func(*args, **kwargs)
+
+            # Positional or keyword, defaults filled in: one key per call
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+
+            keyed = tuple(
+                (scope, arguments[SCOPE_PARAMS[scope]]) if scope != "org" else ("org",)
+                for scope in scopes
+            )
+            key = (
+                name, tuple(arguments.items()),
+                # Taken before the query runs, so a write that commits
+                # meanwhile can't get its stale result cached as new
+                query_cache.version_key(keyed)
+            )
+
+            found, value = query_cache.get(key)
+            if found:
+                return value
+
+            value = func(*args, **kwargs)
+            query_cache.put(key, value)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def bump(*scopes):
+    query_cache.bump(*scopes)
+
+def invalidate_all():
+    query_cache.invalidate_all()
+
+def query_cache_stats():
+    return query_cache.stats()
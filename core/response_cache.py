@@ -0,0 +1,142 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from core.sentiment import normalize_text
+
+
+def stress_band(stress_score):
+    # Same bands as the chatbot's tone rules
+    if stress_score <= 40:
+        return "low"
+    if stress_score <= 70:
+        return "mid"
+    return "high"
+
+
+def normalize_message(text):
+    return normalize_text(text).strip(" .!?")
+
+
+class ResponseCache:
+    # LRU cache for chatbot replies keyed on (normalized message, stress
+    # band, history fingerprint). Only used when the prompt history is at
+    # most `max_history` messages, since longer conversations rarely
+    # repeat. Bounded by entry count and total bytes, with a TTL, and
+    # optionally persisted to a SQLite file so it survives restarts.
+
+    def __init__(self, max_entries=512, max_bytes=1_000_000, ttl=6 * 3600,
+                 max_history=2, db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_history = max_history
+
+        self._data = OrderedDict()   # key -> (reply, latency, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    reply TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._load()
+
+    def key(self, message, stress_score, history=None):
+        history = history or []
+        if len(history) > self.max_history:
+            return None
+
+        digest = hashlib.sha1()
+        digest.update(stress_band(stress_score).encode())
+        digest.update(b"\0" + normalize_message(message).encode())
+        for msg in history:
+            digest.update(b"\0" + msg["role"].encode() + b":" + normalize_message(msg["message"]).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                self.saved_latency += entry[1]
+                return entry[0]
+            if entry is not None:
+                self._evict(key)
+            self.misses += 1
+            return None
+
+    def put(self, key, reply, latency):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            stored = self._store(key, reply, latency, expires_at)
+            if self._db is not None:
+                # A rejected reply also drops what was stored under its key
+                if stored:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                        (key, reply, latency, expires_at)
+                    )
+                else:
+                    self._db.execute("DELETE FROM response_cache WHERE key=?", (key,))
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_latency": self.saved_latency
+            }
+
+    # -------------------------------------------------
+
+    def _store(self, key, reply, latency, expires_at):
+        # False when the reply alone is over max_bytes
+        if key in self._data:
+            self._evict(key, persist=False)
+
+        size = len(key) + len(reply.encode())
+        if size > self.max_bytes:
+            return False
+
+        self._data[key] = (reply, latency, expires_at, size)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._data)))
+        return True
+
+    def _evict(self, key, persist=True):
+        _, _, _, size = self._data.pop(key)
+        self._bytes -= size
+        if persist and self._db is not None:
+            self._db.execute("DELETE FROM response_cache WHERE key=?", (key,))
+            self._db.commit()
+
+    def _load(self):
+        now = time.time()
+        self._db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, reply, latency, expires_at FROM response_cache ORDER BY expires_at"
+        ).fetchall()
+        for key, reply, latency, expires_at in rows:
+            self._store(key, reply, latency, expires_at)
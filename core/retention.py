@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import time
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core.database import after_commit, close_all_connections, db_cursor, get_db_path
+from core.query_cache import invalidate_all
+
+
+# Rows older than `days` move to the archive; `text` is stored zlib
+# compressed there. The daily rollup and the score histograms are never
+# archived, so weekly and monthly analytics and the box plots keep
+# working without the archive attached.
+Policy = namedtuple("Policy", ["table", "days", "columns", "text"])
+
+POLICIES = {
+    "stress_logs": Policy(
+        "stress_logs", 365,
+        ("id", "timestamp", "user_id", "user_text", "stress_score"), "user_text"
+    ),
+    "chat_history": Policy(
+        "chat_history", 180,
+        ("id", "timestamp", "user_id", "role", "message"), "message"
+    ),
+}
+
+BATCH_SIZE = 500
+BATCH_PAUSE = 0.05        # seconds between batches, lets app writers in
+VACUUM_PAGES = 1000       # pages reclaimed per incremental_vacuum step
+
+ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS stress_logs (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        user_text BLOB NOT NULL,
+        stress_score INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_stress_logs_user_ts ON stress_logs(user_id, timestamp)",
+    """
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        message BLOB NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history(user_id, id)",
+)
+
+
+def get_archive_path():
+    if os.environ.get("STRESSGUARD_ARCHIVE_PATH"):
+        return os.environ["STRESSGUARD_ARCHIVE_PATH"]
+
+    root, ext = os.path.splitext(get_db_path())
+    return f"{root}-archive{ext or '.db'}"
+
+def compress_text(text):
+    return zlib.compress(text.encode("utf-8"), 6)
+
+def decompress_text(blob):
+    return zlib.decompress(blob).decode("utf-8")
+
+def _ro_uri(path):
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+# =====================================================
+# ARCHIVING
+# =====================================================
+
+def open_archive(path=None):
+    conn = sqlite3.connect(path or get_archive_path())
+    conn.execute("PRAGMA journal_mode = WAL")
+    # Rows are deleted from the hot file right after this commit
+    conn.execute("PRAGMA synchronous = FULL")
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+def archive_table(policy, archive, now=None, batch_size=BATCH_SIZE, pause=BATCH_PAUSE):
+    # Copy a batch to the archive and commit it, then delete it from the
+    # hot file in its own short transaction. INSERT OR IGNORE makes a
+    # batch that was copied but not yet deleted safe to repeat, so an
+    # interrupted run simply resumes.
+    cutoff = ((now or datetime.now()) - timedelta(days=policy.days)).strftime("%Y-%m-%d %H:%M:%S")
+    columns = ", ".join(policy.columns)
+    text_index = policy.columns.index(policy.text)
+    moved = 0
+
+    while True:
+        with db_cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {columns} FROM {policy.table}
+                WHERE timestamp < ?
+                ORDER BY id
+                LIMIT ?
+            """, (cutoff, batch_size))
+            rows = [tuple(row) for row in cursor.fetchall()]
+
+        if not rows:
+            return moved
+
+        archive.executemany(
+            f"INSERT OR IGNORE INTO {policy.table} ({columns}) "
+            f"VALUES ({', '.join('?' * len(policy.columns))})",
+            [
+                row[:text_index] + (compress_text(row[text_index]),) + row[text_index + 1:]
+                for row in rows
+            ]
+        )
+        archive.commit()
+
+        with db_cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {policy.table} WHERE id=?",
+                [(row[0],) for row in rows]
+            )
+            after_commit(invalidate_all)
+
+        moved += len(rows)
+        if pause:
+            time.sleep(pause)
+
+def run_retention(policies=None, archive_path=None, batch_size=BATCH_SIZE,
+                  pause=BATCH_PAUSE, vacuum_pages=VACUUM_PAGES):
+    archive = open_archive(archive_path)
+    try:
+        moved = {
+            policy.table: archive_table(policy, archive, batch_size=batch_size, pause=pause)
+            for policy in (policies or POLICIES.values())
+        }
+    finally:
+        archive.close()
+
+    moved["reclaimed_pages"] = incremental_vacuum(vacuum_pages)
+    return moved
+
+
+# =====================================================
+# SPACE RECLAIM
+# =====================================================
+
+def auto_vacuum_mode():
+    with db_cursor() as cursor:
+        return cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+def enable_incremental_vacuum():
+    # Databases created before auto_vacuum was set need one full VACUUM
+    # to switch modes. That rewrites the whole file under an exclusive
+    # lock, so it is an explicit maintenance step.
+    conn = sqlite3.connect(get_db_path(), isolation_level=None)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    # Pooled connections keep reporting the old mode until reopened
+    close_all_connections()
+    return True
+
+def incremental_vacuum(pages=VACUUM_PAGES):
+    # Returns free pages handed back to the filesystem, a step at a time
+    if auto_vacuum_mode() != 2:
+        return 0
+
+    reclaimed = 0
+    while True:
+        with db_cursor() as cursor:
+            free = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                return reclaimed
+            # execute() would step the pragma once, i.e. free one page
+            cursor.executescript(f"PRAGMA incremental_vacuum({pages})")
+            left = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        if left >= free:
+            return reclaimed
+        reclaimed += free - left
+
+
+# =====================================================
+# READING ARCHIVED DATA
+# =====================================================
+
+@contextmanager
+def archive_cursor():
+    # Read-only connection to the hot file with the archive attached
+    # read-only as `archive`; yields None when nothing is archived yet
+    archive_path = get_archive_path()
+    if not os.path.exists(archive_path):
+        yield None
+        return
+
+    conn = sqlite3.connect(_ro_uri(get_db_path()), uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (_ro_uri(archive_path),))
+        yield conn.cursor()
+    finally:
+        conn.close()
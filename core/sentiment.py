@@ -1,15 +1,154 @@
-from textblob import TextBlob
+import threading
+import time
+from collections import OrderedDict
+
+from core.metrics import timed
+
+
+def normalize_text(text):
+    # Case- and whitespace-insensitive cache key
+    return " ".join(text.lower().split())
+
+
+class ScoreCache:
+    # Thread-safe LRU with a per-entry TTL. One instance lives inside the
+    # StressAnalyzer returned by load_models(), so every Streamlit session
+    # shares it.
+
+    def __init__(self, max_size=4096, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def polarity_to_score(polarity):
+    # Convert polarity (-1 to 1) to stress score (0 to 100)
+    stress_score = int((1 - polarity) * 50)
+
+    if stress_score < 0:
+        stress_score = 0
+    if stress_score > 100:
+        stress_score = 100
+
+    return stress_score
+
+
+# =====================================================
+# SCORING ENGINES
+# =====================================================
+
+class TextBlobEngine:
+    name = "textblob"
+
+    def __init__(self):
+        from textblob import TextBlob
+        self._blob = TextBlob
+
+    def score(self, text):
+        return polarity_to_score(self._blob(text).sentiment.polarity)
+
+    def score_batch(self, texts):
+        return [self.score(text) for text in texts]
+
+
+def load_engine(engine, **options):
+    if engine == "lexicon":
+        from core.lexicon import LexiconEngine
+        return LexiconEngine(**options)
+    if engine == "textblob":
+        return TextBlobEngine()
+    if engine == "transformer":
+        # torch/transformers are only imported when this engine is chosen
+        from core.transformer_engine import TransformerEngine
+        return TransformerEngine(**options)
+    raise ValueError(f"Unknown stress engine: {engine}")
+
+
+# =====================================================
+# ANALYZER
+# =====================================================
 
 class StressAnalyzer:
+
+    def __init__(self, engine="lexicon", cache_size=4096, cache_ttl=3600, **engine_options):
+        self.engine = load_engine(engine, **engine_options)
+        self.cache = ScoreCache(cache_size, cache_ttl) if cache_size else None
+
+    @timed("sentiment.analyze_text")
     def analyze_text(self, text):
-        polarity = TextBlob(text).sentiment.polarity
+        if self.cache is None:
+            return self.engine.score(text)
+
+        key = normalize_text(text)
+        score = self.cache.get(key)
+        if score is None:
+            score = self.engine.score(text)
+            self.cache.put(key, score)
+        return score
+
+    @timed("sentiment.analyze_batch")
+    def analyze_batch(self, texts):
+        # Duplicates within the batch and cached texts are scored once;
+        # the remaining texts go to the engine in a single batch
+        scores = {}
+        pending = {}
+        for text in texts:
+            key = normalize_text(text)
+            if key in scores or key in pending:
+                continue
+            score = self.cache.get(key) if self.cache else None
+            if score is None:
+                pending[key] = text
+            else:
+                scores[key] = score
 
-        # Convert polarity (-1 to 1) to stress score (0 to 100)
-        stress_score = int((1 - polarity) * 50)
+        if pending:
+            fresh = self.engine.score_batch(list(pending.values()))
+            for key, score in zip(pending, fresh):
+                scores[key] = score
+                if self.cache:
+                    self.cache.put(key, score)
 
-        if stress_score < 0:
-            stress_score = 0
-        if stress_score > 100:
-            stress_score = 100
+        return [scores[normalize_text(text)] for text in texts]
 
-        return stress_score
\ No newline at end of file
+    def cache_stats(self):
+        return self.cache.stats() if self.cache else None
@@ -0,0 +1,177 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+from core.database import (
+    after_commit, backfill_stress_rollup, db_cursor, generate_salt, hash_password,
+    rebuild_stress_state, _observe_score
+)
+from core.query_cache import invalidate_all
+
+
+# Every synthetic account logs in with this password
+SYNTHETIC_PASSWORD = "synthetic"
+USER_PREFIX = "syn-"
+BATCH_SIZE = 50000        # check-ins per transaction
+TEAM_SIZE = 20            # employees per manager by default
+
+# Check-in texts by stress band (score <= 40, <= 70, above)
+TEXTS = (
+    [
+        "Feeling great after the team lunch today!",
+        "Had a calm, productive morning",
+        "Super excited about the new role",
+        "Good week, I finally closed out the backlog",
+    ],
+    [
+        "Not bad, just a normal day",
+        "The meeting went okay I guess",
+        "too much work",
+        "A bit tired but managing",
+    ],
+    [
+        "I am exhausted and can't keep up with these deadlines",
+        "I'm really anxious about the review tomorrow",
+        "Everything is falling apart and nobody helps",
+        "I feel overwhelmed and tired all the time",
+    ],
+)
+
+REPLIES = [
+    "Thanks for sharing. What would make tomorrow a little easier?",
+    "That sounds like a lot. Try a short break and a glass of water.",
+    "Glad to hear it! What went well today?",
+    "It's okay to ask for help. Could you talk to your manager about priorities?",
+]
+
+
+def _profiles(rng, employees):
+    # (baseline, volatility, weekly phase) per employee; about one in
+    # ten runs hot enough to trip alerts and burnout flags regularly
+    profiles = []
+    for _ in range(employees):
+        if rng.random() < 0.1:
+            baseline = rng.uniform(65, 80)
+        else:
+            baseline = min(max(rng.gauss(45, 10), 10), 65)
+        profiles.append((baseline, rng.uniform(5, 15), rng.uniform(0, 2 * math.pi)))
+    return profiles
+
+def _score(rng, profile, day):
+    baseline, volatility, phase = profile
+    weekly = 8 * math.sin(2 * math.pi * day / 7 + phase)
+    return int(min(max(round(baseline + weekly + rng.gauss(0, volatility)), 0), 100))
+
+def _create_users(employees, managers):
+    salt = generate_salt()
+    password = hash_password(SYNTHETIC_PASSWORD, salt)
+
+    accounts = [(f"{USER_PREFIX}emp{i}", "employee") for i in range(employees)]
+    accounts += [(f"{USER_PREFIX}mgr{i}", "manager") for i in range(managers)]
+    accounts.append((f"{USER_PREFIX}admin", "admin"))
+
+    with db_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users (username, password, salt, role) VALUES (?, ?, ?, ?)",
+            [(name, password, salt, role) for name, role in accounts]
+        )
+        cursor.execute(
+            "SELECT username, id FROM users WHERE username LIKE ?",
+            (USER_PREFIX + "%",)
+        )
+        ids = {row["username"]: row["id"] for row in cursor.fetchall()}
+
+        employee_ids = [ids[f"{USER_PREFIX}emp{i}"] for i in range(employees)]
+        manager_ids = [ids[f"{USER_PREFIX}mgr{i}"] for i in range(managers)]
+        if manager_ids:
+            cursor.executemany(
+                "INSERT INTO manager_team (manager_id, employee_id) VALUES (?, ?)",
+                [(manager_ids[i % len(manager_ids)], e) for i, e in enumerate(employee_ids)]
+            )
+
+    return employee_ids, manager_ids
+
+def generate_org(employees=1000, managers=None, logs=100000, start="2025-01-01",
+                 days=365, chat=True, seed=0, batch_size=BATCH_SIZE, progress=None):
+    # Deterministic for a given seed and arguments: same users, teams,
+    # scores, texts and timestamps every run. Check-ins are spread evenly
+    # over the date range in time order and go through the same alert
+    # engine as the app; the rollup and EWMA state are rebuilt at the end.
+    rng = random.Random(seed)
+    # Separate stream, so chat=False still yields the same check-ins
+    reply_rng = random.Random(seed + 1)
+    managers = max(1, employees // TEAM_SIZE) if managers is None else managers
+
+    with db_cursor() as cursor:
+        cursor.execute("SELECT 1 FROM users WHERE username LIKE ? LIMIT 1", (USER_PREFIX + "%",))
+        if cursor.fetchone():
+            raise ValueError("Database already has synthetic users; seed a fresh file")
+
+    employee_ids, manager_ids = _create_users(employees, managers)
+    profiles = _profiles(rng, employees)
+
+    origin = datetime.fromisoformat(start)
+    step = days * 86400 / max(logs, 1)
+
+    done = 0
+    while done < logs:
+        batch = []
+        for k in range(done, min(logs, done + batch_size)):
+            who = rng.randrange(employees)
+            moment = origin + timedelta(seconds=k * step)
+            score = _score(rng, profiles[who], k * step / 86400)
+            band = 0 if score <= 40 else 1 if score <= 70 else 2
+            batch.append((
+                moment.strftime("%Y-%m-%d %H:%M:%S"), employee_ids[who],
+                rng.choice(TEXTS[band]), score
+            ))
+
+        with db_cursor() as cursor:
+            cursor.executemany("""
+                INSERT INTO stress_logs (timestamp, user_id, user_text, stress_score)
+                VALUES (?, ?, ?, ?)
+            """, batch)
+
+            if chat:
+                cursor.executemany("""
+                    INSERT INTO chat_history (timestamp, user_id, role, message)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    message
+                    for timestamp, user_id, text, _ in batch
+                    for message in (
+                        (timestamp, user_id, "user", text),
+                        (timestamp, user_id, "assistant", reply_rng.choice(REPLIES)),
+                    )
+                ])
+
+            for timestamp, user_id, _, score in batch:
+                _observe_score(cursor, user_id, score, timestamp)
+
+            after_commit(invalidate_all)
+
+        done += len(batch)
+        if progress:
+            progress(done, logs)
+
+    backfill_stress_rollup()
+    rebuild_stress_state()
+
+    with db_cursor() as cursor:
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM alerts a
+            JOIN users u ON u.id = a.user_id
+            WHERE u.username LIKE ?
+        """, (USER_PREFIX + "%",))
+        alerts = cursor.fetchone()[0]
+
+    return {
+        "employees": employees,
+        "managers": len(manager_ids),
+        "logs": logs,
+        "chat_messages": logs * 2 if chat else 0,
+        "alerts": alerts,
+        "employee_ids": employee_ids,
+        "manager_ids": manager_ids,
+    }
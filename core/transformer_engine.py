@@ -0,0 +1,192 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from core.sentiment import polarity_to_score
+
+
+# Label names (lower-cased) counted towards each side of the polarity.
+# Anything else, e.g. "neutral" or "surprise", contributes nothing.
+NEGATIVE_LABELS = {"negative", "neg", "anger", "fear", "sadness", "disgust", "stress"}
+POSITIVE_LABELS = {"positive", "pos", "joy", "love", "optimism", "calm"}
+
+_STOP = object()
+
+
+class TransformerEngine:
+    # Local sequence-classification model with dynamic micro-batching.
+    # Concurrent score() calls are queued and run together, either when
+    # max_batch_size texts are waiting or max_latency_ms has passed since
+    # the first one arrived.
+
+    name = "transformer"
+
+    def __init__(
+        self,
+        model_dir=None,
+        threads=None,
+        quantize=False,
+        max_batch_size=16,
+        max_latency_ms=10,
+        max_length=256
+    ):
+        model_dir = model_dir or os.environ.get("STRESSGUARD_MODEL_DIR")
+        if not model_dir:
+            raise ValueError("TransformerEngine needs model_dir or STRESSGUARD_MODEL_DIR")
+
+        if threads:
+            torch.set_num_threads(int(threads))
+
+        # Never reach out to the hub: the model must already be on disk
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir, local_files_only=True)
+        model.eval()
+
+        if quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.max_length = max_length
+        self._weights = self._label_weights(model.config.id2label)
+
+        # Queued calls run so far, and how many went through in batches
+        self.batches = 0
+        self.batched_texts = 0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stressguard-transformer-batcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _label_weights(id2label):
+        labels = [str(id2label[i]).lower() for i in range(len(id2label))]
+        weights = [
+            -1.0 if label in NEGATIVE_LABELS else 1.0 if label in POSITIVE_LABELS else 0.0
+            for label in labels
+        ]
+
+        # Generic LABEL_0..LABEL_n heads follow the SST-2 convention:
+        # first class negative, last class positive
+        if not any(weights):
+            weights[0], weights[-1] = -1.0, 1.0
+
+        return torch.tensor(weights)
+
+    def _infer(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+
+        with torch.inference_mode():
+            probs = self.model(**encoded).logits.softmax(dim=-1)
+
+        polarity = (probs * self._weights).sum(dim=-1)
+        return [polarity_to_score(p) for p in polarity.tolist()]
+
+    # -------------------------------------------------
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def score(self, text):
+        return self.submit(text).result()
+
+    def score_batch(self, texts):
+        # Already a batch: skip the queue and run in max_batch_size chunks
+        scores = []
+        for start in range(0, len(texts), self.max_batch_size):
+            scores.extend(self._infer(texts[start:start + self.max_batch_size]))
+        return scores
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.batched_texts += len(batch)
+            try:
+                scores = self._infer([text for text, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), score in zip(batch, scores):
+                future.set_result(score)
+
+
+def save_tiny_model(model_dir, words=()):
+    # Randomly initialised two-layer BERT classifier and a word-level
+    # vocabulary, written where TransformerEngine loads from. Its scores
+    # mean nothing; it exercises the engine (tokenising, padding,
+    # micro-batching) without downloading a model.
+    from transformers import AutoConfig, BertTokenizerFast
+
+    os.makedirs(model_dir, exist_ok=True)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab += sorted({w for text in words for w in text.lower().split()} - set(vocab))
+    vocab_file = os.path.join(model_dir, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(model_dir)
+
+    config = AutoConfig.for_model(
+        "bert",
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=512,
+        num_labels=2,
+    )
+    torch.manual_seed(0)
+    AutoModelForSequenceClassification.from_config(config).save_pretrained(model_dir)
+    return model_dir
@@ -0,0 +1,114 @@
+import atexit
+import logging
+import queue
+import threading
+
+from core.database import db_cursor, record_checkin, _now
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+# =====================================================
+# WRITE-BEHIND CHECK-IN QUEUE
+# =====================================================
+
+class CheckinWriter:
+    # Batches check-ins from many sessions into grouped commits on a
+    # single background thread. The queue is bounded, so submit() blocks
+    # (or raises queue.Full) instead of buffering without limit.
+
+    def __init__(self, max_queue=1000, batch_size=100, flush_interval=0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "failed": 0}
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stressguard-checkin-writer",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, user_id, user_text, reply, stress_score, block=True, timeout=None):
+        if self._closed:
+            raise RuntimeError("CheckinWriter is closed")
+
+        # Stamp the check-in when it happened, not when it is written
+        item = (user_id, user_text, reply, stress_score, _now())
+        self._queue.put(item, block=block, timeout=timeout)
+
+        with self._lock:
+            self.stats["submitted"] += 1
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # -------------------------------------------------
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _write(self, batch):
+        try:
+            with db_cursor():
+                for item in batch:
+                    record_checkin(*item)
+            written, failed = len(batch), 0
+        except Exception:
+            # One bad row must not drop the whole batch: retry one by one
+            written, failed = 0, 0
+            for item in batch:
+                try:
+                    record_checkin(*item)
+                    written += 1
+                except Exception:
+                    failed += 1
+                    logger.exception("Dropping check-in for user %s", item[0])
+
+        with self._lock:
+            self.stats["written"] += written
+            self.stats["failed"] += failed
+            self.stats["batches"] += 1
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stopping:
+                self._queue.task_done()
@@ -0,0 +1,702 @@
+import argparse
+import ast
+import csv
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import init_db, backfill_stress_rollup, rebuild_stress_state
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Must never load before the login screen renders
+HEAVY_MODULES = ("pandas", "plotly", "groq", "textblob", "nltk", "torch", "transformers")
+# Cold `import app` up to the login screen, best of a few runs
+IMPORT_BUDGET_MS = float(os.environ.get("STRESSGUARD_IMPORT_BUDGET_MS", 1000))
+
+# Runs app.py up to the login screen outside `streamlit run`. The model
+# worker is held idle (it loads the chatbot off the login path by design)
+# and st.stop() ends the script, as it does under the real runtime.
+APP_IMPORT = """
+import concurrent.futures, sys
+import streamlit as st
+concurrent.futures.ThreadPoolExecutor.submit = lambda self, fn, *a, **k: concurrent.futures.Future()
+st.stop = sys.exit
+import app
+"""
+
+# Fallback corpus when no CSV is given
+SAMPLE_TEXTS = [
+    "I'm fine",
+    "too much work",
+    "Feeling great after the team lunch today!",
+    "I am exhausted and can't keep up with these deadlines",
+    "Not bad, just a normal day",
+    "I'm really anxious about the review tomorrow",
+    "Everything is falling apart and nobody helps",
+    "Had a calm, productive morning",
+    "I'm not happy with how the project is going",
+    "Super excited about the new role",
+    "I feel overwhelmed and tired all the time",
+    "The meeting went okay I guess",
+]
+
+def load_texts(path, column):
+    if not path:
+        return list(SAMPLE_TEXTS)
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row[column] for row in csv.DictReader(f) if row.get(column)]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# =====================================================
+# COMMANDS
+# =====================================================
+
+def cmd_backfill_rollup(args):
+    days = backfill_stress_rollup()
+    print(f"Rebuilt stress_daily_rollup: {days} user-days")
+
+def cmd_rebuild_stress_state(args):
+    users = rebuild_stress_state()
+    print(f"Rebuilt user_stress_state: {users} users")
+
+def cmd_resolve_alerts(args):
+    from core.database import resolve_cooled_alerts
+
+    resolved = resolve_cooled_alerts()
+    print(f"Resolved {resolved} alerts past the cool-down")
+
+def cmd_archive(args):
+    from core.retention import (
+        POLICIES, enable_incremental_vacuum, run_retention
+    )
+
+    if args.enable_incremental_vacuum and enable_incremental_vacuum():
+        print("Switched to auto_vacuum=INCREMENTAL (full VACUUM done)")
+
+    policies = []
+    for name, policy in POLICIES.items():
+        days = getattr(args, f"{name}_days")
+        policies.append(policy._replace(days=days) if days is not None else policy)
+
+    result = run_retention(
+        policies,
+        archive_path=args.archive,
+        batch_size=args.batch_size,
+        pause=args.pause
+    )
+    for name, count in result.items():
+        print(f"{name:16} {count}")
+
+def cmd_import_csv(args):
+    from core.importer import import_csv
+
+    def progress(rows, imported, skipped, rate):
+        print(f"\r{rows:>10} rows  {imported:>10} imported  {skipped:>8} skipped  "
+              f"{rate:8.0f} rows/s", end="", flush=True)
+
+    try:
+        result = import_csv(
+            args.path,
+            user_column=args.user_column,
+            text_column=args.text_column,
+            timestamp_column=args.timestamp_column,
+            engine=args.engine,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            create_missing_users=args.create_users,
+            restart=args.restart,
+            progress=progress
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Import failed: {exc}")
+        return 1
+
+    print()
+    if result["resumed_from"]:
+        print(f"Resumed after row {result['resumed_from']}")
+    print(f"Imported {result['imported']} of {result['rows']} rows "
+          f"({result['skipped']} skipped) in {result['seconds']:.1f} s")
+
+def cmd_bench_analyzer(args):
+    from core.sentiment import StressAnalyzer
+
+    texts = load_texts(args.csv, args.text_column)
+    texts = (texts * (args.n // len(texts) + 1))[:args.n]
+
+    model_dir = args.model_dir
+    if args.tiny_model:
+        import tempfile
+        from core.transformer_engine import save_tiny_model
+        model_dir = save_tiny_model(tempfile.mkdtemp(), texts)
+
+    for engine in args.engine or ["lexicon"]:
+        options = {}
+        if engine == "transformer":
+            options = {
+                "model_dir": model_dir,
+                "threads": args.threads,
+                "quantize": args.quantize
+            }
+
+        # Cache disabled so every call hits the engine; the first call
+        # (lazy lexicon load, torch kernel setup) is kept out of the timing
+        analyzer = StressAnalyzer(engine=engine, cache_size=0, **options)
+        analyzer.analyze_text("warm up")
+
+        def timed_call(text):
+            t0 = time.perf_counter()
+            analyzer.analyze_text(text)
+            return time.perf_counter() - t0
+
+        # Concurrent callers let the transformer engine micro-batch
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(timed_call, texts))
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyzer.analyze_batch(list(dict.fromkeys(texts)))
+        batch = time.perf_counter() - start
+
+        print(
+            f"{engine:12} {len(texts) / single:10.0f} texts/s  "
+            f"p50 {percentile(latencies, 50) * 1000:7.3f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:7.3f} ms  "
+            f"batch({len(set(texts))}) {batch * 1000:8.1f} ms"
+        )
+
+        batches = getattr(analyzer.engine, "batches", None)
+        if batches:
+            print(f"{'':12} {batches} micro-batches, "
+                  f"{analyzer.engine.batched_texts / batches:.1f} texts each")
+
+def cmd_lexicon_report(args):
+    from core.lexicon import LexiconEngine
+    from core.sentiment import TextBlobEngine
+
+    texts = list(dict.fromkeys(load_texts(args.csv, args.text_column)))
+    lexicon, textblob = LexiconEngine(), TextBlobEngine()
+
+    # Both engines load their lexicon lazily; keep that out of the timing
+    lexicon.score("warm up")
+    textblob.score("warm up")
+
+    start = time.perf_counter()
+    fast = lexicon.score_batch(texts)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = textblob.score_batch(texts)
+    slow_time = time.perf_counter() - start
+
+    def band(score):
+        return 0 if score <= 40 else 1 if score <= 70 else 2
+
+    pairs = list(zip(texts, fast, slow))
+    diffs = [abs(a - b) for _, a, b in pairs]
+    n = len(pairs)
+
+    print(f"Texts:               {n}")
+    print(f"Exact score match:   {sum(d == 0 for d in diffs) / n:.1%}")
+    print(f"Within 5 points:     {sum(d <= 5 for d in diffs) / n:.1%}")
+    print(f"Same stress band:    {sum(band(a) == band(b) for _, a, b in pairs) / n:.1%}")
+    print(f"Mean abs difference: {sum(diffs) / n:.2f}")
+    print(f"Speedup vs TextBlob: {slow_time / fast_time:.1f}x")
+
+    if args.show:
+        print("\nLargest disagreements (lexicon, textblob):")
+        disagreements = [p for p in pairs if p[1] != p[2]]
+        for text, a, b in sorted(disagreements, key=lambda p: -abs(p[1] - p[2]))[:args.show]:
+            print(f"  {a:3} {b:3}  {text[:70]}")
+
+def cmd_bench_logins(args):
+    # Login storm against a throwaway database: the old per-login audit
+    # commit vs the buffered AuditLogger
+    import tempfile
+    from core.audit import AuditLogger, write_events
+    from core.database import _now, db_cursor, login_user, register_user
+    import core.audit
+
+    os.environ["STRESSGUARD_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    init_db()
+    register_user("bench", "bench", "employee")
+
+    def run(login):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(login, range(args.n)))
+        return time.perf_counter() - start
+
+    def direct_login(_):
+        with db_cursor() as cursor:
+            cursor.execute("SELECT * FROM users WHERE username=?", ("bench",))
+            cursor.fetchone()
+        write_events([(_now(), "bench", "User Logged In")])
+
+    direct = run(direct_login)
+
+    core.audit._audit_logger = logger = AuditLogger()
+    buffered = run(lambda _: login_user("bench", "bench"))
+    logger.flush()
+    stats = logger.stats
+
+    print(f"Logins:      {args.n} ({args.concurrency} concurrent)")
+    print(f"Per-login:   {args.n / direct:8.0f} logins/s  {args.n} audit commits")
+    print(f"Buffered:    {args.n / buffered:8.0f} logins/s  {stats['flushes']} audit commits "
+          f"({stats['written'] / max(stats['flushes'], 1):.0f} rows each)")
+
+EXPORT_SCRIPTS = {
+    # Peak RSS is measured in a fresh interpreter per variant
+    "streaming": """
+from core.export import export_stress_logs
+with open(OUT, "wb") as f:
+    rows = export_stress_logs(f)
+""",
+    # What the History tab used to do: everything in memory, then one string
+    "in-memory": """
+import csv, io
+from core.database import get_connection
+rows = get_connection().execute(
+    "SELECT s.timestamp, u.username, s.stress_score, s.user_text "
+    "FROM stress_logs s JOIN users u ON u.id = s.user_id ORDER BY s.timestamp"
+).fetchall()
+buf = io.StringIO()
+csv.writer(buf).writerows(rows)
+with open(OUT, "w") as f:
+    f.write(buf.getvalue())
+rows = len(rows)
+""",
+}
+
+def seed_export_rows(n, users=1000):
+    from core.database import db_cursor
+
+    with db_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users (username, password, salt, role) VALUES (?, '', '', 'employee')",
+            [(f"export{i}",) for i in range(users)]
+        )
+    first = 0
+    while first < n:
+        batch = range(first, min(n, first + 100000))
+        with db_cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO stress_logs (timestamp, user_id, user_text, stress_score) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00",
+                     1 + i % users, f"reflection number {i} about the week", i % 101)
+                    for i in batch
+                )
+            )
+        first += len(batch)
+
+def cmd_bench_export(args):
+    import tempfile
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ["STRESSGUARD_DB_PATH"] = db_path
+    init_db()
+
+    start = time.perf_counter()
+    seed_export_rows(args.rows)
+    print(f"Seeded {args.rows} rows in {time.perf_counter() - start:.1f} s")
+
+    # Checkpoint the WAL so the exports read a settled file
+    from core.database import close_all_connections
+    close_all_connections()
+
+    variants = ["streaming"] + (["in-memory"] if args.compare else [])
+    for name in variants:
+        out = os.path.join(workdir, f"{name}.csv")
+        code = (
+            f"OUT = {out!r}\n" + EXPORT_SCRIPTS[name] +
+            # VmHWM starts over at exec; ru_maxrss would carry this process's peak
+            "hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM')]\n"
+            "print(rows, hwm[0].split()[1])"
+        )
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, cwd=os.path.dirname(APP_PATH)
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            print(f"{name:10} failed: {result.stderr.strip().splitlines()[-1]}")
+            continue
+
+        rows, peak_kb = map(int, result.stdout.split())
+        print(f"{name:10} {rows} rows  {rows / elapsed:9.0f} rows/s  "
+              f"peak RSS {peak_kb / 1024:7.1f} MB  "
+              f"file {os.path.getsize(out) / 1024 / 1024:7.1f} MB")
+
+def seed_synthetic(args, logs, employees):
+    from core.synthetic import generate_org
+
+    def progress(done, total):
+        print(f"\r{done:>10} / {total} check-ins", end="", flush=True)
+
+    start = time.perf_counter()
+    result = generate_org(
+        employees=employees,
+        managers=args.managers,
+        logs=logs,
+        start=args.start,
+        days=args.days,
+        chat=not args.no_chat,
+        seed=args.seed,
+        progress=progress
+    )
+    print()
+    print(f"Seeded {result['employees']} employees, {result['managers']} managers, "
+          f"{result['logs']} check-ins, {result['chat_messages']} chat messages, "
+          f"{result['alerts']} alerts in {time.perf_counter() - start:.1f} s")
+
+def cmd_seed(args):
+    from core.benchmark import SCALES
+
+    logs, employees = SCALES[args.scale]
+    try:
+        seed_synthetic(args, args.logs or logs, args.employees or employees)
+    except ValueError as exc:
+        print(f"Seed failed: {exc}")
+        return 1
+
+def open_seeded(args, default_path):
+    # Points the app at --db (or default_path), seeding it first if it
+    # has no check-ins; one seeded earlier is reused as is (seeding 10m
+    # takes a while). Returns (path, check-ins).
+    from core.benchmark import SCALES
+    from core.database import db_cursor
+
+    logs, employees = SCALES[args.scale]
+    seeded = args.db or default_path
+    os.environ["STRESSGUARD_DB_PATH"] = seeded
+    init_db()
+
+    with db_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM stress_logs")
+        existing = cursor.fetchone()[0]
+    if existing:
+        print(f"Using {seeded} ({existing} check-ins)")
+        return seeded, existing
+
+    seed_synthetic(args, logs, employees)
+    return seeded, logs
+
+def cmd_bench(args):
+    import tempfile
+    from core.benchmark import (
+        build_cases, compare_results, copy_database, load_results, run_benchmarks, save_results
+    )
+    from core.database import close_all_connections
+
+    workdir = tempfile.mkdtemp()
+    seeded, logs = open_seeded(args, os.path.join(workdir, "seed.db"))
+
+    close_all_connections()
+    os.environ["STRESSGUARD_DB_PATH"] = os.path.join(workdir, "run.db")
+    copy_database(seeded, os.environ["STRESSGUARD_DB_PATH"])
+
+    def progress(name, result):
+        print(f"{name:40} {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  "
+              f"({result['runs']} runs)")
+
+    report = run_benchmarks(args.scale, logs, build_cases(logs), args.only, progress)
+    out = args.out or f"bench-{args.scale}.json"
+    save_results(report, out)
+    print(f"Results written to {out}")
+
+    if args.baseline:
+        rows, regressions = compare_results(load_results(args.baseline), report, args.tolerance)
+        print(f"\nAgainst {args.baseline} (median):")
+        for name, old, new, change in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:40} {old:10.3f} -> {new:10.3f} ms  {change:+7.1%}{flag}")
+        if regressions:
+            return 1
+
+def cmd_bench_db(args):
+    # Dashboard page renders with the connection pool vs a connection per
+    # unit of work; reads only, so --db is used in place
+    import tempfile
+    from core.benchmark import build_pages, time_pages
+
+    open_seeded(args, os.path.join(tempfile.mkdtemp(), "seed.db"))
+    pages = build_pages()
+
+    print(f"{args.renders} renders per page, {args.threads} concurrent")
+    print(f"{'page':10} {'mode':10} {'conns/render':>12} {'cursors/render':>14} "
+          f"{'p50 ms':>9} {'p95 ms':>9}")
+    for pooled in (False, True):
+        results = time_pages(pages, args.renders, args.threads, pooled)
+        for page, r in results.items():
+            print(f"{page:10} {'pooled' if pooled else 'per-call':10} "
+                  f"{r['connections_per_render']:12.2f} {r['checkouts_per_render']:14.2f} "
+                  f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f}")
+
+def startup_imports(path=APP_PATH):
+    # Modules app.py imports at module level, i.e. before any page renders
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+def _importtime(code, env=None):
+    # Fresh interpreter per run; returns (total_ms, every module loaded)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(APP_PATH),
+        env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_us, loaded = 0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        loaded.append(name.strip())
+        # Top-level entries are indented by exactly one space
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+
+    return total_us / 1000, loaded
+
+def measure_imports(modules):
+    return _importtime("import " + ", ".join(modules))
+
+def measure_startup():
+    # `import app` against a scratch database, so init_db() never
+    # touches the real one
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, STRESSGUARD_DB_PATH=os.path.join(workdir, "startup.db"))
+        return _importtime(APP_IMPORT, env)
+
+def heavy_imports(loaded):
+    # Streamlit registers lazy plotly stubs itself; only flag what the
+    # app pulls in on top of that
+    _, framework = measure_imports(["streamlit"])
+    return sorted({
+        m for m in set(loaded) - set(framework)
+        if m.split(".")[0] in HEAVY_MODULES
+    })
+
+def cmd_import_budget(args):
+    try:
+        runs = [measure_startup() for _ in range(args.runs)]
+    except RuntimeError as exc:
+        print(f"Import failed: {exc}")
+        return 1
+
+    best_ms, loaded = min(runs, key=lambda run: run[0])
+    heavy = heavy_imports(loaded)
+
+    print(f"Startup imports: {', '.join(startup_imports())}")
+    print(f"Cold import time: {best_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms} ms)")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules loaded at startup: {', '.join(heavy)}")
+        failed = True
+    if best_ms > args.budget_ms:
+        print("FAIL: cold-start import time over budget")
+        failed = True
+
+    return 1 if failed else 0
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="manage.py",
+        description="StressGuard AI maintenance commands"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-rollup",
+        help="Rebuild the daily stress rollup and score histograms from stress_logs and the archive"
+    )
+    backfill.set_defaults(func=cmd_backfill_rollup)
+
+    state = commands.add_parser(
+        "rebuild-stress-state",
+        help="Recompute every user's time-decayed stress average from stress_logs"
+    )
+    state.set_defaults(func=cmd_rebuild_stress_state)
+
+    resolve = commands.add_parser(
+        "resolve-alerts",
+        help="Auto-resolve open alerts with no trigger for the cool-down period "
+             "(the app also does this every STRESSGUARD_ALERT_SWEEP_SECONDS)"
+    )
+    resolve.set_defaults(func=cmd_resolve_alerts)
+
+    archive = commands.add_parser(
+        "archive",
+        help="Move old stress logs and chat messages to the archive file"
+    )
+    archive.add_argument("--stress-logs-days", dest="stress_logs_days", type=int,
+                         help="Keep this many days of stress_logs (default 365)")
+    archive.add_argument("--chat-history-days", dest="chat_history_days", type=int,
+                         help="Keep this many days of chat_history (default 180)")
+    archive.add_argument("--archive", help="Archive file (default: <db>-archive.db)")
+    archive.add_argument("--batch-size", type=int, default=500)
+    archive.add_argument("--pause", type=float, default=0.05,
+                         help="Seconds between batches")
+    archive.add_argument("--enable-incremental-vacuum", action="store_true",
+                         help="One-time full VACUUM to switch an old database to incremental")
+    archive.set_defaults(func=cmd_archive)
+
+    importer = commands.add_parser(
+        "import-csv",
+        help="Bulk-import historical check-ins from a CSV file (resumable)"
+    )
+    importer.add_argument("path", help="CSV file with a header row")
+    importer.add_argument("--user-column", default="username")
+    importer.add_argument("--text-column", default="text")
+    importer.add_argument("--timestamp-column", default="timestamp",
+                          help="Used when present; otherwise rows are stamped now")
+    importer.add_argument("--engine", default="lexicon", help="StressAnalyzer engine")
+    importer.add_argument("--workers", type=int, help="Scoring processes (default: CPUs)")
+    importer.add_argument("--chunk-size", type=int, default=5000,
+                          help="Rows per transaction")
+    importer.add_argument("--create-users", action="store_true",
+                          help="Create employee accounts for unknown usernames")
+    importer.add_argument("--restart", action="store_true",
+                          help="Ignore the checkpoint and import from the first row")
+    importer.set_defaults(func=cmd_import_csv)
+
+    bench = commands.add_parser(
+        "bench-analyzer",
+        help="Measure StressAnalyzer throughput and latency per engine"
+    )
+    bench.add_argument("--engine", action="append", default=None,
+                       help="Engine to benchmark (repeatable, default: lexicon)")
+    bench.add_argument("--n", type=int, default=1000, help="Number of calls")
+    bench.add_argument("--concurrency", type=int, default=1, help="Concurrent callers")
+    bench.add_argument("--csv", help="CSV file with texts to score")
+    bench.add_argument("--text-column", default="text")
+    bench.add_argument("--model-dir", help="Local model directory (transformer engine)")
+    bench.add_argument("--threads", type=int, help="torch CPU threads (transformer engine)")
+    bench.add_argument("--quantize", action="store_true", help="int8 dynamic quantization")
+    bench.add_argument("--tiny-model", action="store_true",
+                       help="Score with a small randomly initialised model built on the "
+                            "fly instead of --model-dir (timing the engine, not the model)")
+    bench.set_defaults(func=cmd_bench_analyzer, needs_db=False)
+
+    report = commands.add_parser(
+        "lexicon-report",
+        help="Compare lexicon and TextBlob scores on a corpus"
+    )
+    report.add_argument("--csv", help="CSV file with texts to score")
+    report.add_argument("--text-column", default="text")
+    report.add_argument("--show", type=int, default=10,
+                        help="Number of largest disagreements to print")
+    report.set_defaults(func=cmd_lexicon_report, needs_db=False)
+
+    logins = commands.add_parser(
+        "bench-logins",
+        help="Login storm on a scratch database: per-login vs buffered audit writes"
+    )
+    logins.add_argument("--n", type=int, default=2000, help="Number of logins")
+    logins.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    logins.set_defaults(func=cmd_bench_logins, needs_db=False)
+
+    export = commands.add_parser(
+        "bench-export",
+        help="Peak RSS of a streaming stress_logs export on a scratch database"
+    )
+    export.add_argument("--rows", type=int, default=10_000_000)
+    export.add_argument("--compare", action="store_true",
+                        help="Also run the old load-everything export")
+    export.set_defaults(func=cmd_bench_export, needs_db=False)
+
+    def add_seed_arguments(command):
+        command.add_argument("--scale", choices=["10k", "1m", "10m"], default="10k",
+                             help="Check-ins and employees to generate")
+        command.add_argument("--managers", type=int,
+                             help="Default: one per 20 employees")
+        command.add_argument("--start", default="2025-01-01", help="First check-in date")
+        command.add_argument("--days", type=int, default=365, help="Date range length")
+        command.add_argument("--seed", type=int, default=0, help="Random seed")
+        command.add_argument("--no-chat", action="store_true",
+                             help="Skip chat_history rows")
+
+    seed = commands.add_parser(
+        "seed",
+        help="Fill the database with a deterministic synthetic organization"
+    )
+    add_seed_arguments(seed)
+    seed.add_argument("--employees", type=int, help="Override the scale's employee count")
+    seed.add_argument("--logs", type=int, help="Override the scale's check-in count")
+    seed.set_defaults(func=cmd_seed)
+
+    benchmark = commands.add_parser(
+        "bench",
+        help="Time the database, scoring and dashboard code on synthetic data"
+    )
+    add_seed_arguments(benchmark)
+    benchmark.add_argument("--db", help="Seeded database to reuse (seeded first if "
+                                        "empty); runs work on a copy")
+    benchmark.add_argument("--only", action="append",
+                           help="Only cases whose name contains this (repeatable)")
+    benchmark.add_argument("--out", help="Results JSON (default: bench-<scale>.json)")
+    benchmark.add_argument("--baseline", help="Earlier results JSON to compare against")
+    benchmark.add_argument("--tolerance", type=float, default=0.2,
+                           help="Median slowdown that counts as a regression")
+    benchmark.set_defaults(func=cmd_bench, needs_db=False)
+
+    bench_db = commands.add_parser(
+        "bench-db",
+        help="Dashboard page latency and connections opened, pooled vs per call"
+    )
+    add_seed_arguments(bench_db)
+    bench_db.add_argument("--db", help="Seeded database to use (seeded first if empty)")
+    bench_db.add_argument("--renders", type=int, default=200, help="Renders per page")
+    bench_db.add_argument("--threads", type=int, default=8, help="Concurrent renders")
+    bench_db.set_defaults(func=cmd_bench_db, needs_db=False)
+
+    budget = commands.add_parser(
+        "import-budget",
+        help="Fail if app.py's startup imports are slow or pull in heavy modules"
+    )
+    budget.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    budget.add_argument("--runs", type=int, default=3)
+    budget.set_defaults(func=cmd_import_budget, needs_db=False)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "needs_db", True):
+        init_db()
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
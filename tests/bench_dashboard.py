@@ -0,0 +1,116 @@
+# pytest-benchmark suite over the synthetic orgs of core.benchmark.
+# Not collected by a plain `pytest` run; invoke it explicitly, after
+# `pip install -r requirements-dev.txt`:
+#
+#   pytest tests/bench_dashboard.py
+#   STRESSGUARD_BENCH_SCALES=10k,1m pytest tests/bench_dashboard.py \
+#       --benchmark-autosave --benchmark-compare
+#
+# STRESSGUARD_BENCH_DIR keeps the seeded databases between runs (seeding
+# 1m check-ins takes minutes); each run benchmarks a fresh copy.
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from core import database
+from core.benchmark import FULL_SCAN_LIMIT, SCALES, build_cases, copy_database
+from core.query_cache import invalidate_all
+
+
+BENCH_SCALES = os.environ.get("STRESSGUARD_BENCH_SCALES", "10k").split(",")
+
+READS = [
+    "db.login_user",
+    "db.get_user_logs",
+    "db.get_weekly_stress",
+    "db.get_monthly_stress",
+    "db.get_chat_history",
+    "db.get_chat_summary",
+    "db.get_manager_team_members",
+    "db.get_available_employees",
+    "db.get_manager_team_logs",
+    "db.get_manager_team_summary",
+    "db.get_manager_team_summary[30d]",
+    "db.get_manager_team_trend[week]",
+    "db.get_manager_team_trend[hour,30d]",
+    "db.get_manager_team_alerts[50]",
+    "db.get_org_metrics",
+    "db.get_burnout_risk_users",
+    "db.get_user_score_distribution",
+    "db.get_high_risk_logs",
+    "db.get_all_alerts",
+    "db.get_log_text",
+    "db.fetch_all_logs",
+    "sentiment.analyze_text",
+    "dashboard.employee_chart_frame",
+    "dashboard.team_trend_frame",
+    "dashboard.team_risk_frame",
+    "dashboard.high_risk_frame",
+]
+# Run after every read, so the reads see exactly the seeded data
+WRITES = [
+    "db.register_user",
+    "db.assign_employee",
+    "db.save_chat_message",
+    "db.save_chat_summary",
+    "db.log_action",
+    "db.record_checkin",
+    "db.save_stress_log",
+    "db.create_alert",
+    "db.resolve_cooled_alerts",
+]
+# Full rebuilds, last of all
+MAINTENANCE = ["db.backfill_stress_rollup", "db.rebuild_stress_state"]
+
+
+@pytest.fixture(scope="session", params=BENCH_SCALES)
+def cases(request, tmp_path_factory):
+    scale = request.param
+    logs, employees = SCALES[scale]
+    seed_dir = os.environ.get("STRESSGUARD_BENCH_DIR") or str(tmp_path_factory.mktemp("seed"))
+    seeded = os.path.join(seed_dir, f"seed-{scale}.db")
+    run = str(tmp_path_factory.mktemp(f"run-{scale}") / "run.db")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("STRESSGUARD_DB_PATH", seeded)
+        database.close_all_connections()
+        database.migrate()
+        with database.db_cursor() as cursor:
+            seeded_logs = cursor.execute("SELECT COUNT(*) FROM stress_logs").fetchone()[0]
+        if not seeded_logs:
+            from core.synthetic import generate_org
+            generate_org(employees=employees, logs=logs)
+        database.close_all_connections()
+
+        copy_database(seeded, run)
+        mp.setenv("STRESSGUARD_DB_PATH", run)
+        invalidate_all()
+        yield build_cases(seeded_logs or logs)
+        database.close_all_connections()
+        invalidate_all()
+
+def run_case(benchmark, cases, name):
+    if name not in cases:
+        pytest.skip(f"{name} is skipped above {FULL_SCAN_LIMIT} check-ins")
+    if name.startswith("dashboard."):
+        pytest.importorskip("pandas")
+    benchmark.group = name
+    benchmark(cases[name])
+
+
+def test_cases_are_all_listed(cases):
+    assert set(cases) <= set(READS + WRITES + MAINTENANCE)
+
+@pytest.mark.parametrize("name", READS)
+def test_read(benchmark, cases, name):
+    run_case(benchmark, cases, name)
+
+@pytest.mark.parametrize("name", WRITES)
+def test_write(benchmark, cases, name):
+    run_case(benchmark, cases, name)
+
+@pytest.mark.parametrize("name", MAINTENANCE)
+def test_maintenance(benchmark, cases, name):
+    run_case(benchmark, cases, name)
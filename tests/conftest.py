@@ -0,0 +1,28 @@
+import pytest
+
+from core import audit, database
+from core.query_cache import invalidate_all
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # A fresh, fully migrated database file per test; the archive lands
+    # next to it. Audit partitions seen in an earlier test's file don't
+    # exist in this one.
+    monkeypatch.setenv("STRESSGUARD_DB_PATH", str(tmp_path / "stressguard.db"))
+    monkeypatch.setattr(audit, "_partitions", set())
+    database.close_all_connections()
+    invalidate_all()
+    database.migrate()
+    yield database
+    # Buffered audit events belong to this file, not the default one
+    if audit._audit_logger is not None:
+        audit._audit_logger.flush()
+    database.close_all_connections()
+    invalidate_all()
+
+@pytest.fixture
+def org(db):
+    # Small synthetic org: 40 employees, 2 managers, 4000 check-ins
+    from core.synthetic import generate_org
+    return generate_org(employees=40, logs=4000, days=120)
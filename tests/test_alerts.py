@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+
+START = datetime(2026, 1, 5, 9, 0)
+
+
+def at(minutes):
+    return (START + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+@pytest.fixture
+def user(db):
+    db.register_user("alice", "pw", "employee")
+    return db.login_user("alice", "pw")["id"]
+
+def checkin(db, user, score, minutes):
+    db.record_checkin(user, "check-in", "reply", score, at(minutes))
+
+def alerts(db, user):
+    with db.db_cursor() as cursor:
+        cursor.execute("""
+            SELECT stress_score, escalation_level, hit_count, resolved, resolved_at
+            FROM alerts WHERE user_id=? ORDER BY id
+        """, (user,))
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def test_low_scores_raise_nothing(db, user):
+    checkin(db, user, db.ALERT_THRESHOLD - 1, 0)
+    assert alerts(db, user) == []
+
+def test_triggers_within_merge_window_fold_into_one_alert(db, user):
+    checkin(db, user, 80, 0)
+    checkin(db, user, 90, 60)
+    checkin(db, user, 78, 60 + db.ALERT_MERGE_MINUTES)
+
+    # Peak score kept, every trigger counted
+    assert alerts(db, user) == [(90, 1, 3, 0, None)]
+
+def test_gap_past_merge_window_starts_a_new_alert(db, user):
+    checkin(db, user, 80, 0)
+    checkin(db, user, 85, db.ALERT_MERGE_MINUTES + 1)
+
+    assert alerts(db, user) == [
+        (80, 1, 1, 1, at(db.ALERT_MERGE_MINUTES + 1)),
+        (85, 1, 1, 0, None),
+    ]
+
+def test_escalation_follows_consecutive_high_checkins(db, user):
+    levels = []
+    for i in range(2 * db.ESCALATION_STREAK + 1):
+        checkin(db, user, 80, i)
+        levels.append(alerts(db, user)[0][1])
+
+    assert levels == [1] * 3 + [2] * 3 + [3]
+
+def test_low_score_breaks_the_streak_but_keeps_the_level(db, user):
+    for i in range(db.ESCALATION_STREAK + 1):
+        checkin(db, user, 80, i)
+    checkin(db, user, 40, 10)
+    checkin(db, user, 80, 11)
+
+    assert alerts(db, user) == [(80, 2, db.ESCALATION_STREAK + 2, 0, None)]
+    with db.db_cursor() as cursor:
+        assert cursor.execute(
+            "SELECT high_streak FROM alert_state WHERE user_id=?", (user,)
+        ).fetchone()[0] == 1
+
+def test_low_checkin_after_cool_down_resolves(db, user):
+    checkin(db, user, 80, 0)
+    checkin(db, user, 40, db.ALERT_COOLDOWN_MINUTES - 1)
+    assert alerts(db, user)[0][3] == 0
+
+    checkin(db, user, 40, db.ALERT_COOLDOWN_MINUTES)
+    assert alerts(db, user) == [(80, 1, 1, 1, at(db.ALERT_COOLDOWN_MINUTES))]
+
+def test_sweep_resolves_only_users_past_cool_down(db, user):
+    db.register_user("bob", "pw", "employee")
+    bob = db.login_user("bob", "pw")["id"]
+    checkin(db, user, 80, 0)
+    checkin(db, bob, 80, 60)
+
+    assert db.resolve_cooled_alerts(now=at(db.ALERT_COOLDOWN_MINUTES)) == 1
+    assert alerts(db, user)[0][3:] == (1, at(db.ALERT_COOLDOWN_MINUTES))
+    assert alerts(db, bob)[0][3] == 0
+
+    # Resolved alerts leave alert_state, so a later check-in starts afresh
+    assert db.resolve_cooled_alerts(now=at(db.ALERT_COOLDOWN_MINUTES)) == 0
+    checkin(db, user, 80, db.ALERT_COOLDOWN_MINUTES + 1)
+    assert len(alerts(db, user)) == 2
+
+def test_sweeper_thread_resolves_quiet_users(db, user):
+    # Check-in timestamps are long past, so the first sweep closes it
+    checkin(db, user, 80, 0)
+    stop = db.start_alert_sweeper(interval=60)
+    try:
+        deadline = time.monotonic() + 5
+        while alerts(db, user)[0][3] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+
+    assert alerts(db, user)[0][3] == 1
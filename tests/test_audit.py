@@ -0,0 +1,71 @@
+from core import audit
+
+
+def test_view_keys_rows_by_source_table(db):
+    with db.db_cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO audit_logs (timestamp, username, action) VALUES (?, ?, ?)",
+            ("2025-12-31 23:00:00", "alice", "legacy")
+        )
+    audit.write_events([
+        ("2026-01-05 09:00:00", "alice", "login"),
+        ("2026-02-05 09:00:00", "bob", "login"),
+    ])
+
+    with db.db_cursor() as cursor:
+        rows = cursor.execute(
+            f"SELECT source_table, id, action FROM {audit.AUDIT_VIEW} ORDER BY timestamp"
+        ).fetchall()
+
+    assert [tuple(row) for row in rows] == [
+        ("audit_logs", 1, "legacy"),
+        ("audit_logs_202601", 1, "login"),
+        ("audit_logs_202602", 1, "login"),
+    ]
+    assert [row["username"] for row in audit.get_audit_logs(limit=2)] == ["bob", "alice"]
+
+
+def test_buffer_is_capped_while_writes_fail(db, monkeypatch):
+    def unavailable(events):
+        raise OSError("disk full")
+    write_events = audit.write_events
+    monkeypatch.setattr(audit, "write_events", unavailable)
+
+    logger = audit.AuditLogger(batch_size=1000, flush_interval=60, max_buffer=5)
+    try:
+        for i in range(8):
+            logger.log("alice", f"action {i}")
+        assert logger.pending() == 5
+        assert logger.flush() == 0
+        assert logger.pending() == 5
+        assert logger.stats["dropped"] == 3
+
+        # The oldest went; the newest are written once the database is back
+        monkeypatch.setattr(audit, "write_events", write_events)
+        assert logger.flush() == 5
+    finally:
+        logger.close()
+
+    assert sorted(row["action"] for row in audit.get_audit_logs()) == [
+        f"action {i}" for i in range(3, 8)
+    ]
+
+def test_failed_flush_keeps_the_newest_events(db, monkeypatch):
+    logger = audit.AuditLogger(batch_size=1000, flush_interval=60, max_buffer=5)
+    def unavailable(events):
+        # Logged by other threads while the write is failing
+        for i in range(4, 7):
+            logger.log("alice", f"action {i}")
+        raise OSError("disk full")
+    monkeypatch.setattr(audit, "write_events", unavailable)
+
+    try:
+        for i in range(4):
+            logger.log("alice", f"action {i}")
+        assert logger.flush() == 0
+        assert logger.pending() == 5
+        assert logger.stats["dropped"] == 2
+        assert [event[2] for event in logger._buffer] == [f"action {i}" for i in range(2, 7)]
+    finally:
+        logger._buffer.clear()
+        logger.close()
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("groq")
+
+from core.chatbot import FALLBACK_MESSAGE, WellnessChatbot
+from core.response_cache import ResponseCache
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class StubClient:
+    # SDK-shaped client; create(stream=True) returns a generator of
+    # chunks, raising `fail` after them when given
+    def __init__(self, parts, fail=None):
+        self.parts = parts
+        self.fail = fail
+        self.calls = []
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return self._stream()
+
+    def _stream(self):
+        try:
+            yield chunk(None)           # role-only first chunk, no text
+            for part in self.parts:
+                yield chunk(part)
+            if self.fail:
+                raise self.fail
+        finally:
+            self.closed = True
+
+
+def test_stream_yields_deltas_in_order():
+    client = StubClient(["Take ", "a ", "breath."])
+    bot = WellnessChatbot(client=client)
+
+    assert list(bot.stream_response("I feel overwhelmed", 80)) == ["Take ", "a ", "breath."]
+    assert client.calls[0]["stream"] is True
+    assert client.calls[0]["messages"][-1] == {"role": "user", "content": "I feel overwhelmed"}
+    assert client.closed
+
+    stats = bot.stream_stats()
+    assert stats["streams"] == 1
+    assert stats["first_tokens"] == 1
+    assert stats["last_ttft"] <= stats["last_generation_time"]
+
+def test_stream_failing_before_first_token_falls_back():
+    bot = WellnessChatbot(client=StubClient([], fail=ConnectionError("reset")))
+
+    assert list(bot.stream_response("hi", 30)) == [FALLBACK_MESSAGE]
+    assert bot.stream_stats()["first_tokens"] == 0
+
+def test_stream_failing_half_way_keeps_partial_reply():
+    bot = WellnessChatbot(client=StubClient(["Try a ", "short "], fail=ConnectionError("reset")))
+
+    assert list(bot.stream_response("hi", 30)) == ["Try a ", "short ", "\n\n" + FALLBACK_MESSAGE]
+
+def test_reader_stopping_early_closes_the_stream():
+    client = StubClient(["one ", "two ", "three"])
+    stream = WellnessChatbot(client=client).stream_response("hi", 30)
+
+    assert next(stream) == "one "
+    stream.close()
+    assert client.closed
+
+def test_completed_stream_fills_the_response_cache():
+    client = StubClient(["Glad ", "to hear it!"])
+    bot = WellnessChatbot(client=client, response_cache=ResponseCache())
+
+    first = "".join(bot.stream_response("Feeling great today", 20))
+    second = list(bot.stream_response("feeling great today!", 25))
+
+    assert second == [first]
+    assert len(client.calls) == 1
+
+def test_broken_stream_is_not_cached():
+    client = StubClient(["Half "], fail=ConnectionError("reset"))
+    bot = WellnessChatbot(client=client, response_cache=ResponseCache())
+
+    list(bot.stream_response("hi", 30))
+    list(bot.stream_response("hi", 30))
+    assert len(client.calls) == 2
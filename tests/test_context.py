@@ -0,0 +1,118 @@
+import pytest
+
+from core import context
+from core.context import MESSAGE_OVERHEAD, ContextBuilder
+
+
+class Words:
+    # One token per word keeps the budgets easy to reason about
+    def count(self, text):
+        return len(text.split()) if text else 0
+
+
+@pytest.fixture
+def user(db):
+    db.register_user("alice", "pw", "employee")
+    return db.login_user("alice", "pw")["id"]
+
+@pytest.fixture
+def reads(monkeypatch):
+    # Calls to get_chat_history made by the builder
+    calls = []
+    real = context.get_chat_history
+    def counting(*args, **kwargs):
+        calls.append(kwargs)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(context, "get_chat_history", counting)
+    return calls
+
+def chat(db, user, turns, words=5):
+    # `turns` user/assistant pairs of `words` words each, as the session
+    # buffer holds them: oldest first, with ids
+    for i in range(turns):
+        db.save_chat_message(user, "user", f"user says {i}. " + "x " * (words - 3))
+        db.save_chat_message(user, "assistant", "reply " * words)
+    return db.get_chat_history(user, limit=2 * turns)
+
+def builder(**kwargs):
+    # Each message costs 5 + 4 tokens; 10 + 20 + 8 are reserved for the
+    # new message, the summary and their overhead, leaving 72: 8 messages
+    options = dict(token_budget=110, summary_budget=20, fold_batch=4, tokenizer=Words())
+    options.update(kwargs)
+    return ContextBuilder(**options)
+
+def message(words=10):
+    return "word " * words
+
+
+def test_packs_the_newest_turns_that_fit(db, user):
+    history = chat(db, user, 3)
+    ctx = builder().build(user, history, message())
+
+    assert ctx.turns == history
+    assert ctx.summary is None
+    assert ctx.tokens == 6 * (5 + MESSAGE_OVERHEAD) + 10 + MESSAGE_OVERHEAD
+
+def test_over_budget_keeps_only_the_newest(db, user):
+    history = chat(db, user, 6)
+    ctx = builder(fold_batch=100).build(user, history, message())
+
+    assert ctx.turns == history[-8:]
+    assert ctx.tokens <= 110
+
+def test_folds_once_enough_messages_dropped(db, user, reads):
+    b = builder()
+    history = chat(db, user, 5)        # 2 messages dropped: below fold_batch
+    assert b.build(user, history, message()).summary is None
+    assert db.get_chat_summary(user) is None
+    assert reads == []                 # ruled out from the ids alone
+
+    chat(db, user, 1)
+    history = db.get_chat_history(user, limit=12)
+    ctx = b.build(user, history, message())  # 4 dropped
+
+    assert ctx.summary == "- user says 0.\n- user says 1."
+    assert db.get_chat_summary(user)["last_message_id"] == history[3]["id"]
+    assert ctx.tokens <= 110
+
+def test_summary_drops_oldest_lines_past_its_budget(db, user):
+    b = builder(summary_budget=7)
+    history = chat(db, user, 8)
+    ctx = b.build(user, history, message())
+
+    # 8 dropped user/assistant messages, 4 user lines of 4 words each
+    assert ctx.summary == "- user says 3."
+    assert len(ctx.summary.split()) <= 7
+
+def test_steady_state_folds_from_the_session_history(db, user, reads):
+    b = builder()
+    db.save_chat_summary(user, "- earlier", 0)
+    history = chat(db, user, 8)
+    b.build(user, history, message())
+    assert len(reads) == 1          # first fold: history doesn't reach back
+
+    # The buffer now reaches the summary: no reads until the next fold,
+    # which then comes from the buffer too
+    reads.clear()
+    for _ in range(3):
+        history = history + chat(db, user, 1)[-2:]
+        b.build(user, history, message())
+        assert reads == []
+    # Folded at the second added turn, through the 12th message
+    assert db.get_chat_summary(user)["last_message_id"] == history[11]["id"]
+
+def test_unsaved_turns_fold_nothing(db, user, reads):
+    # Write-behind: the session has messages the database doesn't yet
+    history = [{"role": "user", "message": message(5)} for _ in range(20)]
+    ctx = builder().build(user, history, message())
+
+    assert len(ctx.turns) == 8
+    assert reads == []
+    assert db.get_chat_summary(user) is None
+
+def test_boundary_past_last_saved_message_when_nothing_fits(db, user):
+    history = chat(db, user, 4, words=100)
+    ctx = builder().build(user, history, message())
+
+    assert ctx.turns == []
+    assert db.get_chat_summary(user)["last_message_id"] == history[-1]["id"]
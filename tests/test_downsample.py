@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+from core.downsample import downsample, downsample_rows, lttb_indices
+
+
+def series(n, seed=0):
+    # Calm baseline with a few sharp spikes at known positions
+    rng = random.Random(seed)
+    xs = [float(i * 60) for i in range(n)]
+    ys = [40 + 10 * math.sin(i / 50) + rng.uniform(-5, 5) for i in range(n)]
+    spikes = rng.sample(range(1, n - 1), 5)
+    for i in spikes:
+        ys[i] = 95 + rng.uniform(0, 5)
+    return xs, ys, spikes
+
+
+@pytest.mark.parametrize("max_points", [1, 2, 3, 4, 5, 10, 50, 600])
+def test_result_never_exceeds_budget(max_points):
+    xs, ys, _ = series(5000)
+    picked = downsample(xs, ys, max_points)
+
+    assert 0 < len(picked) <= max_points
+    assert picked == sorted(set(picked))
+
+@pytest.mark.parametrize("max_points", [1, 3, 20, 600])
+def test_overall_peak_is_kept(max_points):
+    xs, ys, _ = series(5000, seed=1)
+    top = max(range(len(ys)), key=ys.__getitem__)
+
+    assert top in downsample(xs, ys, max_points)
+
+def test_every_spike_is_kept_when_budget_allows():
+    xs, ys, spikes = series(5000, seed=2)
+    picked = set(downsample(xs, ys, 100))
+
+    assert set(spikes) <= picked
+
+def test_too_many_spikes_keep_one_peak_per_slice():
+    # Everything is a spike: spikes are capped at a quarter of the budget
+    xs = [float(i) for i in range(1000)]
+    ys = [80 + (i % 7) for i in range(1000)]
+    picked = downsample(xs, ys, 40)
+
+    assert len(picked) <= 40
+    assert max(ys[i] for i in picked) == max(ys)
+
+def test_small_input_is_returned_whole():
+    xs, ys, _ = series(30)
+    assert downsample(xs, ys, 30) == list(range(30))
+
+def test_lttb_keeps_endpoints():
+    xs, ys, _ = series(1000)
+    picked = lttb_indices(xs, ys, 50)
+
+    assert len(picked) == 50
+    assert picked[0] == 0 and picked[-1] == 999
+
+def test_downsample_rows_sorts_and_keeps_spikes():
+    rows = [(f"2025-03-01 {h:02d}:{m:02d}:00", 30) for h in range(24) for m in range(60)]
+    rows[700] = (rows[700][0], 99)
+    rows.reverse()            # newest first, like get_user_logs()
+
+    kept = downsample_rows(rows, max_points=100)
+
+    assert len(kept) <= 100
+    assert [row[0] for row in kept] == sorted(row[0] for row in kept)
+    assert ("2025-03-01 11:40:00", 99) in kept
@@ -0,0 +1,80 @@
+import csv
+import io
+
+import pytest
+
+from core import export
+
+
+@pytest.fixture
+def logs(db):
+    db.register_user("alice", "pw", "employee")
+    user = db.login_user("alice", "pw")["id"]
+    for day, score in [(1, 20), (2, 80), (3, 55), (4, 90)]:
+        db.record_checkin(user, f"day {day}", "reply", score, f"2026-01-0{day} 09:00:00")
+    return user
+
+def read_csv(data):
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+def test_csv_stress_logs_in_chunks_with_inclusive_end(logs):
+    f = io.BytesIO()
+    rows = export.export_stress_logs(f, start="2026-01-02", end="2026-01-03", fetch_size=1)
+
+    assert rows == 2
+    assert read_csv(f.getvalue()) == [
+        export.STRESS_LOG_COLUMNS,
+        ["2026-01-02 09:00:00", "alice", "80", "day 2"],
+        ["2026-01-03 09:00:00", "alice", "55", "day 3"],
+    ]
+
+def test_csv_alerts(logs):
+    f = io.BytesIO()
+    assert export.export_alerts(f) == 2
+    header, *rows = read_csv(f.getvalue())
+    assert header == export.ALERT_COLUMNS
+    # The low check-in a day later resolved the first alert
+    assert [(row[2], row[3], row[-1]) for row in rows] == [("80", "HIGH", "1"), ("90", "CRITICAL", "0")]
+
+def test_csv_user_history_newest_first(logs):
+    f = io.BytesIO()
+    assert export.export_user_history(logs, f) == 4
+    assert [row[1] for row in read_csv(f.getvalue())[1:]] == ["90", "55", "80", "20"]
+
+def test_parquet_round_trip(logs):
+    pq = pytest.importorskip("pyarrow.parquet")
+    f = io.BytesIO()
+    assert export.export_stress_logs(f, fmt="parquet", fetch_size=3) == 4
+
+    table = pq.read_table(io.BytesIO(f.getvalue()))
+    assert table.column_names == export.STRESS_LOG_COLUMNS
+    assert table.column("stress_score").to_pylist() == [20, 80, 55, 90]
+    assert pq.ParquetFile(io.BytesIO(f.getvalue())).num_row_groups == 2
+
+def test_parquet_schema_does_not_come_from_the_first_chunk():
+    pq = pytest.importorskip("pyarrow.parquet")
+    columns = ["timestamp", "last_triggered", "score"]
+    chunks = [
+        [("2026-01-01 09:00:00", None, 20)],
+        [("2026-01-02 09:00:00", "2026-01-02 09:00:00", 80)],
+    ]
+    f = io.BytesIO()
+    assert export.write_parquet(chunks, columns, f) == 2
+
+    table = pq.read_table(io.BytesIO(f.getvalue()))
+    assert str(table.schema.field("last_triggered").type) == "string"
+    assert table.column("last_triggered").to_pylist() == [None, "2026-01-02 09:00:00"]
+
+def test_parquet_with_no_rows_still_has_the_schema():
+    pq = pytest.importorskip("pyarrow.parquet")
+    f = io.BytesIO()
+    assert export.write_parquet(iter([]), export.HISTORY_COLUMNS, f) == 0
+    assert pq.read_table(io.BytesIO(f.getvalue())).column_names == export.HISTORY_COLUMNS
+
+def test_parquet_conversion_error_is_a_runtime_error():
+    pytest.importorskip("pyarrow")
+    with pytest.raises(RuntimeError, match="after 1 rows"):
+        export.write_parquet(
+            [[("2026-01-01", 20)], [("2026-01-02", "high")]], export.HISTORY_COLUMNS, io.BytesIO()
+        )
@@ -0,0 +1,54 @@
+import pytest
+
+from core.lexicon import LexiconEngine, load_lexicon, polarity
+
+
+# Polarities TextBlob (Pattern) gives for the same texts
+KNOWN = [
+    ("good", 0.7),
+    ("bad", -0.7),
+    ("the meeting", 0.0),                 # no known words
+    ("tired and exhausted", -0.4),        # averaged
+    ("very good", 0.91),                  # modifier scales the next word
+    ("very very good", 0.91),
+    ("extremely bad", -0.7),              # clamped to [-1, 1]
+    ("not good", -0.35),                  # negation flips and halves
+    ("never calm", -0.15),
+    ("not very good", -0.2692),
+    ("really not good", -0.35),           # negation after an -ly modifier
+    ("not bad at all", 0.35),
+    ("I do not feel great", 0.8),         # a longer word ends the negation
+    ("good!", 0.875),                     # "!" boosts the previous word
+    ("good!!", 1.0),
+    ("I am happy :)", 0.65),              # emoticons count as words
+]
+
+
+@pytest.mark.parametrize("text, expected", KNOWN)
+def test_known_polarities(text, expected):
+    assert polarity(text) == pytest.approx(expected, abs=1e-4)
+
+def test_contracted_negation_is_recognised():
+    assert polarity("isn't good") == polarity("is not good") == pytest.approx(-0.35)
+
+def test_emoticons_only_as_whole_tokens():
+    assert polarity("happy :)") == pytest.approx(0.65)
+    assert polarity("happy:)") == pytest.approx(0.8)
+
+def test_engine_scores_match_polarity():
+    engine = LexiconEngine()
+    texts = [text for text, _ in KNOWN]
+    assert engine.score("good") == 15
+    assert engine.score("not good") == 67
+    assert engine.score_batch(texts) == [engine.score(text) for text in texts]
+
+def test_lexicon_is_loaded_once_and_frozen():
+    lexicon = load_lexicon()
+    assert load_lexicon() is lexicon
+    with pytest.raises(TypeError):
+        lexicon.words["good"] = (1.0, 1.0, False)
+
+@pytest.mark.parametrize("text", [text for text, _ in KNOWN])
+def test_agrees_with_textblob(text):
+    textblob = pytest.importorskip("textblob")
+    assert polarity(text) == pytest.approx(textblob.TextBlob(text).sentiment.polarity)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("groq")
+
+import httpx
+from groq import APIConnectionError, APIStatusError
+
+from core import llm_client
+from core.llm_client import AsyncLLMClient, CircuitBreaker, CircuitOpenError, LLMClient
+
+
+# =====================================================
+# FAKE PROVIDER
+# =====================================================
+
+def completion(text):
+    return {
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "test",
+        "choices": [{
+            "index": 0, "finish_reason": "stop",
+            "message": {"role": "assistant", "content": text},
+        }],
+    }
+
+def completion_chunk(text):
+    return {
+        "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0, "model": "test",
+        "choices": [{"index": 0, "finish_reason": None, "delta": {"content": text}}],
+    }
+
+class FakeProvider:
+    # Answers each request with the next scripted step:
+    #   ("json", status, body)       a plain JSON response
+    #   ("sleep", seconds)           no answer until after the client gave up
+    #   ("stream", parts, complete)  SSE chunks; the connection drops
+    #                                half-way when complete is False
+    # Requests beyond the script get a normal completion.
+
+    def __init__(self):
+        self.script = []
+        self.requests = 0
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                provider.requests += 1
+                step = provider.script.pop(0) if provider.script else ("json", 200, completion("ok"))
+                getattr(self, "_" + step[0])(*step[1:])
+
+            def _json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _sleep(self, seconds):
+                time.sleep(seconds)
+                self.close_connection = True
+
+            def _stream(self, parts, complete):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                events = [f"data: {json.dumps(completion_chunk(p))}\n\n" for p in parts]
+                if complete:
+                    events.append("data: [DONE]\n\n")
+                for event in events:
+                    data = event.encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                if complete:
+                    self.wfile.write(b"0\r\n\r\n")
+                # else: no terminating chunk, the connection just closes
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def error(status):
+    return ("json", status, {"error": {"message": f"status {status}", "type": "test"}})
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(llm_client, "backoff_delay", lambda attempt: 0)
+    provider = FakeProvider()
+    yield provider
+    provider.close()
+
+@pytest.fixture
+def make_client(provider):
+    clients = []
+    def make(**kwargs):
+        kwargs.setdefault("read_timeout", 2.0)
+        client = LLMClient("test-key", base_url=provider.url, **kwargs)
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        client.close()
+
+def ask(client, **kwargs):
+    return client.chat.completions.create(
+        model="test", messages=[{"role": "user", "content": "hi"}], **kwargs
+    )
+
+
+# =====================================================
+# RETRIES AND THE BREAKER
+# =====================================================
+
+def test_retries_transient_errors(provider, make_client):
+    provider.script = [error(503), error(502)]
+    client = make_client()
+
+    assert ask(client).choices[0].message.content == "ok"
+    assert provider.requests == 3
+    assert client.breaker.state == "closed"
+    assert client.breaker.failures == 0
+
+def test_exhausted_retries_count_as_one_failure(provider, make_client):
+    provider.script = [error(503)] * 3
+    client = make_client(max_retries=2)
+
+    with pytest.raises(APIStatusError):
+        ask(client)
+    assert provider.requests == 3
+    assert client.breaker.failures == 1
+
+def test_read_timeout_is_retried_then_counted(provider, make_client):
+    provider.script = [("sleep", 0.5), ("sleep", 0.5)]
+    client = make_client(read_timeout=0.1, max_retries=1)
+
+    with pytest.raises(APIConnectionError):
+        ask(client)
+    assert provider.requests == 2
+    assert client.breaker.failures == 1
+
+def test_client_error_is_not_retried_and_closes_half_open(provider, make_client):
+    provider.script = [error(400)]
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    client.breaker.record_failure()
+
+    with pytest.raises(APIStatusError):
+        ask(client)
+    assert provider.requests == 1
+    assert client.breaker.state == "closed"
+
+def test_open_circuit_fails_fast(provider, make_client):
+    provider.script = [error(503)] * 2
+    client = make_client(max_retries=0, breaker=CircuitBreaker(failure_threshold=2))
+
+    for _ in range(2):
+        with pytest.raises(APIStatusError):
+            ask(client)
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        ask(client)
+    assert provider.requests == 2
+
+def test_bug_on_our_side_gives_no_verdict(provider, make_client):
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    client.breaker.record_failure()
+
+    with pytest.raises(TypeError):
+        client.chat.completions.create(model="test", messages=[], not_an_argument=1)
+    # Still half-open, and the probe slot is free again
+    assert client.breaker.state == "half_open"
+    assert client.breaker.allow()
+
+
+# =====================================================
+# STREAMS
+# =====================================================
+
+def test_stream_success_is_recorded_at_the_end(provider, make_client):
+    provider.script = [("stream", ["Take ", "a breath."], True)]
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    client.breaker.record_failure()
+
+    stream = ask(client, stream=True)
+    assert client.breaker.state == "half_open"
+
+    text = "".join(c.choices[0].delta.content or "" for c in stream)
+    assert text == "Take a breath."
+    assert client.breaker.state == "closed"
+
+def test_stream_breaking_half_way_counts_as_failure(provider, make_client):
+    provider.script = [("stream", ["Take ", "a "], False)]
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1))
+
+    stream = ask(client, stream=True)
+    with pytest.raises(httpx.HTTPError):
+        for _ in stream:
+            pass
+    assert client.breaker.state == "open"
+
+
+# =====================================================
+# ASYNC
+# =====================================================
+
+def test_async_client_retries_and_counts_once(provider):
+    provider.script = [error(503)] * 3
+
+    async def run():
+        client = AsyncLLMClient("test-key", base_url=provider.url, max_retries=2)
+        try:
+            with pytest.raises(APIStatusError):
+                await client.chat.completions.create(
+                    model="test", messages=[{"role": "user", "content": "hi"}]
+                )
+            return client.breaker.failures
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == 1
+    assert provider.requests == 3
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from core import query_cache as qc
+from core.query_cache import QueryCache, cached, estimate_size
+
+
+@pytest.fixture
+def people(db):
+    # One manager with one employee, plus an employee on no team
+    for name, role in [("mgr", "manager"), ("emp", "employee"), ("solo", "employee")]:
+        db.register_user(name, "pw", role)
+    ids = {name: db.login_user(name, "pw")["id"] for name in ("mgr", "emp", "solo")}
+    db.assign_employee(ids["emp"], ids["mgr"])
+    return ids
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    # Counts the reads that reach SQLite
+    calls = []
+    real = db.db_cursor
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(db, "db_cursor", counting)
+    return calls
+
+
+def test_scope_found_by_name_positional_or_keyword(db, people, queries):
+    first = db.get_weekly_stress(people["emp"])
+    assert db.get_weekly_stress(user_id=people["emp"]) == first
+    assert len(queries) == 1
+
+    db.get_manager_team_trend(people["mgr"], "week")
+    db.get_manager_team_trend(manager_id=people["mgr"], bucket="week", since=None)
+    assert len(queries) == 2
+
+def test_scope_parameter_checked_at_decoration():
+    with pytest.raises(TypeError, match="user_id"):
+        cached("user")(lambda employee: employee)
+
+def test_checkin_invalidates_user_team_and_org_after_commit(db, people, queries):
+    emp, mgr, solo = people["emp"], people["mgr"], people["solo"]
+    reads = [
+        lambda: db.get_user_logs(emp),
+        lambda: db.get_manager_team_summary(mgr),
+        lambda: db.get_org_metrics(),
+        lambda: db.get_user_logs(solo),
+    ]
+    for read in reads:
+        read()
+    queries.clear()
+
+    with db.db_cursor():
+        db.record_checkin(emp, "too much work", "reply", 80)
+        queries.clear()
+        # Not bumped before commit: a concurrent reader still gets the
+        # committed data from the cache
+        for read in reads:
+            read()
+        assert queries == []
+
+    assert len(db.get_user_logs(emp)) == 1
+    assert db.get_manager_team_summary(mgr)["members"][0]["n"] == 1
+    db.get_org_metrics()
+    assert len(queries) == 3
+    db.get_user_logs(solo)
+    assert len(queries) == 3         # other users keep their entries
+
+def test_rolled_back_write_bumps_nothing(db, people):
+    before = qc.query_cache.version_key([("user", people["emp"]), ("org",)])
+    with pytest.raises(RuntimeError):
+        with db.db_cursor():
+            db.record_checkin(people["emp"], "too much work", "reply", 80)
+            raise RuntimeError("rollback")
+    assert qc.query_cache.version_key([("user", people["emp"]), ("org",)]) == before
+
+def test_least_recently_used_entry_goes_first():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_limit_evicts_and_skips_oversized_results():
+    row = ("2026-01-01 09:00:00", 42)
+    size = estimate_size([row] * 10)
+    cache = QueryCache(max_bytes=size * 8 + size // 2)
+    for key in "abcdefghij":
+        cache.put(key, [row] * 10)
+
+    stats = cache.stats()
+    assert stats["entries"] == 8 and stats["bytes"] <= cache.max_bytes
+    assert cache.get("a") == (False, None) and cache.get("j")[0]
+
+    cache.put("big", [row] * 20)     # over max_bytes / MAX_ENTRY_FRACTION
+    assert cache.get("big") == (False, None)
+    assert cache.get("j")[0]
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = QueryCache(ttl=60)
+    cache.put("a", 1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["bytes"] == 0
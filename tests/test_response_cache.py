@@ -0,0 +1,60 @@
+import time
+
+from core.response_cache import ResponseCache
+
+
+def persisted(path):
+    return sorted(ResponseCache(db_path=path)._data)
+
+
+def test_hit_rate_and_saved_latency():
+    cache = ResponseCache()
+    key = cache.key("Feeling great today", 20)
+    assert cache.get(key) is None
+    cache.put(key, "Glad to hear it!", 1.5)
+
+    assert cache.get(cache.key("feeling great today!", 25)) == "Glad to hear it!"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["saved_latency"] == 1.5
+
+def test_long_histories_are_not_cached():
+    cache = ResponseCache(max_history=2)
+    history = [{"role": "user", "message": "hi"}] * 3
+    assert cache.key("hi", 20, history) is None
+
+def test_least_recently_used_goes_first():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1)
+    cache.get("a")
+    cache.put("c", "C", 1)
+
+    assert list(cache._data) == ["a", "c"]
+
+def test_expired_entries_miss(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    cache.put("a", "A", 1)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+def test_only_stored_replies_are_persisted(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(max_bytes=100, db_path=path)
+    cache.put("small", "ok", 1)
+    cache.put("big", "x" * 200, 1)
+
+    assert cache.stats()["entries"] == 1
+    assert persisted(path) == ["small"]
+
+def test_oversized_reply_drops_the_persisted_one_it_replaces(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(max_bytes=100, db_path=path)
+    cache.put("key", "ok", 1)
+    cache.put("key", "x" * 200, 1)
+
+    assert cache.get("key") is None
+    assert persisted(path) == []
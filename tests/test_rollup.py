@@ -0,0 +1,178 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+
+RAW_DAILY = """
+    SELECT user_id, substr(timestamp, 1, 10), COUNT(*), SUM(stress_score),
+           MIN(stress_score), MAX(stress_score)
+    FROM stress_logs
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+"""
+RAW_HISTOGRAM = """
+    SELECT user_id, stress_score, COUNT(*)
+    FROM stress_logs
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+"""
+
+def fetch(db, sql, params=()):
+    with db.db_cursor() as cursor:
+        return [tuple(row) for row in cursor.execute(sql, params).fetchall()]
+
+def rollup(db):
+    return fetch(db, """
+        SELECT user_id, day, score_count, score_sum, score_min, score_max
+        FROM stress_daily_rollup
+        ORDER BY 1, 2
+    """)
+
+def histogram(db):
+    return fetch(db, "SELECT user_id, score, score_count FROM stress_score_histogram ORDER BY 1, 2")
+
+@pytest.fixture
+def recent_org(db):
+    # Ends today, so the rolling 7/30-day windows have data
+    from core.synthetic import generate_org
+    start = (date.today() - timedelta(days=90)).isoformat()
+    return generate_org(employees=20, logs=3000, start=start, days=90, chat=False)
+
+
+def test_seeded_rollup_matches_raw(db, org):
+    assert rollup(db) == fetch(db, RAW_DAILY)
+    assert histogram(db) == fetch(db, RAW_HISTOGRAM)
+
+def test_writes_keep_rollup_in_step(db, org):
+    employee = org["employee_ids"][0]
+    db.save_stress_log(employee, "too much work", 55)
+    for minute, score in enumerate((20, 95, 70)):
+        db.record_checkin(employee, "hi", "hello", score, f"2030-01-01 09:{minute:02d}:00")
+
+    assert rollup(db) == fetch(db, RAW_DAILY)
+    assert histogram(db) == fetch(db, RAW_HISTOGRAM)
+
+def test_import_keeps_rollup_in_step(db, org):
+    from core.importer import write_chunk
+
+    user_ids = dict(fetch(db, "SELECT username, id FROM users WHERE role='employee' LIMIT 3"))
+    names = sorted(user_ids)
+    rows = [(names[i % 3], f"row {i}", f"2030-02-0{1 + i % 2} 10:{i:02d}:00") for i in range(30)]
+    scores = [(i * 7) % 101 for i in range(30)]
+    write_chunk("test.csv", rows, scores, user_ids, 0, 0, 0)
+
+    assert rollup(db) == fetch(db, RAW_DAILY)
+    assert histogram(db) == fetch(db, RAW_HISTOGRAM)
+
+def test_backfill_keeps_archived_days(db, recent_org):
+    from core.retention import POLICIES, run_retention
+
+    before_rollup, before_histogram = rollup(db), histogram(db)
+    moved = run_retention([POLICIES["stress_logs"]._replace(days=30)], pause=0, vacuum_pages=0)
+    assert moved["stress_logs"]
+
+    # Retention leaves the aggregates alone; a rebuild must restore them
+    # from the hot file and the archive, including the day split by the
+    # cutoff
+    assert rollup(db) == before_rollup
+    db.backfill_stress_rollup()
+    assert rollup(db) == before_rollup
+    assert histogram(db) == before_histogram
+
+@pytest.mark.parametrize("func, modifier", [
+    ("get_weekly_stress", "-7 days"),
+    ("get_monthly_stress", "-30 days"),
+])
+def test_rolling_average_matches_raw(db, recent_org, func, modifier):
+    for employee in recent_org["employee_ids"]:
+        raw = fetch(db, """
+            SELECT AVG(stress_score) FROM stress_logs
+            WHERE user_id=? AND timestamp >= datetime('now', ?)
+        """, (employee, modifier))[0][0]
+
+        assert getattr(db, func).uncached(employee) == (round(raw, 1) if raw else None)
+
+def test_trend_buckets_match_raw(db, recent_org):
+    manager = recent_org["manager_ids"][0]
+    trend = db.get_manager_team_trend.uncached(manager, "week")
+    assert trend
+
+    # Every week starts on a Monday, and each row averages exactly the
+    # member's logs of that Monday-to-Sunday week
+    for row in trend:
+        monday = datetime.strptime(row["bucket"], "%Y-%m-%d")
+        assert monday.weekday() == 0
+        raw = fetch(db, """
+            SELECT AVG(s.stress_score), COUNT(*)
+            FROM stress_logs s JOIN users u ON u.id = s.user_id
+            WHERE u.username=? AND s.timestamp >= ? AND s.timestamp < ?
+        """, (row["username"], monday.strftime("%Y-%m-%d"),
+              (monday + timedelta(days=7)).strftime("%Y-%m-%d")))[0]
+        assert row["n"] == raw[1]
+        assert row["avg_score"] == pytest.approx(raw[0], abs=0.05)
+
+STRESS_STATE = """
+    SELECT user_id, ewma, ewvar, weight, last_seen, streak, count
+    FROM user_stress_state
+    ORDER BY user_id
+"""
+
+def assert_same_state(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got == pytest.approx(want)
+
+def test_stress_state_fold(db):
+    db.register_user("alice", "pw", "employee")
+    alice = db.login_user("alice", "pw")["id"]
+    # A burst at the same moment averages; one half-life later the old
+    # weight counts half
+    for timestamp, score in [
+        ("2030-01-01 09:00:00", 40),
+        ("2030-01-01 09:00:00", 80),
+        (f"2030-01-0{1 + db.STRESS_HALF_LIFE_HOURS // 24} 09:00:00", 100),
+    ]:
+        db.record_checkin(alice, "hi", "hello", score, timestamp)
+
+    ewma, _, weight, _, streak, count = fetch(db, STRESS_STATE)[0][1:]
+    assert (ewma, weight, streak, count) == pytest.approx((80, 2, 2, 3))
+
+    db.record_checkin(alice, "hi", "hello", 20, "2030-01-04 10:00:00")
+    assert fetch(db, STRESS_STATE)[0][5] == 0
+
+def test_writes_keep_stress_state_in_step_with_rebuild(db, org):
+    employees = org["employee_ids"][:3]
+    for i in range(30):
+        # Some check-ins share a timestamp; scores straddle BURNOUT_SCORE
+        minute = i // 2
+        db.record_checkin(employees[i % 3], "hi", "hello", (i * 37) % 101,
+                          f"2030-03-{1 + minute // 5:02d} 09:{minute:02d}:00")
+    written = fetch(db, STRESS_STATE)
+
+    db.rebuild_stress_state()
+    assert_same_state(written, fetch(db, STRESS_STATE))
+
+def test_replaying_the_log_matches_rebuild(db, org):
+    # The same sequence through the write path's per-row update
+    with db.db_cursor() as cursor:
+        cursor.execute("DELETE FROM user_stress_state")
+        rows = cursor.execute("""
+            SELECT user_id, stress_score, timestamp FROM stress_logs ORDER BY timestamp, id
+        """).fetchall()
+        for user_id, score, timestamp in rows:
+            db._update_stress_state(cursor, user_id, score, timestamp)
+    replayed = fetch(db, STRESS_STATE)
+    assert len(replayed) == len(org["employee_ids"])
+
+    db.rebuild_stress_state()
+    assert_same_state(replayed, fetch(db, STRESS_STATE))
+
+def test_out_of_order_rows_count_as_simultaneous(db):
+    db.register_user("alice", "pw", "employee")
+    alice = db.login_user("alice", "pw")["id"]
+    db.record_checkin(alice, "hi", "hello", 40, "2030-01-05 09:00:00")
+    db.record_checkin(alice, "hi", "hello", 80, "2030-01-01 09:00:00")
+
+    ewma, _, weight, last_seen, _, count = fetch(db, STRESS_STATE)[0][1:]
+    assert (ewma, weight, count) == pytest.approx((60, 2, 2))
+    assert last_seen == "2030-01-05 09:00:00"
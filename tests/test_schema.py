@@ -0,0 +1,74 @@
+import re
+
+import pytest
+
+
+def test_migrate_sets_schema_version(db):
+    with db.db_cursor() as cursor:
+        assert cursor.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+
+def test_migrate_is_idempotent(db):
+    assert db.migrate() == db.SCHEMA_VERSION
+    assert db.migrate() == db.SCHEMA_VERSION
+
+
+# =====================================================
+# QUERY PLANS
+# =====================================================
+
+def query_plans(db, func, *args):
+    # EXPLAIN QUERY PLAN of every SELECT the call runs. The trace callback
+    # sees statements with their parameters bound, so they can be
+    # explained as-is.
+    statements = []
+    with db.db_cursor() as cursor:
+        conn = cursor.connection
+    # Single thread: the pool hands the same connection straight back
+    conn.set_trace_callback(statements.append)
+    try:
+        getattr(func, "uncached", func)(*args)
+    finally:
+        conn.set_trace_callback(None)
+
+    return [
+        [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        for sql in statements
+        if sql.lstrip().upper().startswith(("SELECT", "WITH"))
+    ]
+
+# A plan line reading one of the raw tables (or its usual alias) end to end
+FULL_SCAN = re.compile(r"^SCAN (stress_logs|chat_history|alerts|s|a)\b(?!.*\bUSING\b)")
+
+# (function, arguments from the org fixture, index the plan must use)
+READS = [
+    ("get_user_logs", lambda org: (org["employee_ids"][0],), "idx_stress_logs_user_ts"),
+    ("get_weekly_stress", lambda org: (org["employee_ids"][0],), "idx_stress_logs_user_ts"),
+    ("get_monthly_stress", lambda org: (org["employee_ids"][0],), "idx_stress_logs_user_ts"),
+    ("get_chat_history", lambda org: (org["employee_ids"][0],), "idx_chat_history_user_id"),
+    ("get_manager_team_logs", lambda org: (org["manager_ids"][0],), "idx_stress_logs_user_ts"),
+    ("get_manager_team_summary", lambda org: (org["manager_ids"][0],), "idx_alerts_user_resolved"),
+    ("get_manager_team_alerts", lambda org: (org["manager_ids"][0], 50), "idx_alerts_resolved"),
+    ("get_available_employees", lambda org: (org["manager_ids"][0],), "idx_users_role"),
+    ("get_burnout_risk_users", lambda org: (), "idx_user_stress_state_ewma"),
+    ("get_org_metrics", lambda org: (), "idx_user_stress_state_ewma"),
+    ("get_high_risk_logs", lambda org: (), "idx_stress_logs_score_id"),
+    ("get_all_alerts", lambda org: (), "idx_alerts_resolved"),
+]
+
+@pytest.mark.parametrize("name, args, index", READS, ids=[r[0] for r in READS])
+def test_read_uses_index(db, org, name, args, index):
+    plans = query_plans(db, getattr(db, name), *args(org))
+    details = [detail for plan in plans for detail in plan]
+
+    assert plans
+    assert any(index in detail for detail in details), details
+    assert not [detail for detail in details if FULL_SCAN.match(detail)], details
+
+def test_full_scan_is_detected(db):
+    # Guards the check above against plan wording changes
+    with db.db_cursor() as cursor:
+        plan = [
+            row[3] for row in
+            cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM stress_logs s WHERE s.user_text = 'x'")
+        ]
+    assert any(FULL_SCAN.match(detail) for detail in plan), plan
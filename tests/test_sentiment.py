@@ -0,0 +1,79 @@
+import time
+
+from core.sentiment import ScoreCache, StressAnalyzer, normalize_text, polarity_to_score
+
+
+class CountingEngine:
+    name = "counting"
+
+    def __init__(self):
+        self.batches = []
+
+    def score(self, text):
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts):
+        self.batches.append(list(texts))
+        return [len(text) for text in texts]
+
+def analyzer(**options):
+    a = StressAnalyzer(**options)
+    a.engine = CountingEngine()
+    return a
+
+
+def test_polarity_maps_onto_0_to_100():
+    assert [polarity_to_score(p) for p in (1.0, 0.0, -1.0, 1.5, -1.5)] == [0, 50, 100, 0, 100]
+
+def test_cache_evicts_least_recently_used():
+    cache = ScoreCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["size"] == 2
+
+def test_cache_entries_expire(monkeypatch):
+    cache = ScoreCache(ttl=60)
+    cache.put("a", 1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+def test_cache_counts_hits_and_misses():
+    cache = ScoreCache()
+    cache.get("a")
+    cache.put("a", 1)
+    cache.get("a")
+    assert (cache.stats()["hits"], cache.stats()["misses"], cache.stats()["hit_rate"]) == (1, 1, 0.5)
+
+    cache.clear()
+    assert cache.stats()["size"] == cache.stats()["hits"] == 0
+
+def test_analyze_text_caches_on_normalized_text():
+    a = analyzer()
+    assert a.analyze_text("Too much  work") == a.analyze_text("too much work")
+    assert a.engine.batches == [["Too much  work"]]
+
+def test_batch_scores_each_distinct_uncached_text_once():
+    a = analyzer()
+    a.analyze_text("cached one")
+    a.engine.batches.clear()
+
+    texts = ["Hello", "hello ", "cached one", "new text", "HELLO"]
+    scores = a.analyze_batch(texts)
+
+    assert a.engine.batches == [["Hello", "new text"]]
+    assert scores == [5, 5, len("cached one"), 8, 5]
+    assert a.cache.get(normalize_text("new text")) == 8
+
+def test_batch_without_cache():
+    a = analyzer(cache_size=0)
+    assert a.analyze_batch(["a", "A", "bb"]) == [1, 1, 2]
+    assert a.engine.batches == [["a", "bb"]]
+    assert a.cache_stats() is None
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+import manage
+
+
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def startup():
+    # Best of a few cold `python -X importtime` runs of `import app`
+    return min((manage.measure_startup() for _ in range(RUNS)), key=lambda run: run[0])
+
+
+def test_app_reaches_login_screen(startup):
+    _, loaded = startup
+    assert "app" in loaded and "core.database" in loaded
+
+
+def test_no_heavy_modules_before_login(startup):
+    _, loaded = startup
+    assert manage.heavy_imports(loaded) == []
+
+
+def test_cold_import_within_budget(startup):
+    total_ms, _ = startup
+    assert total_ms <= manage.IMPORT_BUDGET_MS, (
+        f"cold import took {total_ms:.0f} ms, budget {manage.IMPORT_BUDGET_MS:.0f} ms"
+    )
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from core.transformer_engine import TransformerEngine, save_tiny_model
+
+
+TEXTS = [
+    "I feel overwhelmed and tired all the time",
+    "Feeling great after the team lunch today!",
+    "too much work",
+    "Had a calm, productive morning",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    return save_tiny_model(str(tmp_path_factory.mktemp("tiny-model")), TEXTS)
+
+@pytest.fixture
+def engine(model_dir):
+    engine = TransformerEngine(model_dir=model_dir, max_batch_size=8, max_latency_ms=50)
+    yield engine
+    engine.close()
+
+
+def test_scores_are_in_range(engine):
+    for text in TEXTS:
+        score = engine.score(text)
+        assert isinstance(score, int) and 0 <= score <= 100
+
+def test_concurrent_calls_are_micro_batched(engine):
+    texts = TEXTS * 8
+    with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+        scores = list(pool.map(engine.score, texts))
+
+    assert len(scores) == len(texts)
+    assert engine.batched_texts == len(texts)
+    assert engine.batches < len(texts)
+
+def test_padding_does_not_change_scores(engine):
+    # Batched texts are padded to the longest one; the attention mask
+    # must keep that from moving the score
+    alone = [engine.score_batch([text])[0] for text in TEXTS]
+    assert engine.score_batch(TEXTS) == pytest.approx(alone, abs=1)
+
+def test_inference_errors_reach_every_caller(engine, monkeypatch):
+    def broken(texts):
+        raise RuntimeError("out of memory")
+    monkeypatch.setattr(engine, "_infer", broken)
+
+    futures = [engine.submit(text) for text in TEXTS]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+def test_analyzer_uses_the_engine(model_dir):
+    from core.sentiment import StressAnalyzer
+
+    analyzer = StressAnalyzer(engine="transformer", model_dir=model_dir, cache_size=0)
+    try:
+        single = [analyzer.analyze_text(text) for text in TEXTS]
+        assert analyzer.analyze_batch(TEXTS) == pytest.approx(single, abs=1)
+    finally:
+        analyzer.engine.close()